@@ -0,0 +1,68 @@
+"""
+有界缓存模块 - 按最近最少使用（LRU）淘汰的匹配缓存，附带命中/未命中/淘汰计数
+"""
+
+from collections import OrderedDict
+
+class LRUCache:
+    """LRU缓存 - 容量满时淘汰最久未使用的条目，长时间运行的进程内存占用保持稳定"""
+
+    # 默认容量（条目数），None表示不限制
+    DEFAULT_CAPACITY = 100000
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        if capacity is not None and capacity <= 0:
+            raise ValueError(f"缓存容量必须为正数: {capacity}")
+        self.capacity = capacity
+        self.entries = OrderedDict()
+
+        # 计数器
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """查找并计数；命中的条目移到最近使用的位置"""
+        try:
+            value = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def __setitem__(self, key, value):
+        """写入条目，超出容量时淘汰最久未使用的条目"""
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if self.capacity is not None:
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def __getitem__(self, key):
+        """直接读取（不计数、不调整顺序）"""
+        return self.entries[key]
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def update(self, other):
+        """批量写入（如从持久化缓存加载）"""
+        for key, value in other.items():
+            self[key] = value
+
+    def items(self):
+        return self.entries.items()
+
+    def counters(self):
+        """命中/未命中/淘汰计数"""
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+    def reset_counters(self):
+        """计数清零（如工作进程继承了父进程的缓存，只统计之后的增量）"""
+        self.hits = self.misses = self.evictions = 0
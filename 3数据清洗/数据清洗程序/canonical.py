@@ -0,0 +1,132 @@
+"""
+规范键模块 - 从CPU/GPU名称中提取统一的型号键（如 INTEL-I5-12400F、NV-RTX-4060-TI）
+"""
+
+import re
+
+# 商标符号和无关词
+_NOISE_PATTERNS = [
+    r'[®™©]',
+    r'\((?:R|TM|C)\)',
+    r'@?\s*\d+(?:\.\d+)?\s*[GM]HZ',  # 主频
+    r'\bPROCESSOR\b',
+    r'\bCPU\b',
+]
+
+# 显存容量
+_MEMORY_PATTERN = re.compile(r'\b(\d{1,2})\s*GB\b(?:\s*(?:VRAM|GDDR\dX?|DDR\d))?')
+
+def _normalize(name):
+    """大写、去除商标符号和主频等噪声、括号改为空格、合并空白"""
+    text = str(name).upper()
+    for pattern in _NOISE_PATTERNS:
+        text = re.sub(pattern, ' ', text)
+    text = re.sub(r'[()]', ' ', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+def canonical_cpu_key(cpu_name):
+    """CPU规范键，如 INTEL-I5-12400F、INTEL-U9-285K、AMD-R7-7800X3D、AMD-TR-9980X；无法识别时返回None"""
+    text = _normalize(cpu_name)
+
+    match = re.search(r'\bULTRA\s*([579])\s*(\d{3})([A-Z]{0,2})\b', text)
+    if match:
+        return f"INTEL-U{match.group(1)}-{match.group(2)}{match.group(3)}"
+
+    match = re.search(r'\bI([3579])\s*-?\s*(\d{3,5})([A-Z]{0,2})\b', text)
+    if match:
+        return f"INTEL-I{match.group(1)}-{match.group(2)}{match.group(3)}"
+
+    match = re.search(r'\b(PENTIUM|CELERON)(?:\s+GOLD)?\s+([A-Z]?\d{3,4}[A-Z]?)\b', text)
+    if match:
+        return f"INTEL-{match.group(1)}-{match.group(2)}"
+
+    match = re.search(r'\bTHREADRIPPER\s*(?:PRO\s*)?(\d{4})([A-Z]{0,3})\b', text)
+    if match:
+        return f"AMD-TR-{match.group(1)}{match.group(2)}"
+
+    match = re.search(r'\bRYZEN\s*R?([3579])\s*(?:PRO\s*)?(\d{4})([A-Z0-9]{0,3})\b', text) or \
+        re.search(r'\bR([3579])\s*-?\s*(\d{4})([A-Z0-9]{0,3})\b', text)
+    if match:
+        return f"AMD-R{match.group(1)}-{match.group(2)}{match.group(3)}"
+
+    match = re.search(r'\bATHLON\s+(\d{3,4}[A-Z]{0,2})\b', text)
+    if match:
+        return f"AMD-ATHLON-{match.group(1)}"
+
+    match = re.search(r'\bA(\d{1,2})-(\d{4}[A-Z]?)\b', text)
+    if match:
+        return f"AMD-A{match.group(1)}-{match.group(2)}"
+
+    return None
+
+def cpu_key_variants(key):
+    """CPU规范键及其等价键：Intel的F/KF型号（无核显）与对应非F型号性能相同"""
+    if key is None:
+        return []
+    variants = [key]
+    if key.startswith('INTEL-I') and key.endswith('F'):
+        variants.append(key[:-1])
+    return variants
+
+def _nvidia_series(number):
+    """型号中省略RTX/GTX时按数字推断系列（如 GeForce 1060 -> GTX，NVidia 3060 -> RTX）"""
+    if len(number) == 4 and number[:2] in ('20', '30', '40', '50'):
+        return 'RTX'
+    if len(number) == 4 and number[:2] in ('10', '16') or len(number) == 3 and number[0] in '6789':
+        return 'GTX'
+    return None
+
+def canonical_gpu_key(gpu_name):
+    """GPU规范键和显存，如 ('NV-RTX-4060-TI', '16GB')、('AMD-RX-7900-XTX', None)；无法识别时键为None"""
+    text = _normalize(gpu_name)
+
+    memory_match = _MEMORY_PATTERN.search(text)
+    memory = f"{memory_match.group(1)}GB" if memory_match else None
+    if memory_match:
+        text = re.sub(r'\s+', ' ', _MEMORY_PATTERN.sub(' ', text)).strip()
+
+    # NVIDIA：RTX/GTX/GT/MX，后缀 TI/SUPER/D/BOOST
+    match = re.search(r'\b(RTX|GTX|GT|MX)\s*(\d{3,4})((?:\s*-?\s*(?:TI|SUPER|BOOST|D)\b)*)', text)
+    if not match and re.search(r'\b(NVIDIA|GEFORCE)\b', text):
+        number_match = re.search(r'\b(\d{3,4})((?:\s*-?\s*(?:TI|SUPER|D)\b)*)', text)
+        series = _nvidia_series(number_match.group(1)) if number_match else None
+        if series:
+            suffixes = re.findall(r'TI|SUPER|D', number_match.group(2))
+            return '-'.join(['NV', series, number_match.group(1)] + suffixes), memory
+    if match:
+        suffixes = re.findall(r'TI|SUPER|BOOST|D', match.group(3))
+        return '-'.join(['NV', match.group(1), match.group(2)] + suffixes), memory
+
+    # AMD：RX / RX VEGA / Radeon VII / R9 / HD
+    match = re.search(r'\bRX\s*-?\s*(\d{3,4})\s*-?\s*(XTX|XT|GRE|GME|M|\d{4}SP)?\b', text)
+    if match:
+        return '-'.join(part for part in ('AMD', 'RX', match.group(1), match.group(2)) if part), memory
+
+    match = re.search(r'\b(RX\s*)?VEGA\s*-?\s*(\d{1,2})\b', text)
+    if match:
+        return f"AMD-{'RX-' if match.group(1) else ''}VEGA-{match.group(2)}", memory
+
+    if re.search(r'\bRADEON\s+VII\b', text):
+        return 'AMD-RADEON-VII', memory
+
+    match = re.search(r'\bR([579])\s*(\d{3}X?|FURY\s*X?)\b', text)
+    if match:
+        return f"AMD-R{match.group(1)}-{match.group(2).replace(' ', '-')}", memory
+
+    match = re.search(r'\bHD\s*(\d{4})\b', text)
+    if match and re.search(r'\b(AMD|RADEON|ATI)\b', text):
+        return f"AMD-HD-{match.group(1)}", memory
+
+    # Intel：Arc / UHD / Iris Xe
+    match = re.search(r'\bARC\s*([AB]\d{3}M?)\b', text)
+    if match:
+        return f"INTEL-ARC-{match.group(1)}", memory
+
+    match = re.search(r'\bUHD\s*(?:GRAPHICS\s*)?(\d{3})\b', text)
+    if match:
+        return f"INTEL-UHD-{match.group(1)}", memory
+
+    if re.search(r'\bIRIS\s*XE\b', text):
+        return 'INTEL-IRIS-XE', memory
+
+    return None, memory
@@ -0,0 +1,57 @@
+"""
+评分表编译缓存模块 - 把四张评分表和匹配器的派生索引编译为一个二进制文件，启动时直接反序列化
+"""
+
+import os
+import pickle
+from .match_cache import MatchCache
+from .stage_cache import StageCache
+from .fuzzy_matcher import FuzzyMatcher
+from .ngram_index import NgramTfidfIndex
+from . import canonical
+
+class ConfigCache:
+    """评分表编译缓存 - 以评分表文件内容和相关源码的指纹为版本，xlsx或代码变化时自动失效
+
+    文件内先后存放两个pickle：指纹和编译结果。读取时先比对指纹，不一致时不反序列化编译结果。
+    """
+
+    # 文件格式版本，编译内容的结构变化时递增
+    FORMAT_VERSION = 1
+
+    # 构建匹配器派生索引的源码
+    INDEX_SOURCES = (FuzzyMatcher, NgramTfidfIndex, canonical)
+
+    def __init__(self, path, table_paths, code_objects=()):
+        self.path = path
+        # 评分表内容 + 读取评分表（code_objects，如load_configs）和构建索引的源码
+        self.fingerprint = MatchCache.fingerprint_files(
+            list(table_paths) + StageCache.source_files(*code_objects, *self.INDEX_SOURCES), self.FORMAT_VERSION
+        )
+
+    def load(self):
+        """读取编译结果，文件不存在、指纹不一致或无法读取时返回None"""
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, 'rb') as f:
+                if pickle.load(f) != self.fingerprint:
+                    print("♻️ 评分表或相关代码已变化，重新编译评分表缓存")
+                    return None
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError) as e:
+            print(f"⚠️ 评分表编译缓存无法读取，重新编译: {e}")
+            return None
+
+    def save(self, compiled):
+        """保存编译结果（先写临时文件再改名）"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            pickle.dump(self.fingerprint, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(compiled, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, self.path)
+        print(f"💾 评分表编译缓存已保存: {self.path}")
@@ -2,18 +2,58 @@
 数据清洗和预处理模块
 """
 
+import os
+import glob
 import pandas as pd
 import numpy as np
 import re
 from tqdm import tqdm
 import logging
+from .dtypes import (PLAYER_DTYPES, YEAR_DTYPE, is_categorical, ensure_category, numeric_values,
+                     map_categories, unify_chunk_categories)
+from .imputer import MissingValueImputer
 
 class DataProcessor:
     """数据处理器 - 清洗和预处理玩家配置数据"""
     
-    def __init__(self, data_path, chunk_size=10000):
+    # 列名映射（统一为大写形式）
+    COLUMN_MAPPING = {
+        'cpu': 'CPU',
+        'gpu': 'GPU', 
+        'ram': 'RAM',
+        'storage': 'Storage',
+        'year': 'Year',
+        'type': 'Type'
+    }
+    
+    # 有效年份范围（超出范围视为异常值）
+    YEAR_MIN = 2000
+    YEAR_MAX = 2030
+    
+    # 多文件输入时记录来源文件的列名
+    SOURCE_COLUMN = 'Source_File'
+    
+    def __init__(self, data_path, chunk_size=10000, inplace=False, typed=False,
+                 engine='pandas', usecols=None, pushdown_filters=True, record_source=None):
+        # data_path可以是单个文件、目录（读取其中所有CSV）或通配符（如data/part-*.csv）
         self.data_path = data_path
+        self.data_files = self.resolve_data_files(data_path)
+        self.multi_file = not os.path.isfile(data_path)
+        # 是否添加来源文件列（默认仅多文件输入时添加）
+        self.record_source = self.multi_file if record_source is None else record_source
         self.chunk_size = chunk_size
+        # 原地模式：各清洗步骤直接修改传入的DataFrame，不再整表复制
+        self.inplace = inplace
+        # 紧凑类型模式：硬件列读为分类类型，年份读为小整数
+        self.typed = typed
+        # 读取引擎：'pandas'为默认C解析器，'arrow'为pyarrow多线程解析
+        if engine not in ('pandas', 'arrow'):
+            raise ValueError(f"不支持的读取引擎: {engine}")
+        self.engine = engine
+        # 只读取指定列（None表示全部列）
+        self.usecols = usecols
+        # arrow引擎读取时直接过滤年份异常行
+        self.pushdown_filters = pushdown_filters
         self.logger = self._setup_logger()
         
     def _setup_logger(self):
@@ -28,28 +68,79 @@ class DataProcessor:
         )
         return logging.getLogger(__name__)
     
+    @staticmethod
+    def resolve_data_files(data_path):
+        """解析输入路径为按文件名排序的文件列表"""
+        if os.path.isfile(data_path):
+            return [data_path]
+        if os.path.isdir(data_path):
+            return sorted(glob.glob(os.path.join(data_path, '*.csv')))
+        return sorted(glob.glob(data_path))
+    
+    def _read_dtypes(self, path):
+        """读取CSV时使用的列类型（仅包含文件中存在的列）"""
+        if not self.typed:
+            return None
+        
+        header = pd.read_csv(path, nrows=0).columns
+        if self.usecols is not None:
+            header = [column for column in header if column in self.usecols]
+        return {column: dtype for column, dtype in PLAYER_DTYPES.items() if column in header}
+    
     def load_data(self):
-        """加载数据 - 支持分块读取"""
+        """加载数据 - 支持分块读取和多文件输入"""
         self.logger.info(f"加载数据: {self.data_path}")
         
+        if not self.data_files:
+            raise FileNotFoundError(f"未找到数据文件: {self.data_path}")
+        
+        if len(self.data_files) == 1:
+            df = self._load_file(self.data_files[0])
+            return self.add_source_column(df, self.data_files[0]) if self.record_source else df
+        
+        # 多文件输入：按文件名顺序读取并记录来源文件
+        frames = []
+        for path in self.data_files:
+            df = self._load_file(path)
+            frames.append(self.add_source_column(df, path) if self.record_source else df)
+        
+        df = pd.concat(unify_chunk_categories(frames), ignore_index=True)
+        self.logger.info(f"多文件读取完成，文件数: {len(frames)}，总行数: {len(df)}")
+        return df
+    
+    def add_source_column(self, df, path):
+        """添加来源文件列（分类类型，每个文件只存一份文件名）"""
+        df[self.SOURCE_COLUMN] = pd.Categorical.from_codes(
+            np.zeros(len(df), dtype=np.int8), categories=[os.path.basename(path)]
+        )
+        return df
+    
+    def _load_file(self, path):
+        """加载单个文件 - 支持分块读取"""
         try:
+            dtypes = self._read_dtypes(path)
+            
+            if self.engine == 'arrow':
+                return self._load_with_arrow(path, dtypes)
+            
             # 检查文件大小，决定是否分块
-            file_size = os.path.getsize(self.data_path) / (1024 * 1024)  # MB
+            file_size = os.path.getsize(path) / (1024 * 1024)  # MB
             self.logger.info(f"文件大小: {file_size:.2f} MB")
             
             if file_size > 100:  # 大于100MB时分块读取
                 chunks = []
                 total_rows = 0
                 
-                for chunk in tqdm(pd.read_csv(self.data_path, chunksize=self.chunk_size), 
+                for chunk in tqdm(pd.read_csv(path, chunksize=self.chunk_size,
+                                              dtype=dtypes, usecols=self.usecols), 
                                 desc="读取数据块"):
                     chunks.append(chunk)
                     total_rows += len(chunk)
                 
-                df = pd.concat(chunks, ignore_index=True)
+                df = pd.concat(unify_chunk_categories(chunks), ignore_index=True)
                 self.logger.info(f"分块读取完成，总行数: {total_rows}")
             else:
-                df = pd.read_csv(self.data_path)
+                df = pd.read_csv(path, dtype=dtypes, usecols=self.usecols)
                 self.logger.info(f"直接读取完成，总行数: {len(df)}")
             
             return df
@@ -58,8 +149,90 @@ class DataProcessor:
             self.logger.error(f"加载数据失败: {e}")
             raise
     
-    def clean_data(self):
-        """数据清洗主函数"""
+    def _load_with_arrow(self, path, dtypes):
+        """使用pyarrow多线程读取CSV，支持列裁剪和年份过滤下推"""
+        try:
+            import pyarrow as pa
+            import pyarrow.compute as pc
+            from pyarrow import csv as pa_csv
+        except ImportError as e:
+            raise ImportError("arrow读取引擎需要安装pyarrow: pip install pyarrow") from e
+        
+        # 紧凑类型模式下，分类列读为字典编码
+        column_types = {column: pa.dictionary(pa.int32(), pa.string())
+                        for column, dtype in (dtypes or {}).items() if dtype == 'category'}
+        
+        table = pa_csv.read_csv(
+            path,
+            read_options=pa_csv.ReadOptions(use_threads=True),
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=self.usecols,
+                column_types=column_types,
+                strings_can_be_null=True  # 空字符串按缺失值处理，与pandas一致
+            )
+        )
+        self.logger.info(f"arrow读取完成，总行数: {table.num_rows}")
+        
+        # 下推年份过滤：与_remove_outliers规则一致，缺失年份保留到缺失值处理阶段
+        if self.pushdown_filters and 'Year' in table.column_names:
+            year = table['Year']
+            if not (pa.types.is_integer(year.type) or pa.types.is_floating(year.type)):
+                # 含非数字值的年份列读为字符串：按数值比较，非数字值与缺失值一样保留
+                year = pa.array(numeric_values(year.to_pandas()), from_pandas=True)
+            in_range = pc.and_(pc.greater_equal(year, self.YEAR_MIN),
+                               pc.less_equal(year, self.YEAR_MAX))
+            table = table.filter(pc.or_kleene(in_range, pc.is_null(year)))
+            self.logger.info(f"年份过滤后行数: {table.num_rows}")
+        
+        if self.typed:
+            # 字典列转为pandas分类类型；年份保持读取类型，移除异常值后再转为int16
+            return table.to_pandas()
+        
+        # 非紧凑模式下使用Arrow支持的列，避免转换为Python对象
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
+    
+    def _rename_columns(self, df):
+        """统一列名大小写"""
+        for old_col, new_col in self.COLUMN_MAPPING.items():
+            if old_col in df.columns:
+                df.rename(columns={old_col: new_col}, inplace=True)
+        
+        return df
+    
+    def compute_fill_statistics(self):
+        """预扫描：分块统计全局填充值（只读取需要统计众数的列）"""
+        self.logger.info("预扫描缺失值填充统计...")
+        
+        imputer = MissingValueImputer()
+        for path in self.data_files:
+            header = pd.read_csv(path, nrows=0).columns
+            stat_columns = imputer.stat_columns([self.COLUMN_MAPPING.get(column, column) for column in header])
+            raw_columns = [column for column in header if self.COLUMN_MAPPING.get(column, column) in stat_columns]
+            
+            if raw_columns:
+                for chunk in pd.read_csv(path, chunksize=self.chunk_size, usecols=raw_columns):
+                    chunk = self._rename_columns(chunk)
+                    if self._pushes_down_year_filter() and 'Year' in chunk.columns:
+                        # 与arrow读取时下推的年份过滤一致：整表读取时这些行不参与统计
+                        chunk = chunk[~self._year_outside_range(chunk['Year'])]
+                    imputer.partial_fit(chunk)
+        
+        return imputer
+    
+    def _pushes_down_year_filter(self):
+        """整表读取时是否在读取阶段过滤异常年份（arrow引擎）"""
+        return self.engine == 'arrow' and self.pushdown_filters
+    
+    def _year_outside_range(self, year):
+        """年份是否为超出范围的数值（缺失值和非数字值不算）"""
+        year = numeric_values(year)
+        return ((year < self.YEAR_MIN) | (year > self.YEAR_MAX)).to_numpy()
+    
+    def clean_data(self, imputer=None):
+        """数据清洗主函数
+        
+        imputer为预先统计好的MissingValueImputer；为None时基于整表统计。
+        """
         df = self.load_data()
         
         # 基本信息
@@ -67,21 +240,27 @@ class DataProcessor:
         self.logger.info(f"原始列名: {list(df.columns)}")
         
         # 重命名列（如果需要）
-        column_mapping = {
-            'cpu': 'CPU',
-            'gpu': 'GPU', 
-            'ram': 'RAM',
-            'storage': 'Storage',
-            'year': 'Year',
-            'type': 'Type'
-        }
-        
-        for old_col, new_col in column_mapping.items():
-            if old_col in df.columns:
-                df.rename(columns={old_col: new_col}, inplace=True)
+        df = self._rename_columns(df)
         
+        return self._clean_frame(df, imputer)
+    
+    def iter_clean_chunks(self, imputer=None):
+        """分块清洗：先预扫描全局填充统计，再逐块清洗，结果与整表清洗一致"""
+        if imputer is None:
+            imputer = self.compute_fill_statistics()
+        
+        for path in self.data_files:
+            dtypes = self._read_dtypes(path)
+            for chunk in pd.read_csv(path, chunksize=self.chunk_size,
+                                     dtype=dtypes, usecols=self.usecols):
+                if self.record_source:
+                    chunk = self.add_source_column(chunk, path)
+                yield self._clean_frame(self._rename_columns(chunk), imputer, validate=False)
+    
+    def _clean_frame(self, df, imputer=None, validate=True):
+        """对一个DataFrame执行完整清洗流程"""
         # 1. 处理缺失值
-        df_cleaned = self._handle_missing_values(df)
+        df_cleaned = self._handle_missing_values(df, imputer)
         
         # 2. 标准化格式
         df_cleaned = self._standardize_formats(df_cleaned)
@@ -90,70 +269,65 @@ class DataProcessor:
         df_cleaned = self._remove_outliers(df_cleaned)
         
         # 4. 验证数据质量
-        self._validate_data(df_cleaned)
+        if validate:
+            self._validate_data(df_cleaned)
         
         self.logger.info(f"清洗后数据形状: {df_cleaned.shape}")
         
         return df_cleaned
     
-    def _handle_missing_values(self, df):
-        """处理缺失值"""
+    def _handle_missing_values(self, df, imputer=None):
+        """处理缺失值 - 按全局统计填充，与数据顺序和分块方式无关"""
         self.logger.info("处理缺失值...")
         
         # 统计缺失值
         missing_stats = df.isnull().sum()
         self.logger.info(f"缺失值统计:\n{missing_stats[missing_stats > 0]}")
         
-        # 复制数据
-        df_cleaned = df.copy()
-        
-        # 按列处理缺失值
-        for column in df_cleaned.columns:
-            if df_cleaned[column].isnull().sum() > 0:
-                if column in ['CPU', 'GPU']:
-                    # 关键列，用占位符填充
-                    df_cleaned[column] = df_cleaned[column].fillna('Unknown')
-                elif column in ['RAM', 'Storage']:
-                    # 硬件列，用中位数或默认值填充
-                    df_cleaned[column] = df_cleaned[column].fillna('8GB DDR4') if column == 'RAM' else df_cleaned[column].fillna('512GB NVMe SSD')
-                elif column == 'Year':
-                    # 年份列，用众数填充
-                    mode_year = df_cleaned[column].mode()[0] if not df_cleaned[column].mode().empty else 2023
-                    df_cleaned[column] = df_cleaned[column].fillna(mode_year)
-                else:
-                    # 其他列，向前填充
-                    df_cleaned[column] = df_cleaned[column].ffill()
+        # 复制数据（原地模式下直接在原表上填充）
+        df_cleaned = df if self.inplace else df.copy()
         
-        return df_cleaned
+        # 未提供全局统计时，以当前数据作为全量统计
+        if imputer is None:
+            imputer = MissingValueImputer().fit(df_cleaned)
+        
+        # CPU/GPU用占位符，RAM/Storage用默认配置，其他列（如Year、Type）用全局众数
+        return imputer.transform(df_cleaned)
     
     def _standardize_formats(self, df):
         """标准化数据格式"""
         self.logger.info("标准化数据格式...")
         
-        df_cleaned = df.copy()
+        df_cleaned = df if self.inplace else df.copy()
         
         # 1. 标准化CPU格式
         if 'CPU' in df_cleaned.columns:
-            df_cleaned['CPU'] = df_cleaned['CPU'].apply(self._standardize_cpu_format)
+            df_cleaned['CPU'] = self._map_column(df_cleaned['CPU'], self._standardize_cpu_format)
         
         # 2. 标准化GPU格式
         if 'GPU' in df_cleaned.columns:
-            df_cleaned['GPU'] = df_cleaned['GPU'].apply(self._standardize_gpu_format)
+            df_cleaned['GPU'] = self._map_column(df_cleaned['GPU'], self._standardize_gpu_format)
         
         # 3. 标准化RAM格式
         if 'RAM' in df_cleaned.columns:
-            df_cleaned['RAM'] = df_cleaned['RAM'].apply(self._standardize_ram_format)
+            df_cleaned['RAM'] = self._map_column(df_cleaned['RAM'], self._standardize_ram_format)
         
         # 4. 标准化Storage格式
         if 'Storage' in df_cleaned.columns:
-            df_cleaned['Storage'] = df_cleaned['Storage'].apply(self._standardize_storage_format)
+            df_cleaned['Storage'] = self._map_column(df_cleaned['Storage'], self._standardize_storage_format)
         
         # 5. 标准化Year为整数
         if 'Year' in df_cleaned.columns:
-            df_cleaned['Year'] = pd.to_numeric(df_cleaned['Year'], errors='coerce').fillna(2023).astype(int)
+            df_cleaned['Year'] = numeric_values(df_cleaned['Year']).fillna(2023).astype(int)
         
         return df_cleaned
     
+    def _map_column(self, series, func):
+        """逐值标准化；分类列只对每个类别计算一次"""
+        if is_categorical(series):
+            return map_categories(series, func)
+        return series.apply(func)
+    
     def _standardize_cpu_format(self, cpu_str):
         """标准化CPU格式"""
         if pd.isna(cpu_str) or cpu_str == 'Unknown':
@@ -240,16 +414,23 @@ class DataProcessor:
         """移除异常值"""
         self.logger.info("检查异常值...")
         
-        df_cleaned = df.copy()
+        df_cleaned = df if self.inplace else df.copy()
         
         # 1. 检查Year异常值
         if 'Year' in df_cleaned.columns:
             # 移除2000年以前或2030年以后的异常年份
-            valid_mask = (df_cleaned['Year'] >= 2000) & (df_cleaned['Year'] <= 2030)
+            valid_mask = (df_cleaned['Year'] >= self.YEAR_MIN) & (df_cleaned['Year'] <= self.YEAR_MAX)
             outliers = len(df_cleaned) - valid_mask.sum()
             if outliers > 0:
                 self.logger.warning(f"发现异常年份: {outliers} 条")
-                df_cleaned = df_cleaned[valid_mask].copy()
+                if self.inplace:
+                    # 删除异常行：写时复制下drop仍会重新分配剩余行，这里只省去过滤后的额外副本
+                    df_cleaned.drop(index=df_cleaned.index[~valid_mask], inplace=True)
+                else:
+                    df_cleaned = df_cleaned[valid_mask].copy()
+            if self.typed:
+                # 异常年份已移除，取值都在int16范围内
+                df_cleaned['Year'] = df_cleaned['Year'].astype(YEAR_DTYPE)
         
         # 2. 检查Type异常值
         if 'Type' in df_cleaned.columns:
@@ -258,6 +439,7 @@ class DataProcessor:
             outliers = invalid_mask.sum()
             if outliers > 0:
                 self.logger.warning(f"发现异常类型: {outliers} 条")
+                df_cleaned['Type'] = ensure_category(df_cleaned['Type'], 'Unknown')
                 df_cleaned.loc[invalid_mask, 'Type'] = 'Unknown'
         
         return df_cleaned
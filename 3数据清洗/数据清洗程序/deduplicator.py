@@ -0,0 +1,44 @@
+"""
+配置去重模块 - 将重复的硬件组合折叠为唯一组合，只对唯一组合做匹配和评分
+"""
+
+import numpy as np
+
+class ConfigDeduplicator:
+    """配置去重器 - 折叠相同的(CPU, GPU, RAM, Storage)组合并记录出现次数"""
+
+    # 决定评分结果的硬件列
+    KEY_COLUMNS = ['CPU', 'GPU', 'RAM', 'Storage']
+
+    def __init__(self, inplace=False):
+        # 原地模式：展开时直接把评分列写入原表
+        self.inplace = inplace
+        self.inverse = None
+
+    def collapse(self, df):
+        """折叠为唯一硬件组合，返回带Count列的DataFrame（按首次出现顺序）"""
+        print("🧩 折叠重复配置...")
+
+        # sort=False时组编号按首次出现顺序分配，第一次出现的位置也是递增的
+        codes = df.groupby(self.KEY_COLUMNS, sort=False, observed=True, dropna=False).ngroup().to_numpy()
+        _, first_positions = np.unique(codes, return_index=True)
+
+        unique_df = df.iloc[first_positions][self.KEY_COLUMNS].reset_index(drop=True)
+        unique_df['Count'] = np.bincount(codes)
+        self.inverse = codes
+
+        print(f"✅ {len(df):,} 行折叠为 {len(unique_df):,} 个唯一组合")
+        return unique_df
+
+    def expand(self, df, unique_scored):
+        """把唯一组合上的评分结果按行广播回原表"""
+        if self.inverse is None or len(self.inverse) != len(df):
+            raise ValueError("请先对同一个DataFrame调用collapse")
+
+        result_df = df if self.inplace else df.copy()
+        for column in unique_scored.columns:
+            if column in self.KEY_COLUMNS or column == 'Count':
+                continue
+            result_df[column] = unique_scored[column].iloc[self.inverse].set_axis(result_df.index)
+
+        return result_df
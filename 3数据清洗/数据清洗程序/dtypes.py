@@ -0,0 +1,120 @@
+"""
+数据类型模块 - 玩家配置数据的紧凑类型定义与分类列工具函数
+"""
+
+import pandas as pd
+import numpy as np
+from pandas.api.types import union_categoricals
+
+# 读取玩家配置CSV时使用的类型：硬件和设备类型列为分类类型
+# 年份不在读取时指定类型：原始数据中可能有"unknown"、空字符串等非数字值，由清洗流程转换
+PLAYER_DTYPES = {
+    'CPU': 'category',
+    'GPU': 'category',
+    'RAM': 'category',
+    'Storage': 'category',
+    'Type': 'category',
+}
+
+# 移除异常年份后的年份类型（异常值移除前可能超出int16范围）
+YEAR_DTYPE = 'int16'
+
+def is_categorical(series):
+    """判断Series是否为分类类型"""
+    return isinstance(series.dtype, pd.CategoricalDtype)
+
+def numeric_values(series):
+    """转为float64数值，无法解析的值为NaN
+
+    Arrow类型的列解析失败时结果中的NaN不被fillna视为缺失值，统一转为numpy的float64。
+    """
+    return pd.to_numeric(series, errors='coerce').astype('float64')
+
+def ensure_category(series, value):
+    """确保分类列包含指定类别，便于用该值填充或赋值"""
+    if is_categorical(series) and value not in series.cat.categories:
+        return series.cat.add_categories([value])
+    return series
+
+def fill_missing(series, value):
+    """填充缺失值，分类列自动补充类别"""
+    return ensure_category(series, value).fillna(value)
+
+def map_categories(series, func):
+    """对分类列的每个类别只调用一次func，结果仍为分类类型（类别可能合并）"""
+    mapped = [func(value) for value in series.cat.categories]
+    new_codes, new_categories = pd.factorize(pd.Series(mapped, dtype=object))
+    codes = series.cat.codes.to_numpy()
+    result_codes = np.where(codes >= 0, new_codes[codes], -1)
+    return pd.Series(
+        pd.Categorical.from_codes(result_codes, categories=new_categories),
+        index=series.index, name=series.name
+    )
+
+def take_by_codes(series, func, dtype=None):
+    """对分类列的每个类别计算func，再按类别编码广播回每一行（缺失值按func(nan)计算）"""
+    series = series.cat.remove_unused_categories()
+    values = [func(value) for value in series.cat.categories]
+    values.append(func(np.nan))
+    codes = series.cat.codes.to_numpy().astype(np.int64)
+    codes[codes < 0] = len(values) - 1
+    return np.asarray(values, dtype=dtype)[codes]
+
+def unify_chunk_categories(chunks):
+    """统一分块读取结果中分类列的类别，保证合并后仍为分类类型"""
+    if not chunks:
+        return chunks
+
+    for column in chunks[0].columns:
+        if is_categorical(chunks[0][column]):
+            categories = union_categoricals([chunk[column] for chunk in chunks]).categories
+            for chunk in chunks:
+                chunk[column] = chunk[column].cat.set_categories(categories)
+
+    return chunks
+
+# 评分列的紧凑类型：内存/硬盘分数是0~255的整数，用uint8；CPU/显卡分数带小数，和总分一样用float32
+SCORE_DTYPES = {
+    'CPU_Score': 'float32',
+    'GPU_Score': 'float32',
+    'RAM_Score': 'uint8',
+    'Storage_Score': 'uint8',
+    'Total_Score': 'float32',
+}
+
+# 带小数的分数（包括不能用uint8保存的分项分数）的类型
+FLOAT_SCORE_DTYPE = 'float32'
+
+# float32分数还原为float64时保留的小数位数：300以内的分数float32可精确区分到4位小数
+SCORE_DECIMALS = 4
+
+def score_dtype(column):
+    """评分列的目标类型，Total_Score_<方案名> 与Total_Score相同，非评分列返回None"""
+    if column.startswith('Total_Score_'):
+        column = 'Total_Score'
+    return SCORE_DTYPES.get(column)
+
+def compact_scores(values, dtype):
+    """把分数转为紧凑类型；整数类型放不下（有小数、缺失值或超出范围）时改用float32"""
+    values = np.asarray(values)
+    if np.dtype(dtype).kind == 'u':
+        as_float = values.astype(np.float64)
+        limit = np.iinfo(dtype).max
+        if not (np.all(as_float >= 0) and np.all(as_float <= limit) and np.all(as_float == np.trunc(as_float))):
+            dtype = FLOAT_SCORE_DTYPE
+    return values.astype(dtype)
+
+def enforce_score_dtypes(df):
+    """按SCORE_DTYPES原地转换DataFrame中的评分列"""
+    for column in df.columns:
+        dtype = score_dtype(column)
+        if dtype is not None and df[column].dtype != np.dtype(dtype):
+            df[column] = compact_scores(df[column].to_numpy(), dtype)
+    return df
+
+def score_array(values):
+    """评分列转为float64数组用于计算：float32分数按SCORE_DECIMALS位小数还原（82.3而不是82.30000305）"""
+    values = np.asarray(values)
+    if values.dtype == np.float32:
+        return np.round(values.astype(np.float64), SCORE_DECIMALS)
+    return values.astype(np.float64)
@@ -9,21 +9,96 @@ import difflib
 from collections import defaultdict
 import jellyfish
 from tqdm import tqdm
+from .dtypes import is_categorical
+from .ngram_index import NgramTfidfIndex
+from .bounded_cache import LRUCache
+from .canonical import canonical_cpu_key, canonical_gpu_key, cpu_key_variants
+from .keyword_matcher import KeywordMatcher
 
 class FuzzyMatcher:
     """模糊匹配器 - 处理不完全匹配的硬件名称"""
     
-    def __init__(self, cpu_dict, gpu_dict):
+    # GPU系列编码（候选项特征中使用）
+    GPU_SERIES_CODES = {'rtx': 1, 'gtx': 2, 'rx': 3}
+    
+    # 默认分数规则（按优先级排列）：(分数, [条件组])，组内关键词任一出现即满足，所有组满足时命中
+    CPU_DEFAULT_RULES = [
+        (75, [('i9', 'ryzen 9', 'threadripper')]),
+        (65, [('i7', 'ryzen 7')]),
+        (55, [('i5', 'ryzen 5')]),
+        (40, [('i3', 'ryzen 3')]),
+        (25, [('pentium', 'athlon')]),
+    ]
+    CPU_DEFAULT_SCORE = 30
+    
+    GPU_DEFAULT_RULES = [
+        # RTX 40系列
+        (88, [('rtx 4090',)]),
+        (80, [('rtx 4080',)]),
+        (65, [('rtx 4070',)]),
+        (50, [('rtx 4060',)]),
+        # RTX 30系列
+        (85, [('rtx 3090',)]),
+        (75, [('rtx 3080',)]),
+        (60, [('rtx 3070',)]),
+        (45, [('rtx 3060',)]),
+        # GTX系列
+        (35, [('gtx 1660',)]),
+        (30, [('gtx 1650',)]),
+        (25, [('gtx 1060',)]),
+        # AMD系列
+        (80, [('rx 7900',)]),
+        (65, [('rx 7800',)]),
+        (55, [('rx 7700',)]),
+        (45, [('rx 7600',)]),
+        (40, [('rx 6600',)]),
+        # 集成显卡
+        (15, [('intel',), ('uhd', 'iris')]),
+        (20, [('radeon',), ('vega',)]),
+    ]
+    GPU_DEFAULT_SCORE = 25
+    
+    # 匹配逻辑版本，变化时持久化缓存失效
+    CACHE_VERSION = 3
+    
+    # 批量匹配时n-gram余弦相似度的最低阈值
+    BATCH_CUTOFF = 0.3
+    
+    # 由评分表派生的索引（可由ConfigCache编译缓存）
+    INDEX_ATTRIBUTES = ['cpu_simplified', 'gpu_simplified', 'cpu_canonical', 'gpu_canonical',
+                        'cpu_features', 'gpu_features', 'cpu_blocks', 'gpu_blocks', 'ngram_indexes']
+    
+    def __init__(self, cpu_dict, gpu_dict, inplace=False, batch=False, batch_cutoff=None,
+                 cache_size=LRUCache.DEFAULT_CAPACITY, indexes=None):
         self.cpu_dict = cpu_dict
         self.gpu_dict = gpu_dict
-        self.cpu_cache = {}
-        self.gpu_cache = {}
+        # 原地模式：匹配结果直接作为新列写入传入的DataFrame
+        self.inplace = inplace
+        # 批量模式：唯一查询一次性向量化，用n-gram TF-IDF矩阵乘法代替逐条模糊匹配
+        self.batch = batch
+        self.batch_cutoff = batch_cutoff if batch_cutoff is not None else self.BATCH_CUTOFF
+        self.ngram_indexes = {}
+        # 有界LRU缓存（cache_size为每类硬件的条目上限，None表示不限制）
+        self.cpu_cache = LRUCache(cache_size)
+        self.gpu_cache = LRUCache(cache_size)
         
         # 统计信息
         self.stats = defaultdict(int)
         
-        # 构建简化名称映射
-        self._build_simplified_mappings()
+        # 默认分数规则编译为关键词自动机，每个名称只扫描一次
+        self.cpu_default_matcher = KeywordMatcher(self.CPU_DEFAULT_RULES, default=self.CPU_DEFAULT_SCORE)
+        self.gpu_default_matcher = KeywordMatcher(self.GPU_DEFAULT_RULES, default=self.GPU_DEFAULT_SCORE)
+        
+        if indexes is not None:
+            # 使用预先编译的派生索引（export_indexes的结果），不再重新构建
+            for name in self.INDEX_ATTRIBUTES:
+                setattr(self, name, indexes[name])
+        else:
+            # 构建简化名称映射
+            self._build_simplified_mappings()
+
+            # 构建分块索引（品牌/系列/代数），模糊匹配时只比较同一块内的候选项
+            self._build_blocking_index()
     
     def _build_simplified_mappings(self):
         """构建简化名称映射"""
@@ -42,6 +117,159 @@ class FuzzyMatcher:
             if simplified not in self.gpu_simplified:
                 self.gpu_simplified[simplified] = []
             self.gpu_simplified[simplified].append(full_name)
+        
+        # 规范键索引：CPU为 键 -> [名称]，GPU为 键 -> {显存: [名称]}
+        self.cpu_canonical = {}
+        for full_name in self.cpu_dict.keys():
+            key = canonical_cpu_key(full_name)
+            if key is not None:
+                self.cpu_canonical.setdefault(key, []).append(full_name)
+        
+        self.gpu_canonical = {}
+        for full_name in self.gpu_dict.keys():
+            key, memory = canonical_gpu_key(full_name)
+            if key is not None:
+                self.gpu_canonical.setdefault(key, {}).setdefault(memory, []).append(full_name)
+        
+        # 预计算候选项特征（小写名称、品牌、代数/系列），模糊匹配循环中不再做正则和大小写转换
+        self.cpu_features = self._build_cpu_features(list(self.cpu_dict.keys()))
+        self.gpu_features = self._build_gpu_features(list(self.gpu_dict.keys()))
+    
+    @staticmethod
+    def _build_sequence_matchers(lower_names):
+        """为每个候选项预建SequenceMatcher（候选项作为seq2，其字符索引只计算一次）"""
+        matchers = []
+        for lower_name in lower_names:
+            matcher = difflib.SequenceMatcher(None)
+            matcher.set_seq2(lower_name)
+            matchers.append(matcher)
+        return matchers
+    
+    def _cpu_query_features(self, cpu_name):
+        """CPU特征：(小写名称, 含intel, 含amd, 代数)，代数取自i5-13xxx中的13，无则为-1"""
+        lower_name = str(cpu_name).lower()
+        gen_match = re.search(r'i[3-9]-(\d{2})', lower_name)
+        generation = int(gen_match.group(1)) if gen_match else -1
+        return lower_name, 'intel' in lower_name, 'amd' in lower_name, generation
+    
+    def _gpu_query_features(self, gpu_name):
+        """GPU特征：(小写名称, 系列编码)，系列编码1/2/3对应rtx/gtx/rx，无则为0"""
+        lower_name = str(gpu_name).lower()
+        series_match = re.search(r'(rtx|gtx|rx)\s*(\d{4})', lower_name)
+        series = self.GPU_SERIES_CODES[series_match.group(1)] if series_match else 0
+        return lower_name, series
+    
+    def _build_cpu_features(self, names):
+        """构建CPU候选项特征数组"""
+        features = [self._cpu_query_features(name) for name in names]
+        lower_names = [feature[0] for feature in features]
+        return {
+            'names': np.array(names, dtype=object),
+            'matchers': self._build_sequence_matchers(lower_names),
+            'intel': np.array([feature[1] for feature in features], dtype=bool),
+            'amd': np.array([feature[2] for feature in features], dtype=bool),
+            'generation': np.array([feature[3] for feature in features], dtype=np.int16),
+        }
+    
+    def _build_gpu_features(self, names):
+        """构建GPU候选项特征数组"""
+        features = [self._gpu_query_features(name) for name in names]
+        lower_names = [feature[0] for feature in features]
+        return {
+            'names': np.array(names, dtype=object),
+            'matchers': self._build_sequence_matchers(lower_names),
+            'series': np.array([feature[1] for feature in features], dtype=np.int8),
+        }
+    
+    def _build_blocking_index(self):
+        """构建分块索引：每个候选项按(品牌, 系列, 代数)的各级前缀登记"""
+        self.cpu_blocks = self._build_blocks(self.cpu_features['names'], self._cpu_block_key)
+        self.gpu_blocks = self._build_blocks(self.gpu_features['names'], self._gpu_block_key)
+    
+    @staticmethod
+    def _build_blocks(names, key_func):
+        """按分块键的各级前缀建立 前缀 -> 候选项位置数组 的索引"""
+        blocks = defaultdict(list)
+        for position, name in enumerate(names):
+            key = key_func(name)
+            for level in range(1, len(key) + 1):
+                blocks[key[:level]].append(position)
+        return {key: np.array(positions, dtype=np.int32) for key, positions in blocks.items()}
+    
+    @staticmethod
+    def _lookup_block(blocks, key):
+        """从最细的一级开始查找非空候选块，找不到时返回None（需全表扫描）"""
+        for level in range(len(key), 0, -1):
+            candidates = blocks.get(key[:level])
+            if candidates is not None and len(candidates) > 0:
+                return candidates
+        return None
+    
+    @staticmethod
+    def _block_key(*parts):
+        """组装分块键，遇到缺失的部分即截断"""
+        key = []
+        for part in parts:
+            if part is None:
+                break
+            key.append(part)
+        return tuple(key)
+    
+    def _cpu_block_key(self, cpu_name):
+        """CPU分块键：(品牌, 系列, 代数)，如 ('intel', 'i5', '13')、('amd', 'ryzen 7', '7')"""
+        name = str(cpu_name).lower()
+        brand = series = generation = None
+        
+        intel_match = re.search(r'\bi([3579])[- ]?(\d{4,5})', name)
+        ryzen_match = re.search(r'ryzen\s*r?([3579])\s+(?:pro\s+)?(\d)\d{3}', name)
+        
+        if intel_match:
+            brand, series = 'intel', 'i' + intel_match.group(1)
+            model = intel_match.group(2)
+            # 5位型号前两位为代数（13600K -> 13），4位型号首位为代数（9900K -> 9）
+            generation = model[:2] if len(model) == 5 else model[:1]
+        elif 'core ultra' in name:
+            brand, series = 'intel', 'core ultra'
+        elif 'threadripper' in name:
+            brand, series = 'amd', 'threadripper'
+        elif ryzen_match:
+            brand, series = 'amd', 'ryzen ' + ryzen_match.group(1)
+            generation = ryzen_match.group(2)
+        elif 'ryzen' in name or 'amd' in name or 'athlon' in name:
+            brand = 'amd'
+        elif 'intel' in name or 'pentium' in name or 'celeron' in name:
+            brand = 'intel'
+        
+        return self._block_key(brand, series, generation)
+    
+    def _gpu_block_key(self, gpu_name):
+        """GPU分块键：(品牌, 系列, 代数)，如 ('nvidia', 'rtx', '40')、('amd', 'rx', '7')"""
+        name = str(gpu_name).lower()
+        brand = series = generation = None
+        
+        nvidia_match = re.search(r'(rtx|gtx)\s*(\d{3,4})', name)
+        amd_match = re.search(r'\brx\s*(\d{3,4})', name)
+        arc_match = re.search(r'arc\s*([a-z])\d{3}', name)
+        
+        if nvidia_match:
+            brand, series = 'nvidia', nvidia_match.group(1)
+            model = nvidia_match.group(2)
+            # 4位型号前两位为代数（4060 -> 40），3位型号首位为代数（960 -> 9）
+            generation = model[:2] if len(model) == 4 else model[:1]
+        elif amd_match:
+            brand, series = 'amd', 'rx'
+            generation = amd_match.group(1)[:1]
+        elif arc_match:
+            brand, series = 'intel', 'arc'
+            generation = arc_match.group(1)
+        elif 'nvidia' in name or 'geforce' in name:
+            brand = 'nvidia'
+        elif 'radeon' in name or 'amd' in name:
+            brand = 'amd'
+        elif 'intel' in name:
+            brand = 'intel'
+        
+        return self._block_key(brand, series, generation)
     
     def _simplify_cpu_name(self, cpu_name):
         """简化CPU名称"""
@@ -73,8 +301,6 @@ class FuzzyMatcher:
             r'GTX\s*\d{4,5}[A-Z\s]*',  # GTX 1660 SUPER
             r'RX\s*\d{4,5}[A-Z\s]*',  # RX 6600 XT
             r'ARC\s*[A-Z]\d{3}',  # ARC A580
-            r'GEFORCE\s*RTX\s*\d{4,5}[A-Z\s]*',
-            r'RADEON\s*RX\s*\d{4,5}[A-Z\s]*',
         ]
         
         for pattern in patterns:
@@ -84,53 +310,95 @@ class FuzzyMatcher:
         
         return re.sub(r'\s+', ' ', gpu_name).strip()
     
-    def match_all(self, df):
-        """为DataFrame中的所有行进行匹配"""
+    def match_all(self, df, weights=None):
+        """为DataFrame中的所有行进行匹配
+        
+        weights为每行代表的原始行数（如去重后的Count列），用于按原始行数统计。
+        """
         print("🔄 开始模糊匹配...")
         
-        # 创建结果DataFrame
-        result_df = df.copy()
+        # 创建结果DataFrame（原地模式下直接添加列）
+        result_df = df if self.inplace else df.copy()
         
         # 匹配CPU
         print("匹配CPU...")
-        cpu_scores = []
-        cpu_matches = []
-        
-        for cpu in tqdm(df['CPU'], desc="CPU匹配"):
-            score, match = self.match_cpu(cpu)
-            cpu_scores.append(score)
-            cpu_matches.append(match)
-        
-        result_df['CPU_Score'] = cpu_scores
-        result_df['CPU_Match'] = cpu_matches
+        result_df['CPU_Score'], result_df['CPU_Match'] = self._match_column(df['CPU'], 'cpu', "CPU匹配")
         
         # 匹配GPU
         print("匹配GPU...")
-        gpu_scores = []
-        gpu_matches = []
+        result_df['GPU_Score'], result_df['GPU_Match'] = self._match_column(df['GPU'], 'gpu', "GPU匹配")
         
-        for gpu in tqdm(df['GPU'], desc="GPU匹配"):
-            score, match = self.match_gpu(gpu)
-            gpu_scores.append(score)
-            gpu_matches.append(match)
+        # 更新统计（分类列转换为对象数组后逐行比较）
+        cpu_values = np.asarray(result_df['CPU'], dtype=object)
+        cpu_matched = np.asarray(result_df['CPU_Match'], dtype=object)
+        gpu_values = np.asarray(result_df['GPU'], dtype=object)
+        gpu_matched = np.asarray(result_df['GPU_Match'], dtype=object)
         
-        result_df['GPU_Score'] = gpu_scores
-        result_df['GPU_Match'] = gpu_matches
+        row_weights = np.ones(len(df), dtype=np.int64) if weights is None else np.asarray(weights)
         
-        # 更新统计
-        self.stats['total_rows'] = len(df)
-        self.stats['cpu_exact_match'] = (result_df['CPU_Match'] == result_df['CPU']).sum()
-        self.stats['cpu_fuzzy_match'] = ((result_df['CPU_Match'] != result_df['CPU']) & 
-                                        (result_df['CPU_Match'] != 'Unknown')).sum()
-        self.stats['cpu_no_match'] = (result_df['CPU_Match'] == 'Unknown').sum()
+        self.stats['total_rows'] = row_weights.sum()
+        self.stats['cpu_exact_match'] = row_weights[cpu_matched == cpu_values].sum()
+        self.stats['cpu_fuzzy_match'] = row_weights[(cpu_matched != cpu_values) & 
+                                                    (cpu_matched != 'Unknown')].sum()
+        self.stats['cpu_no_match'] = row_weights[cpu_matched == 'Unknown'].sum()
         
-        self.stats['gpu_exact_match'] = (result_df['GPU_Match'] == result_df['GPU']).sum()
-        self.stats['gpu_fuzzy_match'] = ((result_df['GPU_Match'] != result_df['GPU']) & 
-                                        (result_df['GPU_Match'] != 'Unknown')).sum()
-        self.stats['gpu_no_match'] = (result_df['GPU_Match'] == 'Unknown').sum()
+        self.stats['gpu_exact_match'] = row_weights[gpu_matched == gpu_values].sum()
+        self.stats['gpu_fuzzy_match'] = row_weights[(gpu_matched != gpu_values) & 
+                                                    (gpu_matched != 'Unknown')].sum()
+        self.stats['gpu_no_match'] = row_weights[gpu_matched == 'Unknown'].sum()
         
         return result_df
     
+    def _match_column(self, series, kind, desc):
+        """匹配一列硬件名称，返回(分数列表, 匹配名称列表)"""
+        match_func = self.match_cpu if kind == 'cpu' else self.match_gpu
+        
+        if self.batch:
+            if is_categorical(series):
+                series = series.cat.remove_unused_categories()
+                codes, uniques = series.cat.codes.to_numpy(), list(series.cat.categories)
+            else:
+                codes, uniques = pd.factorize(series)
+                uniques = list(uniques)
+            print(f"{desc}: {len(uniques):,} 个唯一名称批量匹配")
+            results = self.match_batch(uniques, kind)
+            results.append(match_func(np.nan))
+            return self._broadcast_results(results, codes)
+        
+        if is_categorical(series):
+            return self._match_categorical(series, match_func, desc)
+        
+        scores = []
+        matches = []
+        
+        for value in tqdm(series, desc=desc):
+            score, match = match_func(value)
+            scores.append(score)
+            matches.append(match)
+        
+        return scores, matches
+    
+    def _match_categorical(self, series, match_func, desc):
+        """分类列只匹配每个类别一次，再按类别编码广播回每一行"""
+        series = series.cat.remove_unused_categories()
+        results = [match_func(value) for value in tqdm(series.cat.categories, desc=desc)]
+        # 缺失值（编码-1）对应最后一个结果
+        results.append(match_func(np.nan))
+        
+        return self._broadcast_results(results, series.cat.codes.to_numpy())
+    
+    @staticmethod
+    def _broadcast_results(results, codes):
+        """按编码把唯一值的(分数, 匹配名称)广播回每一行，编码-1对应最后一个结果"""
+        codes = codes.astype(np.int64)
+        codes[codes < 0] = len(results) - 1
+        
+        scores = np.array([score for score, _ in results])[codes]
+        match_codes, match_names = pd.factorize(pd.Series([match for _, match in results], dtype=object))
+        matches = pd.Categorical.from_codes(match_codes[codes], categories=match_names)
+        
+        return scores, matches
+    
     def match_cpu(self, query):
         """匹配CPU型号"""
         if pd.isna(query) or query == 'Unknown':
@@ -140,10 +408,33 @@ class FuzzyMatcher:
         query_str = str(query).strip()
         
         # 检查缓存
-        if query_str in self.cpu_cache:
+        cached = self.cpu_cache.get(query_str)
+        if cached is not None:
             self.stats['cpu_cache_hit'] += 1
-            return self.cpu_cache[query_str]
+            return cached
+        
+        # 1-3. 精确匹配、规范键匹配和简化匹配
+        result = self._match_cpu_precise(query_str)
+        if result is not None:
+            return result
         
+        # 4. 模糊匹配
+        best_match = self._fuzzy_match_cpu(query_str)
+        if best_match:
+            self.stats['cpu_fuzzy'] += 1
+            result = (self.cpu_dict[best_match], best_match)
+            self.cpu_cache[query_str] = result
+            return result
+        
+        # 5. 默认分数
+        self.stats['cpu_default'] += 1
+        default_score = self._get_default_cpu_score(query_str)
+        result = (default_score, f"Default: {query_str}")
+        self.cpu_cache[query_str] = result
+        return result
+    
+    def _match_cpu_precise(self, query_str):
+        """CPU精确匹配、规范键匹配和简化匹配，未命中时返回None"""
         # 1. 精确匹配
         if query_str in self.cpu_dict:
             self.stats['cpu_exact'] += 1
@@ -151,7 +442,17 @@ class FuzzyMatcher:
             self.cpu_cache[query_str] = result
             return result
         
-        # 2. 简化匹配
+        # 2. 规范键匹配（型号键相同即视为同一型号）
+        candidates = self._canonical_cpu_candidates(query_str)
+        if candidates:
+            best_match = candidates[0] if len(candidates) == 1 else self._find_best_match(query_str, candidates)
+            if best_match is not None:
+                self.stats['cpu_canonical'] += 1
+                result = (self.cpu_dict[best_match], best_match)
+                self.cpu_cache[query_str] = result
+                return result
+        
+        # 3. 简化匹配
         simplified_query = self._simplify_cpu_name(query_str)
         
         if simplified_query in self.cpu_simplified:
@@ -162,27 +463,22 @@ class FuzzyMatcher:
                 self.cpu_cache[query_str] = result
                 return result
             
-            # 多个候选项，选择最相似的
+            # 多个候选项，选择最相似的（都不够相似时交给模糊匹配）
             best_match = self._find_best_match(query_str, candidates)
-            self.stats['cpu_simplified_fuzzy'] += 1
-            result = (self.cpu_dict[best_match], best_match)
-            self.cpu_cache[query_str] = result
-            return result
-        
-        # 3. 模糊匹配
-        best_match = self._fuzzy_match_cpu(query_str)
-        if best_match:
-            self.stats['cpu_fuzzy'] += 1
-            result = (self.cpu_dict[best_match], best_match)
-            self.cpu_cache[query_str] = result
-            return result
+            if best_match is not None:
+                self.stats['cpu_simplified_fuzzy'] += 1
+                result = (self.cpu_dict[best_match], best_match)
+                self.cpu_cache[query_str] = result
+                return result
         
-        # 4. 默认分数
-        self.stats['cpu_default'] += 1
-        default_score = self._get_default_cpu_score(query_str)
-        result = (default_score, f"Default: {query_str}")
-        self.cpu_cache[query_str] = result
-        return result
+        return None
+    
+    def _canonical_cpu_candidates(self, query_str):
+        """规范键相同的CPU候选项（F型号找不到时再用非F型号），无则返回None"""
+        for key in cpu_key_variants(canonical_cpu_key(query_str)):
+            if key in self.cpu_canonical:
+                return self.cpu_canonical[key]
+        return None
     
     def match_gpu(self, query):
         """匹配GPU型号"""
@@ -193,10 +489,33 @@ class FuzzyMatcher:
         query_str = str(query).strip()
         
         # 检查缓存
-        if query_str in self.gpu_cache:
+        cached = self.gpu_cache.get(query_str)
+        if cached is not None:
             self.stats['gpu_cache_hit'] += 1
-            return self.gpu_cache[query_str]
+            return cached
+        
+        # 1-3. 精确匹配、规范键匹配和简化匹配
+        result = self._match_gpu_precise(query_str)
+        if result is not None:
+            return result
+        
+        # 4. 模糊匹配
+        best_match = self._fuzzy_match_gpu(query_str)
+        if best_match:
+            self.stats['gpu_fuzzy'] += 1
+            result = (self.gpu_dict[best_match], best_match)
+            self.gpu_cache[query_str] = result
+            return result
         
+        # 5. 默认分数
+        self.stats['gpu_default'] += 1
+        default_score = self._get_default_gpu_score(query_str)
+        result = (default_score, f"Default: {query_str}")
+        self.gpu_cache[query_str] = result
+        return result
+    
+    def _match_gpu_precise(self, query_str):
+        """GPU精确匹配、规范键匹配和简化匹配，未命中时返回None"""
         # 1. 精确匹配
         if query_str in self.gpu_dict:
             self.stats['gpu_exact'] += 1
@@ -204,7 +523,17 @@ class FuzzyMatcher:
             self.gpu_cache[query_str] = result
             return result
         
-        # 2. 简化匹配
+        # 2. 规范键匹配（型号键相同即视为同一型号）
+        candidates = self._canonical_gpu_candidates(query_str)
+        if candidates:
+            best_match = candidates[0] if len(candidates) == 1 else self._find_best_match(query_str, candidates)
+            if best_match is not None:
+                self.stats['gpu_canonical'] += 1
+                result = (self.gpu_dict[best_match], best_match)
+                self.gpu_cache[query_str] = result
+                return result
+        
+        # 3. 简化匹配
         simplified_query = self._simplify_gpu_name(query_str)
         
         if simplified_query in self.gpu_simplified:
@@ -215,27 +544,133 @@ class FuzzyMatcher:
                 self.gpu_cache[query_str] = result
                 return result
             
-            # 多个候选项，选择最相似的
+            # 多个候选项，选择最相似的（都不够相似时交给模糊匹配）
             best_match = self._find_best_match(query_str, candidates)
-            self.stats['gpu_simplified_fuzzy'] += 1
-            result = (self.gpu_dict[best_match], best_match)
-            self.gpu_cache[query_str] = result
-            return result
-        
-        # 3. 模糊匹配
-        best_match = self._fuzzy_match_gpu(query_str)
-        if best_match:
-            self.stats['gpu_fuzzy'] += 1
-            result = (self.gpu_dict[best_match], best_match)
-            self.gpu_cache[query_str] = result
-            return result
+            if best_match is not None:
+                self.stats['gpu_simplified_fuzzy'] += 1
+                result = (self.gpu_dict[best_match], best_match)
+                self.gpu_cache[query_str] = result
+                return result
         
-        # 4. 默认分数
-        self.stats['gpu_default'] += 1
-        default_score = self._get_default_gpu_score(query_str)
-        result = (default_score, f"Default: {query_str}")
-        self.gpu_cache[query_str] = result
-        return result
+        return None
+    
+    def _canonical_gpu_candidates(self, query_str):
+        """规范键相同的GPU候选项：显存一致的优先，否则取该型号的全部显存版本；无则返回None"""
+        key, memory = canonical_gpu_key(query_str)
+        variants = self.gpu_canonical.get(key)
+        if not variants:
+            return None
+        if memory in variants:
+            return variants[memory]
+        return [name for names in variants.values() for name in names]
+    
+    def match_batch(self, queries, kind):
+        """批量匹配唯一查询字符串，返回与queries对齐的(分数, 匹配名称)列表
+        
+        精确、规范键和简化匹配逐条完成；剩余的查询一次性转为n-gram TF-IDF稀疏矩阵，
+        与逐条模糊匹配一样按分块和同系列加权取相似度最高者，低于阈值时使用默认分数。
+        """
+        match_func = self.match_cpu if kind == 'cpu' else self.match_gpu
+        precise_func = self._match_cpu_precise if kind == 'cpu' else self._match_gpu_precise
+        default_func = self._get_default_cpu_score if kind == 'cpu' else self._get_default_gpu_score
+        score_dict = self.cpu_dict if kind == 'cpu' else self.gpu_dict
+        cache = self.cpu_cache if kind == 'cpu' else self.gpu_cache
+        
+        results = [None] * len(queries)
+        pending = []
+        
+        for i, query in enumerate(queries):
+            if pd.isna(query) or query == 'Unknown':
+                results[i] = match_func(query)
+                continue
+            
+            query_str = str(query).strip()
+            cached = cache.get(query_str)
+            if cached is not None:
+                self.stats[f'{kind}_cache_hit'] += 1
+                results[i] = cached
+                continue
+            
+            result = precise_func(query_str)
+            if result is not None:
+                results[i] = result
+            else:
+                pending.append((i, query_str))
+        
+        if not pending:
+            return results
+        
+        # 4. 批量模糊匹配（同一批内重复的查询只计算一次）
+        pending_queries = list(dict.fromkeys(query_str for _, query_str in pending))
+        best_names = self._batch_best_matches(kind, pending_queries)
+        
+        # 结果先放在本地字典，缓存容量小于本批数量时条目可能已被淘汰
+        resolved = {}
+        for query_str, best_match in zip(pending_queries, best_names):
+            if best_match is not None:
+                self.stats[f'{kind}_fuzzy'] += 1
+                resolved[query_str] = (score_dict[best_match], best_match)
+            else:
+                # 5. 默认分数
+                self.stats[f'{kind}_default'] += 1
+                resolved[query_str] = (default_func(query_str), f"Default: {query_str}")
+            cache[query_str] = resolved[query_str]
+        
+        for i, query_str in pending:
+            results[i] = resolved[query_str]
+        
+        return results
+    
+    def export_indexes(self):
+        """由评分表派生的全部索引（含n-gram索引），供编译缓存保存后传给构造函数的indexes参数"""
+        for kind in ('cpu', 'gpu'):
+            self._get_ngram_index(kind)
+        return {name: getattr(self, name) for name in self.INDEX_ATTRIBUTES}
+    
+    def build_indexes(self):
+        """提前构建按需创建的索引（批量模式的n-gram索引），多进程时在fork前调用，工作进程共享同一份"""
+        if self.batch:
+            for kind in ('cpu', 'gpu'):
+                self._get_ngram_index(kind)
+    
+    def _batch_best_matches(self, kind, queries):
+        """n-gram相似度的最佳候选项：先在分块内查找，未达到阈值时回退到全部候选项，仍未达到时为None
+        
+        与_fuzzy_match_cpu/_fuzzy_match_gpu的分块和同系列加权一致（如RX 9070 XT只在RX块内比较）。
+        """
+        index = self._get_ngram_index(kind)
+        if kind == 'cpu':
+            blocks, block_key, weight_func = self.cpu_blocks, self._cpu_block_key, self._cpu_weights
+        else:
+            blocks, block_key, weight_func = self.gpu_blocks, self._gpu_block_key, self._gpu_weights
+        all_candidates = np.arange(len(index.names))
+        
+        best_names = []
+        for query, similarity in zip(queries, index.similarities(queries)):
+            best_name = None
+            candidates = self._lookup_block(blocks, block_key(query))
+            if candidates is not None:
+                best_name = self._best_candidate(index.names, similarity, candidates, weight_func(query, candidates))
+                if best_name is None:
+                    self.stats[f'{kind}_block_fallback'] += 1
+            if best_name is None:
+                best_name = self._best_candidate(index.names, similarity, all_candidates,
+                                                 weight_func(query, all_candidates))
+            best_names.append(best_name)
+        return best_names
+    
+    def _best_candidate(self, names, similarity, candidates, weights):
+        """候选项（位置数组）中加权相似度最高者，低于批量阈值时为None"""
+        scores = similarity[candidates] * weights
+        best = scores.argmax()
+        return names[candidates[best]] if scores[best] >= self.batch_cutoff else None
+    
+    def _get_ngram_index(self, kind):
+        """按需构建CPU/GPU候选项的n-gram TF-IDF索引"""
+        if kind not in self.ngram_indexes:
+            names = self.cpu_dict.keys() if kind == 'cpu' else self.gpu_dict.keys()
+            self.ngram_indexes[kind] = NgramTfidfIndex(names)
+        return self.ngram_indexes[kind]
     
     def _find_best_match(self, query, candidates):
         """在候选项中寻找最佳匹配"""
@@ -259,143 +694,132 @@ class FuzzyMatcher:
         return best_match if best_score > 0.6 else None
     
     def _fuzzy_match_cpu(self, query):
-        """模糊匹配CPU"""
-        # 在全部CPU名称中查找相似项
-        query_lower = query.lower()
-        best_match = None
-        best_score = 0
+        """模糊匹配CPU - 先在分块内查找，未达到阈值时回退到全表扫描"""
+        candidates = self._lookup_block(self.cpu_blocks, self._cpu_block_key(query))
         
-        for cpu_name in self.cpu_dict.keys():
-            # 检查是否为同一系列
-            is_same_series = False
-            
-            # Intel Core系列
-            if ('intel' in query_lower and 'intel' in cpu_name.lower()) or \
-               ('amd' in query_lower and 'amd' in cpu_name.lower()):
-                
-                # 检查代数（如i5-13xxx vs i5-14xxx）
-                query_gen = re.search(r'i[3-9]-(\d{2})', query_lower)
-                cpu_gen = re.search(r'i[3-9]-(\d{2})', cpu_name.lower())
-                
-                if query_gen and cpu_gen:
-                    # 同一代CPU
-                    if query_gen.group(1) == cpu_gen.group(1):
-                        is_same_series = True
-            
-            # 计算相似度
-            similarity = difflib.SequenceMatcher(None, query_lower, cpu_name.lower()).ratio()
-            
-            # 如果是同一系列，提高权重
-            if is_same_series:
-                similarity *= 1.2
-            
-            if similarity > best_score:
-                best_score = similarity
-                best_match = cpu_name
+        if candidates is not None:
+            best_match, best_score = self._scan_cpu(query, candidates)
+            if best_score > 0.7:
+                return best_match
+            self.stats['cpu_block_fallback'] += 1
         
+        # 在全部CPU名称中查找相似项
+        best_match, best_score = self._scan_cpu(query, np.arange(len(self.cpu_features['names'])))
         return best_match if best_score > 0.7 else None
     
+    def _scan_cpu(self, query, candidates):
+        """在候选CPU（位置数组）中查找最相似项，返回(最佳匹配, 相似度)"""
+        weights = self._cpu_weights(query, candidates)
+        return self._scan_candidates(str(query).lower(), candidates, weights, self.cpu_features)
+    
+    def _cpu_weights(self, query, candidates):
+        """候选CPU的相似度权重：同品牌且同一代（如i5-13xxx vs i7-13xxx）为1.2，其余为1.0"""
+        features = self.cpu_features
+        _, query_intel, query_amd, query_gen = self._cpu_query_features(query)
+        
+        if query_gen >= 0:
+            same_brand = (query_intel & features['intel'][candidates]) | (query_amd & features['amd'][candidates])
+            same_series = same_brand & (features['generation'][candidates] == query_gen)
+        else:
+            same_series = np.zeros(len(candidates), dtype=bool)
+        return np.where(same_series, 1.2, 1.0)
+    
     def _fuzzy_match_gpu(self, query):
-        """模糊匹配GPU"""
-        query_lower = query.lower()
-        best_match = None
+        """模糊匹配GPU - 先在分块内查找，未达到阈值时回退到全表扫描"""
+        candidates = self._lookup_block(self.gpu_blocks, self._gpu_block_key(query))
+        
+        if candidates is not None:
+            best_match, best_score = self._scan_gpu(query, candidates)
+            if best_score > 0.7:
+                return best_match
+            self.stats['gpu_block_fallback'] += 1
+        
+        # 在全部GPU名称中查找相似项
+        best_match, best_score = self._scan_gpu(query, np.arange(len(self.gpu_features['names'])))
+        return best_match if best_score > 0.7 else None
+    
+    def _scan_gpu(self, query, candidates):
+        """在候选GPU（位置数组）中查找最相似项，返回(最佳匹配, 相似度)"""
+        weights = self._gpu_weights(query, candidates)
+        return self._scan_candidates(str(query).lower(), candidates, weights, self.gpu_features)
+    
+    def _gpu_weights(self, query, candidates):
+        """候选GPU的相似度权重：同一系列（如RTX 4060 vs RTX 4070）为1.2，其余为1.0"""
+        _, query_series = self._gpu_query_features(query)
+        
+        if query_series > 0:
+            same_series = self.gpu_features['series'][candidates] == query_series
+        else:
+            same_series = np.zeros(len(candidates), dtype=bool)
+        return np.where(same_series, 1.2, 1.0)
+    
+    def _scan_candidates(self, query_lower, candidates, weights, features):
+        """相似度主循环：只计算序列相似度，特征与权重已预先算好"""
+        matchers = features['matchers']
+        best_position = None
         best_score = 0
         
-        for gpu_name in self.gpu_dict.keys():
-            # 检查是否为同一品牌和系列
-            is_same_series = False
+        for position, weight in zip(candidates.tolist(), weights.tolist()):
+            matcher = matchers[position]
+            matcher.set_seq1(query_lower)
             
-            # 检查RTX/GTX系列
-            query_series = re.search(r'(rtx|gtx|rx)\s*(\d{4})', query_lower)
-            gpu_series = re.search(r'(rtx|gtx|rx)\s*(\d{4})', gpu_name.lower())
+            # 上界不超过当前最佳时跳过完整计算（quick_ratio是ratio的上界，结果不变）
+            if matcher.real_quick_ratio() * weight <= best_score or \
+               matcher.quick_ratio() * weight <= best_score:
+                continue
             
-            if query_series and gpu_series:
-                # 同一系列（如RTX 4060 vs RTX 4070）
-                if query_series.group(1) == gpu_series.group(1):
-                    is_same_series = True
-            
-            # 计算相似度
-            similarity = difflib.SequenceMatcher(None, query_lower, gpu_name.lower()).ratio()
-            
-            # 如果是同一系列，提高权重
-            if is_same_series:
-                similarity *= 1.2
+            similarity = matcher.ratio() * weight
             
             if similarity > best_score:
                 best_score = similarity
-                best_match = gpu_name
+                best_position = position
         
-        return best_match if best_score > 0.7 else None
+        best_match = features['names'][best_position] if best_position is not None else None
+        return best_match, best_score
     
     def _get_default_cpu_score(self, cpu_name):
         """获取默认CPU分数"""
-        cpu_name = cpu_name.lower()
-        
-        if 'i9' in cpu_name or 'ryzen 9' in cpu_name or 'threadripper' in cpu_name:
-            return 75
-        elif 'i7' in cpu_name or 'ryzen 7' in cpu_name:
-            return 65
-        elif 'i5' in cpu_name or 'ryzen 5' in cpu_name:
-            return 55
-        elif 'i3' in cpu_name or 'ryzen 3' in cpu_name:
-            return 40
-        elif 'pentium' in cpu_name or 'athlon' in cpu_name:
-            return 25
-        else:
-            return 30
+        return self.cpu_default_matcher.match(cpu_name)
     
     def _get_default_gpu_score(self, gpu_name):
         """获取默认GPU分数"""
-        gpu_name = gpu_name.lower()
-        
-        # RTX 40系列
-        if 'rtx 4090' in gpu_name:
-            return 88
-        elif 'rtx 4080' in gpu_name:
-            return 80
-        elif 'rtx 4070' in gpu_name:
-            return 65
-        elif 'rtx 4060' in gpu_name:
-            return 50
-        
-        # RTX 30系列
-        elif 'rtx 3090' in gpu_name:
-            return 85
-        elif 'rtx 3080' in gpu_name:
-            return 75
-        elif 'rtx 3070' in gpu_name:
-            return 60
-        elif 'rtx 3060' in gpu_name:
-            return 45
-        
-        # GTX系列
-        elif 'gtx 1660' in gpu_name:
-            return 35
-        elif 'gtx 1650' in gpu_name:
-            return 30
-        elif 'gtx 1060' in gpu_name:
-            return 25
-        
-        # AMD系列
-        elif 'rx 7900' in gpu_name:
-            return 80
-        elif 'rx 7800' in gpu_name:
-            return 65
-        elif 'rx 7700' in gpu_name:
-            return 55
-        elif 'rx 7600' in gpu_name:
-            return 45
-        elif 'rx 6600' in gpu_name:
-            return 40
-        
-        # 集成显卡
-        elif 'intel' in gpu_name and ('uhd' in gpu_name or 'iris' in gpu_name):
-            return 15
-        elif 'radeon' in gpu_name and ('vega' in gpu_name):
-            return 20
-        
-        else:
-            return 25
+        return self.gpu_default_matcher.match(gpu_name)
+    
+    def cache_signature(self):
+        """影响匹配结果的参数，与评分表指纹一起作为持久化缓存的版本"""
+        if self.batch:
+            return f"v{self.CACHE_VERSION}:batch:{self.batch_cutoff}"
+        return f"v{self.CACHE_VERSION}:scan"
+    
+    def update_caches(self, cpu_entries, gpu_entries):
+        """加入已知的匹配结果（来自持久化缓存或工作进程）"""
+        self.cpu_cache.update(cpu_entries)
+        self.gpu_cache.update(gpu_entries)
+    
+    def load_cache(self, match_cache):
+        """从持久化缓存加载上次运行的匹配结果"""
+        self.update_caches(match_cache.load('cpu'), match_cache.load('gpu'))
+        print(f"💾 已加载匹配缓存: CPU({len(self.cpu_cache):,}), GPU({len(self.gpu_cache):,})")
+    
+    def save_cache(self, match_cache):
+        """把本次的匹配结果写回持久化缓存"""
+        match_cache.save('cpu', self.cpu_cache)
+        match_cache.save('gpu', self.gpu_cache)
+        print(f"💾 匹配缓存已保存: {match_cache.path}")
+    
+    def cache_statistics(self):
+        """缓存命中/未命中/淘汰计数（含从工作进程合并的计数）"""
+        counters = {}
+        for kind, cache in (('cpu', self.cpu_cache), ('gpu', self.gpu_cache)):
+            for name, value in cache.counters().items():
+                key = f'{kind}_cache_{name}'
+                counters[key] = value + self.stats[key]
+        return counters
+    
+    def merge_statistics(self, stats):
+        """合并其他匹配器（如工作进程）的统计计数"""
+        for key, value in stats.items():
+            self.stats[key] += value
     
     def get_statistics(self):
         """获取匹配统计"""
@@ -403,6 +827,10 @@ class FuzzyMatcher:
             '匹配类型': 'CPU精确匹配',
             '数量': self.stats['cpu_exact'],
             '百分比': f"{self.stats['cpu_exact']/self.stats['total_rows']:.2%}" if self.stats['total_rows'] > 0 else '0%'
+        }, {
+            '匹配类型': 'CPU规范键匹配',
+            '数量': self.stats['cpu_canonical'],
+            '百分比': f"{self.stats['cpu_canonical']/self.stats['total_rows']:.2%}" if self.stats['total_rows'] > 0 else '0%'
         }, {
             '匹配类型': 'CPU简化匹配',
             '数量': self.stats['cpu_simplified_exact'] + self.stats['cpu_simplified_fuzzy'],
@@ -419,6 +847,10 @@ class FuzzyMatcher:
             '匹配类型': 'GPU精确匹配',
             '数量': self.stats['gpu_exact'],
             '百分比': f"{self.stats['gpu_exact']/self.stats['total_rows']:.2%}" if self.stats['total_rows'] > 0 else '0%'
+        }, {
+            '匹配类型': 'GPU规范键匹配',
+            '数量': self.stats['gpu_canonical'],
+            '百分比': f"{self.stats['gpu_canonical']/self.stats['total_rows']:.2%}" if self.stats['total_rows'] > 0 else '0%'
         }, {
             '匹配类型': 'GPU简化匹配',
             '数量': self.stats['gpu_simplified_exact'] + self.stats['gpu_simplified_fuzzy'],
@@ -433,4 +865,26 @@ class FuzzyMatcher:
             '百分比': f"{self.stats['gpu_default']/self.stats['total_rows']:.2%}" if self.stats['total_rows'] > 0 else '0%'
         }])
         
+        # 缓存计数
+        cache_counters = self.cache_statistics()
+        cache_rows = []
+        for kind, label in (('cpu', 'CPU'), ('gpu', 'GPU')):
+            hits = cache_counters[f'{kind}_cache_hits']
+            misses = cache_counters[f'{kind}_cache_misses']
+            lookups = hits + misses
+            cache_rows.extend([{
+                '匹配类型': f'{label}缓存命中',
+                '数量': hits,
+                '百分比': f"{hits/lookups:.2%}" if lookups > 0 else '0%'
+            }, {
+                '匹配类型': f'{label}缓存未命中',
+                '数量': misses,
+                '百分比': f"{misses/lookups:.2%}" if lookups > 0 else '0%'
+            }, {
+                '匹配类型': f'{label}缓存淘汰',
+                '数量': cache_counters[f'{kind}_cache_evictions'],
+                '百分比': '-'
+            }])
+        stats_df = pd.concat([stats_df, pd.DataFrame(cache_rows)], ignore_index=True)
+        
         return stats_df
\ No newline at end of file
@@ -0,0 +1,216 @@
+"""
+游戏配置评分模块 - 对Steam游戏的最低/推荐配置要求批量匹配和评分
+"""
+
+import re
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+
+class GameRequirementScorer:
+    """游戏配置评分器 - 拆分配置要求中的备选硬件，去重后统一模糊匹配，输出最低/推荐配置分数"""
+
+    # 配置级别及对应的列名前缀
+    LEVELS = ['最低', '推荐']
+
+    # 默认综合性能分权重（与游戏配置数据.xlsx一致，不含硬盘）
+    DEFAULT_WEIGHTS = {'GPU': 0.5, 'CPU': 0.3, 'RAM': 0.2}
+
+    # 中文厂商名和常见笔误
+    VENDOR_NAMES = {
+        '英特尔': 'Intel',
+        '酷睿': 'Core',
+        '奔腾': 'Pentium',
+        '赛扬': 'Celeron',
+        '锐龙': 'Ryzen',
+        '速龙': 'Athlon',
+        '超威': 'AMD',
+        '英伟达': 'NVIDIA',
+        '镭龙': 'Radeon',
+        '锐炫': 'Arc',
+        'lntel': 'Intel',
+    }
+
+    # 备选项之间的分隔符
+    SEPARATOR_PATTERN = re.compile(r'\s+/\s+|/|\|\s*|;|；|,|，|、|\bor\b|或者|或', re.IGNORECASE)
+
+    # 与型号无关的描述
+    NOISE_PATTERNS = [
+        r'[®™©]',
+        r'\((?:R|TM)\)',
+        r'\bor\s+(?:higher|better|equivalent|similar|above)\b',
+        r'\b(?:equivalent|similar|or higher|or better)\b',
+        r'或以上|或更高|及以上|以上|或同等|同等级|或类似显卡|或类似',
+        r'\bwith\b',
+    ]
+
+    # 容量（数值 + 单位），兼容西里尔字母М/Б
+    CAPACITY_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*([KMGT])\s*[BБ]', re.IGNORECASE)
+    UNIT_TO_GB = {'K': 1 / 1024 ** 2, 'M': 1 / 1024, 'G': 1, 'T': 1024}
+
+    def __init__(self, fuzzy_matcher, ram_dict, storage_dict, combine='first', weights=None):
+        self.fuzzy_matcher = fuzzy_matcher
+        self.ram_tiers = self._build_tiers(ram_dict)
+        self.storage_tiers = self._build_tiers(storage_dict)
+        # 多个备选硬件的合并方式：first（第一个能识别的备选）、min、max、mean
+        if combine not in ('first', 'min', 'max', 'mean'):
+            raise ValueError(f"不支持的合并方式: {combine}")
+        self.combine = combine
+        # 综合性能分权重：weights只需给出要修改的项（键为GPU/CPU/RAM）
+        weights = weights or {}
+        unknown = set(weights) - set(self.DEFAULT_WEIGHTS)
+        if unknown:
+            raise ValueError(f"未知的权重项: {', '.join(sorted(unknown))}（游戏评分只支持GPU/CPU/RAM）")
+        self.weights = dict(self.DEFAULT_WEIGHTS)
+        self.weights.update({key: float(value) for key, value in weights.items()})
+
+    @classmethod
+    def _parse_capacity(cls, text):
+        """解析第一个容量值，单位统一为GB；解析失败返回NaN"""
+        if pd.isna(text):
+            return np.nan
+        text = str(text).replace('М', 'M')
+        match = cls.CAPACITY_PATTERN.search(text)
+        if not match:
+            return np.nan
+        return float(match.group(1)) * cls.UNIT_TO_GB[match.group(2).upper()]
+
+    def _build_tiers(self, score_dict):
+        """把评分表（如 '16GB' -> 60、'4TB及以上' -> 100）整理为按容量升序的(容量数组, 分数数组)"""
+        tiers = sorted((self._parse_capacity(key), score) for key, score in score_dict.items()
+                       if not np.isnan(self._parse_capacity(key)))
+        return (np.array([capacity for capacity, _ in tiers]),
+                np.array([score for _, score in tiers], dtype=float))
+
+    @staticmethod
+    def _tier_scores(capacities, tiers):
+        """按容量向上取到评分表中的档位（12GB -> 16GB档），超过最高档取最高档分数"""
+        tier_capacities, tier_scores = tiers
+        positions = np.searchsorted(tier_capacities, capacities, side='left')
+        positions = np.minimum(positions, len(tier_scores) - 1)
+        return np.where(np.isnan(capacities), np.nan, tier_scores[positions])
+
+    def normalize(self, text):
+        """统一厂商名称、去除商标符号和"或以上"等描述"""
+        text = str(text)
+        for chinese, english in self.VENDOR_NAMES.items():
+            text = text.replace(chinese, f' {english} ')
+        for pattern in self.NOISE_PATTERNS:
+            text = re.sub(pattern, ' ', text, flags=re.IGNORECASE)
+        return re.sub(r'\s+', ' ', text).strip()
+
+    def split_alternatives(self, text):
+        """拆分备选硬件（如 "GTX 960 2GB / AMD Radeon R7 370"），去掉只剩容量等无型号信息的片段"""
+        if pd.isna(text):
+            return []
+
+        alternatives = []
+        for part in self.SEPARATOR_PATTERN.split(self.normalize(text)):
+            part = part.strip(' .:()（）')
+            # 去掉容量后至少还要有字母，否则不是硬件型号（如单独的 "4GB"）
+            if re.search(r'[A-Za-z]', self.CAPACITY_PATTERN.sub('', part)):
+                alternatives.append(part)
+        return alternatives
+
+    def _match_alternatives(self, alternatives, kind):
+        """对去重后的备选硬件统一匹配，返回 备选 -> (分数, 匹配名称)"""
+        alternatives = list(alternatives)
+        if self.fuzzy_matcher.batch:
+            results = self.fuzzy_matcher.match_batch(alternatives, kind)
+        else:
+            match_func = self.fuzzy_matcher.match_cpu if kind == 'cpu' else self.fuzzy_matcher.match_gpu
+            results = [match_func(alternative) for alternative in tqdm(alternatives, desc=f"{kind.upper()}备选匹配")]
+        return dict(zip(alternatives, results))
+
+    def _combine_scores(self, results):
+        """合并一个配置要求中各备选硬件的分数"""
+        if not results:
+            return np.nan, None
+
+        # 能识别出具体型号的备选优先，全部未识别时使用默认分数
+        recognized = [(score, match) for score, match in results
+                      if match != 'Unknown' and not str(match).startswith('Default')]
+        candidates = recognized or results
+
+        if self.combine == 'first':
+            return candidates[0]
+        scores = [score for score, _ in candidates]
+        if self.combine == 'min':
+            return candidates[int(np.argmin(scores))]
+        if self.combine == 'max':
+            return candidates[int(np.argmax(scores))]
+        return float(np.mean(scores)), ' / '.join(str(match) for _, match in candidates)
+
+    def _score_hardware(self, df, column_kinds):
+        """对所有硬件要求列评分：每个不同的要求字符串只拆分一次，所有备选硬件只匹配一次"""
+        # 1. 拆分每列中不同的要求字符串
+        split_columns = {}
+        unique_alternatives = {'cpu': {}, 'gpu': {}}
+        for column, kind in column_kinds.items():
+            codes, uniques = pd.factorize(df[column])
+            split_uniques = [self.split_alternatives(value) for value in uniques]
+            split_columns[column] = (codes, split_uniques)
+            for alternatives in split_uniques:
+                unique_alternatives[kind].update(dict.fromkeys(alternatives))
+
+        # 2. 备选硬件去重后统一匹配
+        matched = {}
+        for kind, alternatives in unique_alternatives.items():
+            print(f"{kind.upper()}: {len(alternatives):,} 个不同的备选硬件")
+            matched[kind] = self._match_alternatives(alternatives, kind)
+
+        # 3. 合并备选分数并按编码广播回每个游戏
+        scored = {}
+        for column, kind in column_kinds.items():
+            codes, split_uniques = split_columns[column]
+            combined = [self._combine_scores([matched[kind][alternative] for alternative in alternatives])
+                        for alternatives in split_uniques]
+            combined.append((np.nan, None))  # 缺失值（编码-1）
+            codes = np.where(codes < 0, len(combined) - 1, codes)
+            scores = np.array([score for score, _ in combined], dtype=float)[codes]
+            matches = np.array([match for _, match in combined], dtype=object)[codes]
+            scored[column] = (scores, matches)
+        return scored
+
+    def score_games(self, games_df):
+        """计算每个游戏最低/推荐配置的CPU、显卡、内存、硬盘分数和综合性能分"""
+        print("🎮 计算游戏配置要求评分...")
+        df = games_df.copy()
+
+        # 推荐配置缺失时沿用最低配置
+        for hardware in ['CPU', '显卡', '内存', '硬盘']:
+            minimum, recommended = f'最低{hardware}', f'推荐{hardware}'
+            if minimum in df.columns and recommended in df.columns:
+                df[recommended] = df[recommended].fillna(df[minimum])
+
+        column_kinds = {}
+        for level in self.LEVELS:
+            column_kinds[f'{level}CPU'] = 'cpu'
+            column_kinds[f'{level}显卡'] = 'gpu'
+        scored = self._score_hardware(df, {column: kind for column, kind in column_kinds.items()
+                                           if column in df.columns})
+
+        result_df = df[[column for column in ['App_ID', '游戏名称', '发行日期'] if column in df.columns]].copy()
+        for level in self.LEVELS:
+            for hardware, key in [('CPU', 'CPU'), ('显卡', 'GPU')]:
+                column = f'{level}{hardware}'
+                if column in scored:
+                    scores, matches = scored[column]
+                    result_df[f'{level}{hardware}匹配'] = matches
+                    result_df[f'{level}{hardware}性能分'] = scores
+
+            # 内存和硬盘按容量向上取档
+            for hardware, tiers in [('内存', self.ram_tiers), ('硬盘', self.storage_tiers)]:
+                column = f'{level}{hardware}'
+                if column in df.columns:
+                    capacities = df[column].map(self._parse_capacity).to_numpy(dtype=float)
+                    result_df[f'{level}{hardware}性能分'] = self._tier_scores(capacities, tiers)
+
+            score_columns = {'GPU': f'{level}显卡性能分', 'CPU': f'{level}CPU性能分', 'RAM': f'{level}内存性能分'}
+            if all(column in result_df.columns for column in score_columns.values()):
+                result_df[f'{level}综合性能分'] = sum(
+                    weight * result_df[score_columns[key]] for key, weight in self.weights.items()
+                ).round(2)
+
+        print(f"✅ 游戏配置评分完成，共 {len(result_df):,} 个游戏")
+        return result_df
@@ -0,0 +1,134 @@
+"""
+缺失值填充模块 - 基于可合并统计量的全局填充，保证分块/并行清洗结果与整表一致
+"""
+
+from collections import Counter
+from .dtypes import fill_missing, numeric_values
+
+class FillStatistics:
+    """可合并的填充统计 - 记录各列取值频次，分块或分片统计后可合并"""
+
+    # 单列最多记录的不同取值数，超过后视为高基数列（如ID），不做众数填充
+    MAX_DISTINCT = 10000
+
+    def __init__(self, max_distinct=None):
+        self.max_distinct = max_distinct or self.MAX_DISTINCT
+        self.counters = {}
+        self.high_cardinality = set()
+        self.total_rows = 0
+
+    def update(self, df, columns=None):
+        """累加一个数据块的取值频次"""
+        self.total_rows += len(df)
+        for column in (columns if columns is not None else df.columns):
+            if column in self.high_cardinality:
+                continue
+            counts = df[column].value_counts(dropna=True)
+            if len(counts) > self.max_distinct:
+                self.high_cardinality.add(column)
+                self.counters.pop(column, None)
+                continue
+            counter = self.counters.setdefault(column, Counter())
+            counter.update({value: int(count) for value, count in counts.items() if count > 0})
+            self._check_cardinality(column)
+        return self
+
+    def merge(self, other):
+        """合并另一份统计（来自其他数据块或工作进程）"""
+        self.total_rows += other.total_rows
+        self.high_cardinality |= other.high_cardinality
+        for column, counter in other.counters.items():
+            if column in self.high_cardinality:
+                continue
+            self.counters.setdefault(column, Counter()).update(counter)
+            self._check_cardinality(column)
+        for column in self.high_cardinality:
+            self.counters.pop(column, None)
+        return self
+
+    def _check_cardinality(self, column):
+        """不同取值过多时放弃该列统计，释放内存"""
+        if len(self.counters[column]) > self.max_distinct:
+            self.high_cardinality.add(column)
+            del self.counters[column]
+
+    def mode(self, column, default=None):
+        """列众数；频次相同时取最小值，与pandas的mode()[0]一致"""
+        counter = self.counters.get(column)
+        if not counter:
+            return default
+
+        best_count = max(counter.values())
+        ties = [value for value, count in counter.items() if count == best_count]
+        try:
+            return min(ties)
+        except TypeError:
+            return min(ties, key=str)
+
+class MissingValueImputer:
+    """缺失值填充器 - 先汇总全局统计，再对每个数据块统一填充"""
+
+    # 固定占位值的列
+    FIXED_VALUES = {
+        'CPU': 'Unknown',
+        'GPU': 'Unknown',
+        'RAM': '8GB DDR4',
+        'Storage': '512GB NVMe SSD',
+    }
+
+    # 年份无统计时的默认值
+    DEFAULT_YEAR = 2023
+
+    # 统计前按清洗规则统一取值：同一年份在不同数据块中可能被解析为2022.0或'2022'，
+    # 转为数值后才计为同一个取值（无法解析的值在标准化阶段同样视为缺失）
+    NORMALIZERS = {
+        'Year': numeric_values,
+    }
+
+    def __init__(self, statistics=None):
+        self.statistics = statistics if statistics is not None else FillStatistics()
+
+    def stat_columns(self, columns):
+        """需要统计众数的列（固定占位值的列除外）"""
+        return [column for column in columns if column not in self.FIXED_VALUES]
+
+    def partial_fit(self, df):
+        """累加一个数据块的统计"""
+        columns = self.stat_columns(df.columns)
+        normalized = {column: self.NORMALIZERS[column](df[column])
+                      for column in columns if column in self.NORMALIZERS}
+        self.statistics.update(df.assign(**normalized) if normalized else df, columns)
+        return self
+
+    def fit(self, df):
+        """基于整表统计"""
+        self.statistics = FillStatistics(self.statistics.max_distinct)
+        return self.partial_fit(df)
+
+    def merge(self, other):
+        """合并另一个填充器的统计"""
+        self.statistics.merge(other.statistics)
+        return self
+
+    def fill_value(self, column):
+        """某列的填充值；无可用统计时返回None"""
+        if column in self.FIXED_VALUES:
+            return self.FIXED_VALUES[column]
+        if column == 'Year':
+            return self.statistics.mode(column, self.DEFAULT_YEAR)
+        return self.statistics.mode(column)
+
+    def transform(self, df):
+        """按全局统计填充缺失值（直接修改并返回df）"""
+        for column in df.columns:
+            missing = df[column].isnull()
+            if missing.any():
+                value = self.fill_value(column)
+                if value is None:
+                    continue
+                if column in self.NORMALIZERS:
+                    # 按统计时的规则转换后只填充原本缺失的值（无法解析的值仍由标准化阶段处理）
+                    df[column] = self.NORMALIZERS[column](df[column]).mask(missing, value)
+                else:
+                    df[column] = fill_missing(df[column], value)
+        return df
@@ -0,0 +1,105 @@
+"""
+关键词匹配模块 - Aho-Corasick多模式自动机，一次扫描找出所有关键词并按优先级选出规则
+"""
+
+from collections import deque
+
+class KeywordMatcher:
+    """多模式关键词匹配器
+
+    rules为按优先级排列的 (结果值, 条件组列表)：每个条件组是若干备选关键词，
+    组内任一关键词出现即满足该组，所有组都满足时规则命中，返回优先级最高（排在最前）的规则的结果值。
+    例如 (15, [('intel',), ('uhd', 'iris')]) 表示 'intel' 且 ('uhd' 或 'iris')。
+    """
+
+    def __init__(self, rules, default=None, lowercase=True, digit_boundary=False):
+        self.default = default
+        self.lowercase = lowercase
+        # 关键词前一个字符不能是数字（避免 '8gb' 匹配到 '48gb' 或 '128gb' 中）
+        self.digit_boundary = digit_boundary
+
+        self.values = []
+        self.group_counts = []
+
+        # Trie：goto[节点] = {字符: 子节点}，output[节点] = [(关键词长度, 规则编号, 条件组编号)]
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+
+        for rule_index, (value, groups) in enumerate(rules):
+            self.values.append(value)
+            self.group_counts.append(len(groups))
+            for group_index, keywords in enumerate(groups):
+                for keyword in keywords:
+                    self._add_keyword(keyword, rule_index, group_index)
+
+        self._build_failure_links()
+
+    @staticmethod
+    def dict_priority(score_dict):
+        """字典关键词的优先级顺序：关键词越长优先级越高（长度相同时按评分表中的顺序），返回[(关键词, 结果值)]"""
+        return sorted(((str(keyword), value) for keyword, value in score_dict.items()),
+                      key=lambda item: -len(item[0]))
+
+    @classmethod
+    def from_dict(cls, score_dict, default=None, **kwargs):
+        """由 关键词 -> 结果值 的字典构建，优先级见dict_priority"""
+        rules = [(value, [(keyword,)]) for keyword, value in cls.dict_priority(score_dict)]
+        return cls(rules, default=default, **kwargs)
+
+    def _add_keyword(self, keyword, rule_index, group_index):
+        """把关键词加入Trie"""
+        if self.lowercase:
+            keyword = keyword.lower()
+        node = 0
+        for char in keyword:
+            next_node = self.goto[node].get(char)
+            if next_node is None:
+                next_node = len(self.goto)
+                self.goto[node][char] = next_node
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            node = next_node
+        self.output[node].append((len(keyword), rule_index, group_index))
+
+    def _build_failure_links(self):
+        """按广度优先构建失败指针，并把后缀节点的输出合并到当前节点"""
+        # 根节点的子节点失败指针指向根节点
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def find_all(self, text):
+        """扫描一次文本，返回命中的 规则编号 -> 已满足的条件组集合"""
+        if self.lowercase:
+            text = text.lower()
+
+        matched = {}
+        node = 0
+        for position, char in enumerate(text):
+            while node and char not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(char, 0)
+
+            for length, rule_index, group_index in self.output[node]:
+                start = position - length + 1
+                if self.digit_boundary and start > 0 and text[start - 1].isdecimal():
+                    continue
+                matched.setdefault(rule_index, set()).add(group_index)
+        return matched
+
+    def match(self, text):
+        """返回优先级最高的命中规则的结果值，无命中时返回默认值"""
+        matched = self.find_all(text)
+        for rule_index in sorted(matched):
+            if len(matched[rule_index]) == self.group_counts[rule_index]:
+                return self.values[rule_index]
+        return self.default
@@ -6,31 +6,48 @@
 
 import os
 import sys
+import argparse
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from tqdm import tqdm
 from src.data_processor import DataProcessor
 from src.fuzzy_matcher import FuzzyMatcher
+from src.keyword_matcher import KeywordMatcher
 from src.score_calculator import ScoreCalculator
+from src.pipeline import score_frame, staged_score_frame, process_files, process_partitions, process_chunks
+from src.match_cache import MatchCache
+from src.game_scorer import GameRequirementScorer
+from src.rescoring import ScoreStore
+from src.quantile_sketch import ScoreSketches
+from src.result_writer import ResultWriter
+from src.stage_cache import StageCache
+from src.config_cache import ConfigCache
 import warnings
 warnings.filterwarnings('ignore')
 
+# legacy评分引擎逐值计算时使用progress_apply显示进度
+tqdm.pandas()
+
+# 评分表文件：CPU、显卡、内存、硬盘
+CONFIG_FILES = ['configs/CPU理论性能.xlsx', 'configs/显卡理论性能.xlsx',
+                'configs/内存理论性能.xlsx', 'configs/硬盘理论性能.xlsx']
+
 def setup_directories():
     """创建项目目录结构"""
-    directories = ['data', 'configs', 'output', 'logs', 'src']
+    directories = ['data', 'configs', 'output', 'logs', 'src', 'cache']
     for directory in directories:
         os.makedirs(directory, exist_ok=True)
     
     print("📁 目录结构已创建")
 
-def validate_files():
+def validate_files(data_path='data/player_pc_configs.csv'):
     """验证输入文件是否存在"""
     required_files = {
         'configs/CPU理论性能.xlsx': 'CPU评分表',
         'configs/显卡理论性能.xlsx': '显卡评分表',
         'configs/内存理论性能.xlsx': '内存评分表',
         'configs/硬盘理论性能.xlsx': '硬盘评分表',
-        'data/player_pc_configs.csv': '玩家配置数据'
     }
     
     missing_files = []
@@ -38,6 +55,10 @@ def validate_files():
         if not os.path.exists(file_path):
             missing_files.append(f"{desc}: {file_path}")
     
+    # 玩家数据可以是单个文件、目录或通配符（游戏评分模式下为None，不检查）
+    if data_path is not None and not DataProcessor.resolve_data_files(data_path):
+        missing_files.append(f"玩家配置数据: {data_path}")
+    
     if missing_files:
         print("❌ 缺少必要的文件:")
         for missing in missing_files:
@@ -75,8 +96,159 @@ def load_configs():
         print(f"❌ 加载配置文件失败: {e}")
         sys.exit(1)
 
+def load_compiled_configs(config_cache):
+    """优先读取评分表编译缓存，返回(评分表四元组, 匹配器派生索引)；未命中时读取xlsx，派生索引为None"""
+    compiled = config_cache.load() if config_cache is not None else None
+    if compiled is None:
+        return load_configs(), None
+    
+    cpu_dict, gpu_dict, ram_dict, storage_dict = compiled['configs']
+    print(f"\n⚡ 已读取评分表编译缓存: CPU({len(cpu_dict)}), GPU({len(gpu_dict)}), "
+          f"RAM({len(ram_dict)}), Storage({len(storage_dict)})")
+    return compiled['configs'], compiled['matcher_indexes']
+
+def score_games(games_path, fuzzy_matcher, ram_dict, storage_dict, output_formats=ResultWriter.DEFAULT_FORMATS,
+                weights=None):
+    """对Steam游戏的最低/推荐配置要求评分并保存（weights为综合性能分权重）"""
+    if not os.path.exists(games_path):
+        print(f"❌ 游戏数据不存在: {games_path}")
+        sys.exit(1)
+    
+    print(f"\n🎮 读取游戏数据: {games_path}")
+    games_df = pd.read_csv(games_path)
+    
+    game_scorer = GameRequirementScorer(fuzzy_matcher, ram_dict, storage_dict, weights=weights)
+    scored_games = game_scorer.score_games(games_df)
+    
+    ResultWriter(output_formats).write(scored_games, 'output/游戏配置评分数据')
+    
+    return scored_games
+
+def save_results(scored_df, score_calculator, sketches=None, percentile_bins=5,
+                 output_formats=ResultWriter.DEFAULT_FORMATS):
+    """添加性能等级，保存评分结果并生成分析报告（sketches为分位数草图时同时保存分位档位表）"""
+    # 4. 添加性能等级
+    print("步骤4: 添加性能等级...")
+    scored_df = score_calculator.add_performance_level(scored_df)
+    
+    # 5. 保存结果（各输出格式并发写出）
+    print("步骤5: 保存结果...")
+    ResultWriter(output_formats).write(scored_df, 'output/玩家配置评分数据')
+    
+    # 保存分位档位表（整体及按年份）
+    if sketches is not None:
+        quantile_output = 'output/分位档位统计.csv'
+        sketches.to_frame(percentile_bins).to_csv(quantile_output, index=False, encoding='utf-8-sig')
+        print(f"✅ 分位档位表已保存: {quantile_output}")
+    
+    # 6. 生成分析报告
+    print("\n📈 生成分析报告...")
+    report = score_calculator.generate_report(scored_df, sketches=sketches)
+    print(report)
+    
+    return scored_df
+
+def rescore(store_path, score_calculator, configs, output_path=None):
+    """增量重算：读取评分中间结果，按当前权重和评分表只重算受影响的行"""
+    if not os.path.exists(store_path):
+        print(f"❌ 评分中间结果不存在: {store_path}")
+        sys.exit(1)
+    
+    print(f"\n🔁 增量重算: {store_path}")
+    store = ScoreStore.load(store_path, score_calculator)
+    store.update_tables(*configs)
+    store.save(output_path or store_path)
+    return store.scored_frame()
+
+def parse_weights(text):
+    """解析权重参数，如 'GPU=0.5,CPU=0.3,RAM=0.2,Storage=0'"""
+    weights = {}
+    for item in text.split(','):
+        key, separator, value = item.partition('=')
+        try:
+            if not separator:
+                raise ValueError
+            weights[key.strip()] = float(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"权重格式应为 名称=数值: {item}")
+    return weights
+
+def parse_profiles(text):
+    """解析权重方案参数，如 'default,esports,4k'"""
+    names = [name.strip() for name in text.split(',') if name.strip()]
+    unknown = [name for name in names if name not in ScoreCalculator.WEIGHT_PROFILES]
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"未知的权重方案: {', '.join(unknown)}（可选: {', '.join(ScoreCalculator.WEIGHT_PROFILES)}）")
+    return names
+
+def parse_formats(text):
+    """解析输出格式参数，如 'csv,parquet,xlsx'"""
+    formats = [output_format.strip() for output_format in text.split(',') if output_format.strip()]
+    unknown = [output_format for output_format in formats if output_format not in ResultWriter.FORMATS]
+    if unknown or not formats:
+        raise argparse.ArgumentTypeError(
+            f"不支持的输出格式: {', '.join(unknown) or text}（可选: {', '.join(ResultWriter.FORMATS)}）")
+    return formats
+
+def parse_args():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="玩家配置评分系统")
+    parser.add_argument("--data", default="data/player_pc_configs.csv",
+                        help="玩家配置数据：单个CSV文件、目录或通配符（如 'data/part-*.csv'）")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="并行进程数（默认1，即单进程顺序处理）：多文件输入时按文件并行，"
+                             "单个文件时清洗后按行分区并行匹配和评分")
+    parser.add_argument("--inplace", action="store_true",
+                        help="原地模式：各阶段直接在同一个DataFrame上添加列，主要降低评分阶段的峰值内存"
+                             "（清洗阶段删除异常行仍会重新分配，整体峰值由匹配阶段决定）")
+    parser.add_argument("--typed", action="store_true",
+                        help="紧凑类型模式：硬件列按分类类型读取，年份按int16读取")
+    parser.add_argument("--dedup", action="store_true",
+                        help="去重模式：只对唯一硬件组合做匹配和评分，再广播回每一行")
+    parser.add_argument("--batch-match", action="store_true",
+                        help="批量匹配模式：唯一名称一次性向量化，用n-gram TF-IDF矩阵乘法做模糊匹配")
+    parser.add_argument("--match-cache", default="cache/match_cache.sqlite",
+                        help="持久化匹配缓存文件（SQLite），评分表变化时自动失效")
+    parser.add_argument("--no-match-cache", action="store_true",
+                        help="不读取也不保存持久化匹配缓存")
+    parser.add_argument("--config-cache", default="cache/configs.pkl",
+                        help="评分表编译缓存（评分表和匹配索引），评分表xlsx或相关代码变化时自动重新编译")
+    parser.add_argument("--no-config-cache", action="store_true",
+                        help="不读取也不保存评分表编译缓存，每次读取xlsx")
+    parser.add_argument("--stage-cache", default=None,
+                        help="阶段缓存目录（如 cache/stages）：清洗/匹配/评分各阶段的输出按输入、参数和代码的指纹缓存，"
+                             "重新运行时跳过未变化的阶段（与--workers同时使用时，匹配阶段按行分区多进程执行）")
+    parser.add_argument("--cache-size", type=int, default=100000,
+                        help="CPU/GPU匹配缓存各自的最大条目数（LRU淘汰，0表示不限制）")
+    parser.add_argument("--games", default=None,
+                        help="游戏评分模式：对Steam游戏配置要求CSV（如 steam-games.csv）评分，不处理玩家数据")
+    parser.add_argument("--engine", choices=["pandas", "arrow"], default="pandas",
+                        help="CSV读取引擎：pandas（默认）或arrow（pyarrow多线程）")
+    parser.add_argument("--weights", type=parse_weights, default=None,
+                        help="总分权重，如 'GPU=0.5,CPU=0.3,RAM=0.2,Storage=0'（未指定的项使用默认权重；"
+                             "--games模式下为综合性能分权重，只支持GPU/CPU/RAM）")
+    parser.add_argument("--profiles", type=parse_profiles, default=None,
+                        help=f"同时按多个权重方案计算总分和等级，逗号分隔（可选: {', '.join(ScoreCalculator.WEIGHT_PROFILES)}）")
+    parser.add_argument("--score-store", default=None,
+                        help="保存评分中间结果（匹配型号和分项分数），.parquet需要pyarrow，其他扩展名保存为pickle")
+    parser.add_argument("--rescore", default=None,
+                        help="增量重算模式：读取评分中间结果，按当前权重和评分表重算，不重新清洗和匹配")
+    parser.add_argument("--output-formats", type=parse_formats, default=list(ResultWriter.DEFAULT_FORMATS),
+                        help=f"评分结果输出格式，逗号分隔，并发写出（默认csv,xlsx；可选: {', '.join(ResultWriter.FORMATS)}）")
+    parser.add_argument("--sketch-k", type=int, default=None,
+                        help="用KLL分位数草图近似中位数和分位档位（k越大越精确，如200约1%%秩误差）；"
+                             "单进程时分块清洗和评分并逐块填充，多进程时各进程分别填充后合并")
+    parser.add_argument("--percentile-bins", type=int, default=5,
+                        help="分位档位表的档数（默认5，即P00/P20/.../P100）")
+    parser.add_argument("--score-engine", choices=list(ScoreCalculator.ENGINES), default="vectorized",
+                        help="RAM/Storage评分引擎：vectorized（默认，整列向量化）或legacy（逐值计算）")
+    return parser.parse_args()
+
 def main():
     """主函数"""
+    args = parse_args()
+    
     print("=" * 60)
     print("🎮 玩家配置评分系统 v1.0")
     print("=" * 60)
@@ -85,54 +257,120 @@ def main():
     setup_directories()
     
     # 验证文件
-    if not validate_files():
+    if not validate_files(None if args.games or args.rescore else args.data):
         sys.exit(1)
     
-    # 加载配置文件
-    cpu_dict, gpu_dict, ram_dict, storage_dict = load_configs()
+    # 加载配置文件（优先读取编译缓存）
+    config_cache = None if args.no_config_cache else ConfigCache(args.config_cache, CONFIG_FILES, [load_configs])
+    (cpu_dict, gpu_dict, ram_dict, storage_dict), matcher_indexes = load_compiled_configs(config_cache)
     
     # 创建处理器实例
     print("\n🔄 初始化处理器...")
-    data_processor = DataProcessor('data/player_pc_configs.csv')
-    fuzzy_matcher = FuzzyMatcher(cpu_dict, gpu_dict)
-    score_calculator = ScoreCalculator()
+    score_options = {'engine': args.score_engine, 'weights': args.weights,
+                     'keep_matches': args.score_store is not None,
+                     'profiles': args.profiles}
+    score_calculator = ScoreCalculator(inplace=args.inplace, **score_options)
     
-    # 处理数据
-    print("\n🔧 开始数据处理...")
+    # 增量重算模式：不清洗、不匹配
+    if args.rescore:
+        scored_df = rescore(args.rescore, score_calculator, (cpu_dict, gpu_dict, ram_dict, storage_dict),
+                            output_path=args.score_store)
+        sketches = ScoreSketches(args.sketch_k).update(scored_df) if args.sketch_k else None
+        scored_df = save_results(scored_df, score_calculator, sketches, args.percentile_bins, args.output_formats)
+        print(f"\n🎉 增量重算完成！总记录数: {len(scored_df)}")
+        return
     
-    # 1. 数据清洗
-    print("步骤1: 数据清洗...")
-    cleaned_df = data_processor.clean_data()
+    processor_options = {'inplace': args.inplace, 'typed': args.typed, 'engine': args.engine}
+    data_processor = DataProcessor(args.data, **processor_options)
+    cache_size = args.cache_size or None
+    fuzzy_matcher = FuzzyMatcher(cpu_dict, gpu_dict, inplace=args.inplace, batch=args.batch_match,
+                                 cache_size=cache_size, indexes=matcher_indexes)
     
-    # 2. 模糊匹配
-    print("步骤2: 模糊匹配...")
-    matched_df = fuzzy_matcher.match_all(cleaned_df)
+    # 编译缓存未命中：保存评分表和刚构建的匹配索引
+    if config_cache is not None and matcher_indexes is None:
+        config_cache.save({'configs': (cpu_dict, gpu_dict, ram_dict, storage_dict),
+                           'matcher_indexes': fuzzy_matcher.export_indexes()})
     
-    # 3. 计算评分
-    print("步骤3: 计算评分...")
-    scored_df = score_calculator.calculate_scores(matched_df, ram_dict, storage_dict)
+    # 加载持久化匹配缓存（以CPU/显卡评分表内容和匹配代码为版本，每种匹配方式各存一份）
+    match_cache = None
+    if not args.no_match_cache:
+        table_fingerprint = MatchCache.fingerprint_files(
+            ['configs/CPU理论性能.xlsx', 'configs/显卡理论性能.xlsx']
+            + StageCache.source_files(*ConfigCache.INDEX_SOURCES, KeywordMatcher)
+        )
+        match_cache = MatchCache(args.match_cache, table_fingerprint, fuzzy_matcher.cache_signature())
+        fuzzy_matcher.load_cache(match_cache)
     
-    # 4. 添加性能等级
-    print("步骤4: 添加性能等级...")
-    scored_df = score_calculator.add_performance_level(scored_df)
+    # 游戏评分模式
+    if args.games:
+        score_games(args.games, fuzzy_matcher, ram_dict, storage_dict, args.output_formats, weights=args.weights)
+        if match_cache is not None:
+            fuzzy_matcher.save_cache(match_cache)
+            match_cache.close()
+        return
     
-    # 5. 保存结果
-    print("步骤5: 保存结果...")
+    # 处理数据
+    print("\n🔧 开始数据处理...")
     
-    # 保存为CSV
-    csv_output = 'output/玩家配置评分数据.csv'
-    scored_df.to_csv(csv_output, index=False, encoding='utf-8-sig')
-    print(f"✅ CSV文件已保存: {csv_output}")
+    if args.stage_cache:
+        # 1-3. 分阶段清洗、匹配和评分，未变化的阶段读取缓存（多进程时匹配阶段按行分区并行）
+        print("步骤1-3: 分阶段清洗、匹配和评分...")
+        scored_df = staged_score_frame(StageCache(args.stage_cache), data_processor, fuzzy_matcher, score_calculator,
+                                       (cpu_dict, gpu_dict, ram_dict, storage_dict),
+                                       dedup=args.dedup, inplace=args.inplace, workers=args.workers)
+        sketches = ScoreSketches(args.sketch_k).update(scored_df) if args.sketch_k else None
+    elif data_processor.multi_file and args.workers > 1:
+        # 多文件并行：每个文件在独立进程中完成步骤1-3
+        print("步骤1-3: 多进程清洗、匹配和评分...")
+        scored_df, file_stats, file_caches, sketches = process_files(
+            args.data, fuzzy_matcher, score_calculator, ram_dict, storage_dict, workers=args.workers,
+            processor_options=processor_options, dedup=args.dedup, sketch_k=args.sketch_k
+        )
+        for stats, caches in zip(file_stats, file_caches):
+            fuzzy_matcher.merge_statistics(stats)
+            fuzzy_matcher.update_caches(*caches)
+    elif args.workers > 1:
+        # 1. 数据清洗
+        print("步骤1: 数据清洗...")
+        cleaned_df = data_processor.clean_data()
+        
+        # 2-3. 按行分区，多进程模糊匹配和计算评分
+        print("步骤2-3: 多进程模糊匹配和计算评分...")
+        scored_df, partition_stats, partition_caches, sketches = process_partitions(
+            cleaned_df, fuzzy_matcher, score_calculator, ram_dict, storage_dict, args.workers,
+            dedup=args.dedup, sketch_k=args.sketch_k
+        )
+        for stats, caches in zip(partition_stats, partition_caches):
+            fuzzy_matcher.merge_statistics(stats)
+            fuzzy_matcher.update_caches(*caches)
+    elif args.sketch_k:
+        # 1-3. 分块清洗、匹配和评分，分位数草图逐块填充
+        print("步骤1-3: 分块清洗、匹配和评分...")
+        scored_df, sketches = process_chunks(data_processor, fuzzy_matcher, score_calculator, ram_dict, storage_dict,
+                                             dedup=args.dedup, inplace=args.inplace, sketch_k=args.sketch_k)
+    else:
+        # 1. 数据清洗
+        print("步骤1: 数据清洗...")
+        cleaned_df = data_processor.clean_data()
+        
+        # 2-3. 模糊匹配和计算评分
+        print("步骤2-3: 模糊匹配和计算评分...")
+        scored_df = score_frame(cleaned_df, fuzzy_matcher, score_calculator, ram_dict, storage_dict,
+                                dedup=args.dedup, inplace=args.inplace)
+        sketches = None
     
-    # 保存为Excel
-    excel_output = 'output/玩家配置评分数据.xlsx'
-    scored_df.to_excel(excel_output, index=False)
-    print(f"✅ Excel文件已保存: {excel_output}")
+    if match_cache is not None:
+        fuzzy_matcher.save_cache(match_cache)
+        match_cache.close()
     
-    # 6. 生成分析报告
-    print("\n📈 生成分析报告...")
-    report = score_calculator.generate_report(scored_df)
-    print(report)
+    # 保存评分中间结果，供调整权重或评分表后增量重算
+    if args.score_store:
+        store = ScoreStore(scored_df, score_calculator)
+        store.save(args.score_store)
+        scored_df = store.scored_frame()
+    
+    # 4-6. 性能等级、保存结果和分析报告
+    scored_df = save_results(scored_df, score_calculator, sketches, args.percentile_bins, args.output_formats)
     
     # 7. 保存匹配统计
     print("\n📊 保存匹配统计...")
@@ -143,7 +381,7 @@ def main():
     print("\n" + "=" * 60)
     print("🎉 处理完成！")
     print(f"📊 总记录数: {len(scored_df)}")
-    print(f"📁 输出文件: output/玩家配置评分数据.[csv|xlsx]")
+    print(f"📁 输出文件: output/玩家配置评分数据.[{'|'.join(args.output_formats)}]")
     print("=" * 60)
 
 if __name__ == "__main__":
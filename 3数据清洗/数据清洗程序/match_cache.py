@@ -0,0 +1,78 @@
+"""
+匹配缓存模块 - 把模糊匹配结果持久化到SQLite，评分表或匹配代码变化时整体失效
+"""
+
+import os
+import hashlib
+import sqlite3
+
+class MatchCache:
+    """持久化匹配缓存 - 以评分表和匹配代码的指纹区分版本，跨运行复用CPU/GPU匹配结果
+
+    同一版本下每种匹配方式（signature，如逐条扫描/批量匹配）各保留一份结果，切换匹配方式不会清空缓存；
+    只有评分表或匹配代码变化（table_fingerprint不同）时才清除旧结果。
+    """
+
+    def __init__(self, path, table_fingerprint, signature):
+        self.path = path
+        self.table_fingerprint = table_fingerprint
+        self.signature = signature
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.connection = sqlite3.connect(path)
+        # 旧格式的表（单一指纹列）无法区分匹配方式，直接丢弃
+        self.connection.execute("DROP TABLE IF EXISTS matches")
+        # score列不声明类型，整数默认分和小数评分按原类型存取
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS match_results ("
+            "tables TEXT, signature TEXT, kind TEXT, query TEXT, score, match TEXT, "
+            "PRIMARY KEY (tables, signature, kind, query))"
+        )
+        # 评分表或匹配代码变化后，旧版本下所有匹配方式的结果全部失效
+        deleted = self.connection.execute(
+            "DELETE FROM match_results WHERE tables != ?", (table_fingerprint,)
+        ).rowcount
+        self.connection.commit()
+        if deleted:
+            print(f"♻️ 评分表或匹配代码已变化，清除 {deleted:,} 条旧匹配缓存")
+
+    @staticmethod
+    def fingerprint_files(paths, *extra):
+        """文件内容（评分表、源码）及附加参数的SHA-256指纹"""
+        digest = hashlib.sha256()
+        for path in paths:
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+        for value in extra:
+            digest.update(str(value).encode('utf-8'))
+        return digest.hexdigest()
+
+    def load(self, kind):
+        """读取某类硬件（'cpu'/'gpu'）的全部缓存，返回 查询 -> (分数, 匹配名称)"""
+        rows = self.connection.execute(
+            "SELECT query, score, match FROM match_results WHERE tables = ? AND signature = ? AND kind = ?",
+            (self.table_fingerprint, self.signature, kind)
+        )
+        return {query: (score, match) for query, score, match in rows}
+
+    def save(self, kind, entries):
+        """写入匹配结果（已存在的查询覆盖）"""
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO match_results VALUES (?, ?, ?, ?, ?, ?)",
+            ((self.table_fingerprint, self.signature, kind, query, self._to_python(score), match)
+             for query, (score, match) in entries.items())
+        )
+        self.connection.commit()
+
+    @staticmethod
+    def _to_python(value):
+        """numpy标量转为Python数值（sqlite3会把numpy整数存成二进制）"""
+        return value.item() if hasattr(value, 'item') else value
+
+    def close(self):
+        """关闭数据库连接"""
+        self.connection.close()
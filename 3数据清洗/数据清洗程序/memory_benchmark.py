@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+峰值内存对比 - 比较默认模式与原地模式下整条处理链的内存占用
+"""
+
+import sys
+import gc
+import argparse
+import tracemalloc
+from tqdm import tqdm
+from main import load_configs
+from src.data_processor import DataProcessor
+from src.fuzzy_matcher import FuzzyMatcher
+from src.score_calculator import ScoreCalculator
+
+tqdm.pandas(disable=True)
+
+def _stage_peak():
+    """读取当前阶段的峰值内存（MB），并重置峰值计数"""
+    peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    tracemalloc.reset_peak()
+    return peak
+
+def run_pipeline(data_path, configs, inplace):
+    """运行一次完整处理链，返回各阶段的峰值内存（MB）"""
+    cpu_dict, gpu_dict, ram_dict, storage_dict = configs
+    stage_peaks = {}
+    
+    gc.collect()
+    tracemalloc.start()
+    
+    data_processor = DataProcessor(data_path, inplace=inplace)
+    cleaned_df = data_processor.clean_data()
+    stage_peaks['数据清洗'] = _stage_peak()
+    
+    fuzzy_matcher = FuzzyMatcher(cpu_dict, gpu_dict, inplace=inplace)
+    matched_df = fuzzy_matcher.match_all(cleaned_df)
+    stage_peaks['模糊匹配'] = _stage_peak()
+    
+    score_calculator = ScoreCalculator(inplace=inplace)
+    scored_df = score_calculator.calculate_scores(matched_df, ram_dict, storage_dict)
+    stage_peaks['计算评分'] = _stage_peak()
+    
+    stage_peaks['整体'] = max(stage_peaks.values())
+    tracemalloc.stop()
+    return stage_peaks, len(scored_df)
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="峰值内存对比")
+    parser.add_argument("data_path", nargs="?", default="data/player_pc_configs.csv",
+                        help="玩家配置数据CSV路径")
+    args = parser.parse_args()
+    
+    configs = load_configs()
+    
+    results = {}
+    for mode, inplace in [('默认模式', False), ('原地模式', True)]:
+        print(f"\n⏱️ 运行{mode}...")
+        results[mode], total_rows = run_pipeline(args.data_path, configs, inplace)
+    
+    print("\n" + "=" * 60)
+    print(f"📊 峰值内存对比（各阶段峰值，MB，{total_rows:,} 行）")
+    print("=" * 60)
+    print(f"{'阶段':<10}{'默认模式':>12}{'原地模式':>12}{'节省':>10}")
+    for stage in results['默认模式']:
+        default_peak = results['默认模式'][stage]
+        inplace_peak = results['原地模式'][stage]
+        saving = 1 - inplace_peak / default_peak if default_peak > 0 else 0
+        print(f"{stage:<10}{default_peak:>12.1f}{inplace_peak:>12.1f}{saving:>10.1%}")
+
+if __name__ == "__main__":
+    sys.exit(main())
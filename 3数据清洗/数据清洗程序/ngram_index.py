@@ -0,0 +1,100 @@
+"""
+字符n-gram索引模块 - 用TF-IDF向量批量计算查询与候选名称的余弦相似度
+"""
+
+import re
+import numpy as np
+from collections import Counter
+
+class NgramTfidfIndex:
+    """字符n-gram TF-IDF索引 - 查询和候选项都以CSR稀疏矩阵保存，逐个查询累加共有n-gram的贡献
+
+    候选项按n-gram建立倒排表（词表 × 候选项的CSR矩阵），查询只访问自身n-gram对应的行，
+    计算量与共有n-gram的数量成正比，不随词表大小增长。
+    """
+
+    def __init__(self, names, n=3):
+        self.names = np.array(list(names), dtype=object)
+        self.n = n
+
+        # 词表和IDF：只由候选项构建
+        candidate_grams = [Counter(self._ngrams(name)) for name in self.names]
+        document_freq = Counter()
+        for grams in candidate_grams:
+            document_freq.update(grams.keys())
+
+        self.vocabulary = {gram: i for i, gram in enumerate(sorted(document_freq))}
+        total = len(self.names)
+        self.idf = np.array([np.log((1 + total) / (1 + document_freq[gram])) + 1
+                             for gram in sorted(document_freq)], dtype=np.float32)
+        # 词表外的n-gram按最大IDF计入查询向量的范数
+        self.unknown_idf = np.float32(np.log(1 + total) + 1)
+
+        # 候选项矩阵（词表 × 候选项）的CSR形式，每个候选项的向量L2归一化
+        rows, columns, weights = [], [], []
+        for column, grams in enumerate(candidate_grams):
+            column_weights = [count * self.idf[self.vocabulary[gram]] for gram, count in grams.items()]
+            norm = np.sqrt(sum(float(weight) ** 2 for weight in column_weights)) or 1.0
+            rows.extend(self.vocabulary[gram] for gram in grams)
+            columns.extend([column] * len(grams))
+            weights.extend(weight / norm for weight in column_weights)
+
+        order = np.argsort(np.array(rows, dtype=np.int64), kind='stable')
+        self.candidate_indptr = np.searchsorted(np.array(rows, dtype=np.int64)[order],
+                                                np.arange(len(self.vocabulary) + 1))
+        self.candidate_indices = np.array(columns, dtype=np.int32)[order]
+        self.candidate_data = np.array(weights, dtype=np.float32)[order]
+
+    def _ngrams(self, text):
+        """小写、合并空白后加首尾空格，切分为字符n-gram"""
+        text = ' ' + re.sub(r'\s+', ' ', str(text).lower()).strip() + ' '
+        return [text[i:i + self.n] for i in range(max(len(text) - self.n + 1, 1))]
+
+    def _vectorize(self, queries):
+        """把一批查询转为CSR形式的TF-IDF稀疏矩阵(indptr, indices, data)，每行L2归一化"""
+        indptr = [0]
+        indices = []
+        data = []
+
+        for query in queries:
+            grams = Counter(self._ngrams(query))
+            row_indices = []
+            row_data = []
+            squared_norm = 0.0
+            for gram, count in grams.items():
+                column = self.vocabulary.get(gram)
+                if column is None:
+                    squared_norm += float(count * self.unknown_idf) ** 2
+                    continue
+                weight = count * self.idf[column]
+                squared_norm += float(weight) ** 2
+                row_indices.append(column)
+                row_data.append(weight)
+
+            norm = np.sqrt(squared_norm) or 1.0
+            indices.extend(row_indices)
+            data.extend(weight / norm for weight in row_data)
+            indptr.append(len(indices))
+
+        return (np.array(indptr, dtype=np.int64),
+                np.array(indices, dtype=np.int64),
+                np.array(data, dtype=np.float32))
+
+    def similarities(self, queries):
+        """逐个查询产生其对全部候选项的余弦相似度（长度为候选项数的数组）"""
+        indptr, indices, data = self._vectorize(queries)
+        for start, stop in zip(indptr[:-1], indptr[1:]):
+            yield self._row_similarity(indices[start:stop], data[start:stop])
+
+    def _row_similarity(self, grams, weights):
+        """一个查询的相似度：取出查询中每个n-gram的倒排表，按候选项累加 查询权重 × 候选项权重"""
+        starts = self.candidate_indptr[grams]
+        lengths = self.candidate_indptr[grams + 1] - starts
+        if lengths.sum() == 0:
+            return np.zeros(len(self.names))
+
+        # 各倒排表在candidate_indices中的位置拼接为一个数组
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        positions = offsets + np.arange(lengths.sum())
+        contributions = np.repeat(weights, lengths) * self.candidate_data[positions]
+        return np.bincount(self.candidate_indices[positions], weights=contributions, minlength=len(self.names))
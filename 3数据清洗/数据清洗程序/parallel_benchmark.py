@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+并行扩展性对比 - 比较不同进程数下匹配和评分阶段的耗时
+"""
+
+import sys
+import time
+import argparse
+from tqdm import tqdm
+from main import load_configs
+from src.data_processor import DataProcessor
+from src.fuzzy_matcher import FuzzyMatcher
+from src.score_calculator import ScoreCalculator
+from src.pipeline import process_partitions
+
+tqdm.pandas(disable=True)
+
+def run_pipeline(cleaned_df, configs, workers):
+    """匹配并评分一次，返回耗时（秒）；每次使用新的匹配器，缓存从空开始"""
+    cpu_dict, gpu_dict, ram_dict, storage_dict = configs
+    fuzzy_matcher = FuzzyMatcher(cpu_dict, gpu_dict)
+    score_calculator = ScoreCalculator()
+
+    start = time.perf_counter()
+    if workers > 1:
+        process_partitions(cleaned_df, fuzzy_matcher, score_calculator, ram_dict, storage_dict, workers)
+    else:
+        matched_df = fuzzy_matcher.match_all(cleaned_df)
+        score_calculator.calculate_scores(matched_df, ram_dict, storage_dict)
+    return time.perf_counter() - start
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="并行扩展性对比")
+    parser.add_argument("data_path", nargs="?", default="data/player_pc_configs.csv",
+                        help="玩家配置数据CSV路径")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="要对比的进程数列表")
+    args = parser.parse_args()
+
+    configs = load_configs()
+    cleaned_df = DataProcessor(args.data_path).clean_data()
+
+    results = {}
+    for workers in args.workers:
+        print(f"\n⏱️ 使用 {workers} 个进程运行...")
+        results[workers] = run_pipeline(cleaned_df, configs, workers)
+
+    baseline = results[args.workers[0]]
+    print("\n" + "=" * 60)
+    print(f"📊 匹配和评分耗时对比（{len(cleaned_df):,} 行）")
+    print("=" * 60)
+    print(f"{'进程数':<8}{'耗时(秒)':>12}{'加速比':>10}")
+    for workers, elapsed in results.items():
+        print(f"{workers:<8}{elapsed:>12.2f}{baseline / elapsed:>10.2f}")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,264 @@
+"""
+处理流程模块 - 串联清洗、匹配和评分，支持多文件并行和单个数据集的分区并行处理
+"""
+
+import multiprocessing
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from .data_processor import DataProcessor
+from .fuzzy_matcher import FuzzyMatcher
+from .score_calculator import ScoreCalculator
+from .deduplicator import ConfigDeduplicator
+from .dtypes import unify_chunk_categories
+from .quantile_sketch import ScoreSketches
+from .stage_cache import StageCache
+from .imputer import MissingValueImputer
+from .keyword_matcher import KeywordMatcher
+from .ngram_index import NgramTfidfIndex
+from . import dtypes, canonical
+
+def score_frame(cleaned_df, fuzzy_matcher, score_calculator, ram_dict, storage_dict,
+                dedup=False, inplace=False):
+    """对清洗后的数据做模糊匹配和评分"""
+    if dedup:
+        # 去重：只对唯一硬件组合匹配和评分
+        deduplicator = ConfigDeduplicator(inplace=inplace)
+        unique_df = deduplicator.collapse(cleaned_df)
+        matched_df = fuzzy_matcher.match_all(unique_df, weights=unique_df['Count'])
+        unique_scored = score_calculator.calculate_scores(matched_df, ram_dict, storage_dict)
+        return deduplicator.expand(cleaned_df, unique_scored)
+    
+    matched_df = fuzzy_matcher.match_all(cleaned_df)
+    return score_calculator.calculate_scores(matched_df, ram_dict, storage_dict)
+
+def process_chunks(data_processor, fuzzy_matcher, score_calculator, ram_dict, storage_dict,
+                   dedup=False, inplace=False, sketch_k=None):
+    """分块清洗、匹配和评分：不生成整表的清洗结果，分位数草图随每块评分结果逐块填充
+    
+    填充值由预扫描的全局统计决定，结果与整表处理一致。返回(合并后的评分结果, 分位数草图或None)。
+    """
+    sketches = ScoreSketches(sketch_k) if sketch_k else None
+    # match_all每次调用重置本次的统计，逐块累加后再写回匹配器
+    stats = dict(fuzzy_matcher.stats)
+    chunk_stats = []
+    frames = []
+    for cleaned_chunk in data_processor.iter_clean_chunks():
+        fuzzy_matcher.stats.clear()
+        scored_chunk = score_frame(cleaned_chunk, fuzzy_matcher, score_calculator, ram_dict, storage_dict,
+                                   dedup=dedup, inplace=inplace)
+        chunk_stats.append(dict(fuzzy_matcher.stats))
+        if sketches is not None:
+            sketches.update(scored_chunk)
+        frames.append(scored_chunk)
+    
+    fuzzy_matcher.stats.clear()
+    for counts in [stats] + chunk_stats:
+        fuzzy_matcher.merge_statistics(counts)
+    
+    scored_df = pd.concat(unify_chunk_categories(frames), ignore_index=True)
+    print(f"✅ 分块处理完成，共 {len(frames)} 块，总行数: {len(scored_df):,}")
+    return scored_df, sketches
+
+def match_frame(cleaned_df, fuzzy_matcher, dedup=False, inplace=False):
+    """对清洗后的数据做模糊匹配；去重时只匹配唯一硬件组合，再把匹配列广播回每一行"""
+    if dedup:
+        deduplicator = ConfigDeduplicator(inplace=inplace)
+        unique_df = deduplicator.collapse(cleaned_df)
+        matched_df = fuzzy_matcher.match_all(unique_df, weights=unique_df['Count'])
+        return deduplicator.expand(cleaned_df, matched_df)
+    
+    return fuzzy_matcher.match_all(cleaned_df)
+
+def staged_score_frame(stage_cache, data_processor, fuzzy_matcher, score_calculator, configs,
+                       dedup=False, inplace=False, workers=1):
+    """分阶段清洗、匹配和评分，结果与score_frame一致
+    
+    每个阶段的输出由StageCache按 上游阶段的键 + 输入（数据文件、评分表）+ 参数 + 源码 缓存：
+    只改了权重或内存/硬盘评分表时跳过清洗和匹配；性能等级和分析报告不缓存，每次重新生成。
+    configs为(CPU评分表, 显卡评分表, 内存评分表, 硬盘评分表)。
+    workers大于1时匹配阶段（耗时最多）按行分区多进程执行。
+    """
+    cpu_dict, gpu_dict, ram_dict, storage_dict = configs
+    
+    # 1. 清洗：数据文件内容 + 读取参数
+    clean_key = StageCache.key(
+        'clean', files=data_processor.data_files + StageCache.source_files(DataProcessor, MissingValueImputer, dtypes),
+        typed=data_processor.typed, engine=data_processor.engine, usecols=data_processor.usecols,
+        pushdown_filters=data_processor.pushdown_filters, record_source=data_processor.record_source
+    )
+    cleaned_df = stage_cache.run('clean', clean_key, lambda: (data_processor.clean_data(), {}))
+    
+    # 2. 匹配：CPU/显卡评分表 + 匹配方式（匹配统计随输出一起缓存，命中时合并回匹配器）
+    match_key = StageCache.key(
+        'match', files=StageCache.source_files(FuzzyMatcher, ConfigDeduplicator, KeywordMatcher, NgramTfidfIndex, canonical),
+        upstream=clean_key, cpu=cpu_dict, gpu=gpu_dict, signature=fuzzy_matcher.cache_signature(), dedup=dedup
+    )
+    def compute_matches():
+        if workers > 1:
+            matched_df, partition_stats, partition_caches, _ = process_partitions(
+                cleaned_df, fuzzy_matcher, score_calculator, None, None, workers, dedup=dedup, match_only=True
+            )
+            for stats, caches in zip(partition_stats, partition_caches):
+                fuzzy_matcher.merge_statistics(stats)
+                fuzzy_matcher.update_caches(*caches)
+        else:
+            matched_df = match_frame(cleaned_df, fuzzy_matcher, dedup=dedup, inplace=inplace)
+        return matched_df, dict(fuzzy_matcher.stats)
+    
+    matched_df = stage_cache.run('match', match_key, compute_matches, restore=fuzzy_matcher.merge_statistics)
+    
+    # 3. 评分：内存/硬盘评分表 + 评分参数
+    score_key = StageCache.key(
+        'score', files=StageCache.source_files(ScoreCalculator, KeywordMatcher, dtypes),
+        upstream=match_key, ram=ram_dict, storage=storage_dict, engine=score_calculator.engine,
+        weights=score_calculator.weights, keep_matches=score_calculator.keep_matches,
+        profiles=score_calculator.profiles
+    )
+    return stage_cache.run(
+        'score', score_key, lambda: (score_calculator.calculate_scores(matched_df, ram_dict, storage_dict), {})
+    )
+
+# 工作进程的共享状态（匹配器、评分器、评分表、清洗后的数据等），由进程池的initializer设置一次：
+# fork启动时工作进程直接继承父进程内存（写时复制），评分表、索引和已有缓存都不经过序列化；
+# 不支持fork的平台每个工作进程只反序列化一次，任务本身只携带文件路径或行号区间
+_worker_state = {}
+
+def _init_worker(state):
+    """工作进程初始化：保存共享状态"""
+    _worker_state.update(state)
+
+def _worker_pool(workers, state):
+    """创建共享state的进程池，平台支持时使用fork"""
+    context = multiprocessing.get_context('fork') if 'fork' in multiprocessing.get_all_start_methods() else None
+    return ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                               initializer=_init_worker, initargs=(state,))
+
+def _match_and_score(df):
+    """工作进程：用共享的匹配器和评分器对一部分数据匹配和评分
+    
+    返回(评分结果, 匹配统计, 本任务新增的(CPU缓存, GPU缓存)条目, 分位数草图或None)。
+    """
+    state = _worker_state
+    fuzzy_matcher = state['fuzzy_matcher']
+    
+    # 匹配器是父进程的副本：统计和缓存计数清零，只返回本任务的增量
+    fuzzy_matcher.stats.clear()
+    caches = (fuzzy_matcher.cpu_cache, fuzzy_matcher.gpu_cache)
+    known_keys = []
+    for cache in caches:
+        cache.reset_counters()
+        known_keys.append(set(cache.entries))
+    
+    if state.get('match_only'):
+        scored_df = match_frame(df, fuzzy_matcher, dedup=state['dedup'], inplace=state['inplace'])
+    else:
+        scored_df = score_frame(df, fuzzy_matcher, state['score_calculator'], state['ram_dict'],
+                                state['storage_dict'], dedup=state['dedup'], inplace=state['inplace'])
+    
+    # 缓存计数随匹配统计一起返回，由主进程合并
+    stats = dict(fuzzy_matcher.stats)
+    stats.update(fuzzy_matcher.cache_statistics())
+    new_entries = tuple({key: value for key, value in cache.items() if key not in keys}
+                        for cache, keys in zip(caches, known_keys))
+    
+    # 分位数草图在工作进程内填充，主进程合并
+    sketches = None
+    if state['sketch_k'] and not state.get('match_only'):
+        sketches = ScoreSketches(state['sketch_k']).update(scored_df)
+    return scored_df, stats, new_entries, sketches
+
+def _file_fill_statistics(path):
+    """工作进程：统计单个文件的缺失值填充统计"""
+    return DataProcessor(path, **_worker_state['processor_options']).compute_fill_statistics()
+
+def _process_file(task):
+    """工作进程：对单个文件完成清洗、匹配和评分"""
+    path, imputer = task
+    data_processor = DataProcessor(path, record_source=True, **_worker_state['processor_options'])
+    return _match_and_score(data_processor.clean_data(imputer))
+
+def _process_partition(bounds):
+    """工作进程：对清洗后数据的一个行区间匹配和评分"""
+    start, stop = bounds
+    return _match_and_score(_worker_state['cleaned_df'].iloc[start:stop])
+
+def _merge_results(results):
+    """按任务顺序合并工作进程的结果，返回(合并后的评分结果, 匹配统计列表, 新增缓存列表, 合并后的草图或None)"""
+    frames = [scored_df for scored_df, _, _, _ in results]
+    file_stats = [stats for _, stats, _, _ in results]
+    file_caches = [new_entries for _, _, new_entries, _ in results]
+    
+    # 按任务顺序合并各工作进程的分位数草图
+    sketches = None
+    for _, _, _, task_sketches in results:
+        if task_sketches is not None:
+            sketches = task_sketches if sketches is None else sketches.merge(task_sketches)
+    
+    merged_df = pd.concat(unify_chunk_categories(frames), ignore_index=True)
+    return merged_df, file_stats, file_caches, sketches
+
+def _shared_state(fuzzy_matcher, score_calculator, ram_dict, storage_dict, dedup, sketch_k, **extra):
+    """工作进程共享状态；fork前先构建匹配器的按需索引"""
+    fuzzy_matcher.build_indexes()
+    state = {'fuzzy_matcher': fuzzy_matcher, 'score_calculator': score_calculator, 'ram_dict': ram_dict,
+             'storage_dict': storage_dict, 'dedup': dedup, 'inplace': score_calculator.inplace,
+             'sketch_k': sketch_k}
+    state.update(extra)
+    return state
+
+def process_files(data_path, fuzzy_matcher, score_calculator, ram_dict, storage_dict, workers=None,
+                  processor_options=None, dedup=False, sketch_k=None):
+    """多文件并行处理：每个文件在独立进程中清洗、匹配和评分，按文件名顺序合并
+    
+    匹配器（含评分表、索引和已加载的缓存）和评分器与工作进程共享，不随每个任务序列化；
+    sketch_k不为空时各工作进程按该精度填充分数的分位数草图。
+    返回(合并后的评分结果, 各文件的匹配统计列表, 各文件新增的匹配缓存列表, 合并后的分位数草图或None)。
+    """
+    processor_options = processor_options or {}
+    data_files = DataProcessor.resolve_data_files(data_path)
+    if not data_files:
+        raise FileNotFoundError(f"未找到数据文件: {data_path}")
+    
+    print(f"📂 共 {len(data_files)} 个数据文件，使用 {workers or '全部'} 个进程并行处理")
+    
+    state = _shared_state(fuzzy_matcher, score_calculator, ram_dict, storage_dict, dedup, sketch_k,
+                          processor_options=processor_options)
+    with _worker_pool(workers, state) as executor:
+        # 1. 各文件分别统计填充值后合并，保证与整表清洗结果一致
+        imputer = None
+        for file_imputer in executor.map(_file_fill_statistics, data_files):
+            imputer = file_imputer if imputer is None else imputer.merge(file_imputer)
+        
+        # 2. 各文件独立清洗、匹配和评分（map按提交顺序返回结果）
+        results = list(executor.map(_process_file, [(path, imputer) for path in data_files]))
+    
+    merged_df, file_stats, file_caches, sketches = _merge_results(results)
+    print(f"✅ 多文件处理完成，总行数: {len(merged_df):,}")
+    
+    return merged_df, file_stats, file_caches, sketches
+
+def process_partitions(cleaned_df, fuzzy_matcher, score_calculator, ram_dict, storage_dict, workers,
+                       dedup=False, sketch_k=None, partitions_per_worker=4, match_only=False):
+    """单个数据集并行匹配和评分：清洗后的数据按行切成连续分区，各工作进程分别匹配和评分，按原顺序合并
+    
+    清洗后的数据和匹配器与工作进程共享，任务只传行号区间；
+    每个工作进程分到多个分区，分区耗时不均时负载更平衡。返回值同process_files。
+    match_only为True时只做模糊匹配（阶段缓存的匹配阶段），不评分、不填充草图。
+    """
+    partitions = max(1, min(len(cleaned_df), workers * partitions_per_worker))
+    bounds = np.linspace(0, len(cleaned_df), partitions + 1).astype(int)
+    
+    task = '匹配' if match_only else '匹配和评分'
+    print(f"🧵 {len(cleaned_df):,} 行分为 {partitions} 个分区，使用 {workers} 个进程并行{task}")
+    
+    state = _shared_state(fuzzy_matcher, score_calculator, ram_dict, storage_dict, dedup, sketch_k,
+                          cleaned_df=cleaned_df, match_only=match_only)
+    with _worker_pool(workers, state) as executor:
+        results = list(executor.map(_process_partition, zip(bounds[:-1], bounds[1:])))
+    
+    merged_df, partition_stats, partition_caches, sketches = _merge_results(results)
+    merged_df.index = cleaned_df.index
+    print(f"✅ 分区并行处理完成，总行数: {len(merged_df):,}")
+    
+    return merged_df, partition_stats, partition_caches, sketches
@@ -0,0 +1,199 @@
+"""
+分位数草图模块 - 可合并的KLL近似分位数草图，内存有界地回答中位数、分位档位和按年份分位数
+"""
+
+import numpy as np
+import pandas as pd
+from .dtypes import score_array
+
+class KLLSketch:
+    """KLL分位数草图
+
+    第h层的每个元素代表2^h个原始值；某层超出容量时排序后随机取奇数位或偶数位升入上一层。
+    k越大越精确，秩误差约为 2/k（k=200时约1%），保留的元素数约为1.5k个，与数据量无关。
+    尚未发生压缩时（数据量小）按全部原始值精确计算。
+    """
+
+    DEFAULT_K = 200
+
+    # 下层容量按该比例递减
+    CAPACITY_DECAY = 2 / 3
+
+    def __init__(self, k=DEFAULT_K, seed=0):
+        if k < 8:
+            raise ValueError(f"草图参数k至少为8: {k}")
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.count = 0
+        self.min = np.nan
+        self.max = np.nan
+        self.seed = seed
+
+    def _capacity(self, level):
+        """第level层的容量：最高层为k，往下逐层乘以2/3，至少为2"""
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * self.CAPACITY_DECAY ** depth)))
+
+    def update(self, values):
+        """加入一批数值（忽略缺失值）
+
+        每次取k个放入第0层后压缩，草图占用的内存与批量大小无关。
+        """
+        values = np.asarray(values).ravel()
+        for start in range(0, len(values), self.k):
+            batch = values[start:start + self.k].astype(float)
+            batch = batch[~np.isnan(batch)]
+            if not len(batch):
+                continue
+
+            self.count += len(batch)
+            self.min = np.fmin(self.min, batch.min())
+            self.max = np.fmax(self.max, batch.max())
+            self.levels[0] = np.concatenate([self.levels[0], batch])
+            self._compress()
+        return self
+
+    def merge(self, other):
+        """合并另一个草图（来自其他数据块或工作进程）"""
+        if other.k != self.k:
+            raise ValueError(f"只能合并参数k相同的草图: {self.k} != {other.k}")
+
+        for level, items in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self.min = np.fmin(self.min, other.min)
+        self.max = np.fmax(self.max, other.max)
+        self._compress()
+        return self
+
+    def _compress(self):
+        """自底向上压缩超出容量的层"""
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # 奇数个时最小的一个留在本层，其余两两配对，每对随机保留一个升入上一层
+                # 随机位取(种子, 已加入的数据量, 层号)的哈希：结果可复现，不同分片的压缩又互不相关
+                # （整数元组的哈希不受PYTHONHASHSEED影响；每段都要压缩，不为此创建随机数生成器）
+                odd = len(items) % 2
+                offset = odd + (hash((self.seed, self.count, level)) & 1)
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], items[offset::2]])
+                self.levels[level] = items[:odd]
+            level += 1
+
+    def quantiles(self, fractions):
+        """批量查询分位数（fractions取值0~1），0和1分别返回精确的最小值和最大值"""
+        fractions = np.asarray(fractions, dtype=float)
+        if self.count == 0:
+            return np.full(fractions.shape, np.nan)
+
+        # 未压缩：精确分位数（线性插值，与pandas/numpy一致）
+        if len(self.levels) == 1:
+            return np.quantile(self.levels[0], fractions)
+
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level_items), 2 ** level, dtype=np.int64)
+                                  for level, level_items in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items = items[order]
+        cumulative = np.cumsum(weights[order])
+
+        positions = np.searchsorted(cumulative, fractions * cumulative[-1], side='left')
+        result = items[np.minimum(positions, len(items) - 1)]
+        result = np.where(fractions <= 0, self.min, result)
+        return np.where(fractions >= 1, self.max, result)
+
+    def quantile(self, fraction):
+        """查询单个分位数"""
+        return float(self.quantiles([fraction])[0])
+
+    def median(self):
+        return self.quantile(0.5)
+
+    def retained(self):
+        """草图中保留的元素数（内存占用）"""
+        return sum(len(items) for items in self.levels)
+
+class ScoreSketches:
+    """各分数列（整体和按年份）的分位数草图集合，分块/分片评分时逐块填充，跨工作进程合并"""
+
+    COLUMNS = ['CPU_Score', 'GPU_Score', 'RAM_Score', 'Storage_Score', 'Total_Score']
+
+    # 一次转换为float64的行数：整表传入时也只按块复制分数列
+    CHUNK_ROWS = 65536
+
+    def __init__(self, k=KLLSketch.DEFAULT_K, columns=None):
+        self.k = k
+        self.columns = columns or self.COLUMNS
+        self.overall = {}   # 分数列 -> 草图
+        self.by_year = {}   # (分数列, 年份) -> 草图
+
+    def _sketch(self, table, key):
+        if key not in table:
+            table[key] = KLLSketch(self.k)
+        return table[key]
+
+    def update(self, df):
+        """加入一个数据块的分数（超过CHUNK_ROWS行时按块加入）"""
+        for start in range(0, len(df), self.CHUNK_ROWS):
+            self._update_chunk(df.iloc[start:start + self.CHUNK_ROWS])
+        return self
+
+    def _update_chunk(self, df):
+        columns = [column for column in self.columns if column in df.columns]
+
+        # 按年份编码排序一次，各年份的行号是连续区间
+        year_groups = []
+        if 'Year' in df.columns:
+            codes, years = pd.factorize(df['Year'], sort=True)
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(years) + 1))
+            year_groups = [(year, order[bounds[i]:bounds[i + 1]]) for i, year in enumerate(years)]
+
+        for column in columns:
+            values = score_array(df[column])
+            self._sketch(self.overall, column).update(values)
+            for year, rows in year_groups:
+                self._sketch(self.by_year, (column, year)).update(values[rows])
+
+    def merge(self, other):
+        """合并另一份草图集合"""
+        for table, other_table in [(self.overall, other.overall), (self.by_year, other.by_year)]:
+            for key, sketch in other_table.items():
+                if key in table:
+                    table[key].merge(sketch)
+                else:
+                    table[key] = sketch
+        return self
+
+    def median(self, column):
+        return self.overall[column].median()
+
+    def percentile_edges(self, column, bins):
+        """把分数列按人数等分为bins档的分位点（共bins+1个，首尾为最小值和最大值）"""
+        return self.overall[column].quantiles(np.linspace(0, 1, bins + 1))
+
+    def year_quantiles(self, column, fractions):
+        """按年份的分位数：年份 -> 分位数数组"""
+        return {year: sketch.quantiles(fractions)
+                for (sketch_column, year), sketch in sorted(self.by_year.items(), key=lambda item: item[0][1])
+                if sketch_column == column}
+
+    def to_frame(self, bins):
+        """分位档位表：每个分数列整体及各年份一行，列为P00、P20、...、P100"""
+        fractions = np.linspace(0, 1, bins + 1)
+        labels = [f'P{fraction * 100:02.0f}' for fraction in fractions]
+
+        rows = []
+        for column in self.columns:
+            if column not in self.overall:
+                continue
+            rows.append([column, '全部', self.overall[column].count] + list(self.percentile_edges(column, bins)))
+            for year, edges in self.year_quantiles(column, fractions).items():
+                rows.append([column, year, self.by_year[(column, year)].count] + list(edges))
+        return pd.DataFrame(rows, columns=['分数列', '年份', '人数'] + labels)
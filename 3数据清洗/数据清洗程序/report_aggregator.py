@@ -0,0 +1,200 @@
+"""
+报告统计模块 - 一次遍历算出分析报告的全部统计量，报告文本由统计结果渲染
+"""
+
+import warnings
+import numpy as np
+import pandas as pd
+from .dtypes import is_categorical, score_array
+
+class ReportStatistics:
+    """分析报告的统计结果（列不存在时对应项为None）"""
+
+    def __init__(self):
+        self.total_rows = 0
+        self.year_range = None      # (最早年份, 最晚年份)
+        self.type_counts = None     # [(设备类型, 行数)]，按行数降序
+        self.score_summary = {}     # 分数列 -> {'mean', 'median', 'max', 'min', 'std'}
+        self.level_counts = None    # [(性能等级, 行数)]，按等级顺序
+        self.top_configs = None     # 总分最高的配置（DataFrame）
+        self.yearly_means = None    # [(年份, 平均总分)]，按年份升序
+        self.correlations = None    # [(列1, 列2, 相关系数)]
+
+class ReportAggregator:
+    """报告统计引擎
+
+    所有分数列组成一个矩阵后分块遍历一次：每块同时得到均值、协方差矩阵（对角线即方差）、
+    最大值和最小值，块之间按Chan并行公式合并；中位数对整个矩阵做一次选择（或取自分位数草图），
+    年份、设备类型和性能等级各用一次编码计数。
+    缺失的分数与pandas一致地跳过：各列只统计非缺失行，相关系数按两列都不缺失的行计算。
+    """
+
+    SCORE_COLUMNS = ['CPU_Score', 'GPU_Score', 'RAM_Score', 'Storage_Score', 'Total_Score']
+    CORRELATION_COLUMNS = ['CPU_Score', 'GPU_Score', 'RAM_Score', 'Storage_Score']
+    TOP_COLUMNS = ['ID', 'CPU', 'GPU', 'RAM', 'Storage', 'Total_Score']
+
+    # 每块行数：控制中间矩阵的内存占用
+    CHUNK_ROWS = 1000000
+
+    def __init__(self, top_n=10, chunk_rows=CHUNK_ROWS, sketches=None):
+        self.top_n = top_n
+        self.chunk_rows = chunk_rows
+        # 分位数草图（ScoreSketches）：提供时中位数取自草图，不再对整列做选择
+        self.sketches = sketches
+
+    def aggregate(self, df):
+        """计算报告所需的全部统计量，返回ReportStatistics"""
+        stats = ReportStatistics()
+        stats.total_rows = len(df)
+
+        # 1. 分数矩阵：一次分块遍历得到均值/标准差/极值/相关系数
+        score_columns = [column for column in self.SCORE_COLUMNS if column in df.columns]
+        if score_columns:
+            matrix = np.column_stack([score_array(df[column]) for column in score_columns])
+            count, mean, comoment, minimum, maximum = self._moments(matrix)
+            median = self._medians(matrix, score_columns)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                variance = np.where(count > 1, np.diag(comoment) / (count - 1), np.nan)
+            for position, column in enumerate(score_columns):
+                stats.score_summary[column] = {
+                    'mean': mean[position] if count[position] else np.nan,
+                    'median': median[position],
+                    'max': maximum[position],
+                    'min': minimum[position],
+                    'std': np.sqrt(variance[position]),
+                }
+
+            if all(column in score_columns for column in self.CORRELATION_COLUMNS):
+                stats.correlations = self._correlations(matrix, comoment, score_columns)
+
+        # 2. 年份：一次排序编码，同时得到年份范围和各年平均总分
+        if 'Year' in df.columns:
+            codes, years = pd.factorize(df['Year'], sort=True)
+            if len(years):
+                stats.year_range = (years[0], years[-1])
+            if 'Total_Score' in df.columns:
+                # 与groupby().mean()一致：缺失的总分不参与平均，总分全部缺失的年份平均为nan
+                totals = score_array(df['Total_Score'])
+                has_year = codes >= 0
+                valid = has_year & ~np.isnan(totals)
+                sums = np.bincount(codes[valid], weights=totals[valid], minlength=len(years))
+                counts = np.bincount(codes[valid], minlength=len(years))
+                rows = np.bincount(codes[has_year], minlength=len(years))
+                stats.yearly_means = [(year, round(total / count, 2) if count else np.nan)
+                                      for year, total, count, row_count in zip(years, sums, counts, rows)
+                                      if row_count]
+
+        # 3. 设备类型（按行数降序）和性能等级（按等级顺序）分布
+        if 'Type' in df.columns:
+            stats.type_counts = self._value_counts(df['Type'], by_count=True)
+        if 'Performance_Level' in df.columns:
+            stats.level_counts = self._value_counts(df['Performance_Level'], by_count=False)
+
+        # 4. 总分最高的配置
+        if all(column in df.columns for column in self.TOP_COLUMNS):
+            stats.top_configs = df.iloc[self._top_positions(score_array(df['Total_Score']))][self.TOP_COLUMNS]
+
+        return stats
+
+    def _moments(self, matrix):
+        """分块计算(各列非缺失行数, 均值, 离差积矩阵, 最小值, 最大值)，缺失值不参与统计
+
+        离差积矩阵的对角线是各列的离差平方和（除以n-1即方差）；非对角元素只在相关列都没有缺失值时使用，
+        有缺失值时相关系数按成对非缺失行另行计算（见_correlations）。
+        """
+        columns = matrix.shape[1]
+        count = np.zeros(columns)
+        mean = np.zeros(columns)
+        comoment = np.zeros((columns, columns))
+        minimum = np.full(columns, np.nan)
+        maximum = np.full(columns, np.nan)
+
+        for start in range(0, len(matrix), self.chunk_rows):
+            block = matrix[start:start + self.chunk_rows]
+            valid = ~np.isnan(block)
+            block_count = valid.sum(axis=0).astype(float)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                block_mean = np.where(block_count > 0, np.where(valid, block, 0).sum(axis=0) / block_count, 0)
+            centered = np.where(valid, block - block_mean, 0)
+            block_comoment = centered.T @ centered
+
+            # Chan并行公式合并两部分的均值和离差积（行数按列计，两列行数不同时取较小者）
+            delta = block_mean - mean
+            total = count + block_count
+            pair_count = np.minimum.outer(count, count)
+            pair_block_count = np.minimum.outer(block_count, block_count)
+            pair_total = np.minimum.outer(total, total)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean = np.where(total > 0, mean + delta * block_count / total, mean)
+                comoment = comoment + block_comoment + np.where(
+                    pair_total > 0, np.outer(delta, delta) * pair_count * pair_block_count / pair_total, 0)
+            count = total
+
+            # fmin/fmax忽略缺失值
+            minimum = np.fmin(minimum, np.fmin.reduce(block, axis=0))
+            maximum = np.fmax(maximum, np.fmax.reduce(block, axis=0))
+
+        return count, mean, comoment, minimum, maximum
+
+    def _medians(self, matrix, score_columns):
+        """各分数列的中位数（忽略缺失值）：有草图的列取草图近似值，其余列精确计算"""
+        sketched = self.sketches.overall if self.sketches is not None else {}
+        exact = [position for position, column in enumerate(score_columns) if column not in sketched]
+        median = np.full(len(score_columns), np.nan)
+        if exact and len(matrix):
+            with warnings.catch_warnings():
+                # 整列缺失时中位数为nan，不提示
+                warnings.simplefilter('ignore', RuntimeWarning)
+                median[exact] = np.nanmedian(matrix[:, exact], axis=0)
+        for position, column in enumerate(score_columns):
+            if column in sketched:
+                median[position] = sketched[column].median()
+        return median
+
+    def _correlations(self, matrix, comoment, score_columns):
+        """各分项之间的相关系数：没有缺失值时取自离差积矩阵，否则与pandas一致按两列都不缺失的行计算"""
+        positions = [score_columns.index(column) for column in self.CORRELATION_COLUMNS]
+        complete = not np.isnan(matrix[:, positions]).any()
+        correlations = []
+        for i, first in enumerate(self.CORRELATION_COLUMNS):
+            for j, second in enumerate(self.CORRELATION_COLUMNS):
+                if i < j:
+                    a, b = positions[i], positions[j]
+                    if complete:
+                        cross, first_square, second_square = comoment[a, b], comoment[a, a], comoment[b, b]
+                    else:
+                        cross, first_square, second_square = self._pair_comoment(matrix[:, a], matrix[:, b])
+                    with np.errstate(invalid='ignore', divide='ignore'):
+                        value = cross / np.sqrt(first_square * second_square)
+                    correlations.append((first, second, value))
+        return correlations
+
+    @staticmethod
+    def _pair_comoment(first, second):
+        """两列都不缺失的行上的(离差积, 第一列离差平方和, 第二列离差平方和)，少于2行时为nan"""
+        valid = ~np.isnan(first) & ~np.isnan(second)
+        if valid.sum() < 2:
+            return np.nan, np.nan, np.nan
+        x = first[valid] - first[valid].mean()
+        y = second[valid] - second[valid].mean()
+        return x @ y, x @ x, y @ y
+
+    @staticmethod
+    def _value_counts(series, by_count):
+        """按编码计数：by_count时按行数降序（行数相同保持首次出现/类别顺序），否则按类别顺序或取值排序"""
+        if is_categorical(series):
+            codes, values = series.cat.codes.to_numpy(), series.cat.categories
+        else:
+            codes, values = pd.factorize(series, sort=not by_count)
+        counts = np.bincount(codes[codes >= 0], minlength=len(values))
+        order = np.argsort(-counts, kind='stable') if by_count else np.arange(len(values))
+        return [(values[position], int(counts[position])) for position in order]
+
+    def _top_positions(self, totals):
+        """总分最高的top_n行的位置，与nlargest(keep='first')一致：分数降序，同分按行顺序"""
+        valid = np.flatnonzero(~np.isnan(totals))
+        if len(valid) > self.top_n:
+            threshold = np.partition(totals[valid], -self.top_n)[-self.top_n]
+            valid = valid[totals[valid] >= threshold]
+        order = np.lexsort((valid, -totals[valid]))
+        return valid[order][:self.top_n]
@@ -0,0 +1,182 @@
+"""
+增量重算模块 - 保存匹配型号和分项分数，权重或评分表变化时只重算受影响的行
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from .dtypes import is_categorical, enforce_score_dtypes, compact_scores, score_array, score_dtype
+
+class ScoreStore:
+    """评分中间结果 - 列式保存匹配结果和分项分数，并按型号建立到行的反向索引
+
+    权重变化时向量化重算整列总分；评分表中某些型号的分数变化时，
+    通过反向索引只更新匹配到这些型号的行。
+    评分表新增或删除型号会改变匹配结果，仍需重新匹配。
+    """
+
+    # 分数列 -> 决定该分数的键列
+    KEY_COLUMNS = {
+        'CPU_Score': 'CPU_Match',
+        'GPU_Score': 'GPU_Match',
+        'RAM_Score': 'RAM',
+        'Storage_Score': 'Storage',
+    }
+
+    # 匹配结果列（输出评分数据时去掉）
+    MATCH_COLUMNS = ['CPU_Match', 'GPU_Match']
+
+    # 权重方案列的前缀（列名为 前缀 + 方案名称）
+    PROFILE_PREFIXES = ('Total_Score_', 'Performance_Level_')
+
+    def __init__(self, df, score_calculator):
+        missing = [column for pair in self.KEY_COLUMNS.items() for column in pair if column not in df.columns]
+        if missing:
+            raise ValueError(f"评分结果缺少列: {', '.join(missing)}（计算评分时需保留匹配列）")
+
+        # 评分列统一为紧凑类型（兼容按旧类型保存的中间结果）
+        self.df = enforce_score_dtypes(df)
+        self.score_calculator = score_calculator
+        self._drop_stale_profiles()
+
+        # 键列转为分类类型：类别编号即型号ID
+        for key_column in self.KEY_COLUMNS.values():
+            if not is_categorical(self.df[key_column]):
+                self.df[key_column] = self.df[key_column].astype('category')
+
+        # 反向索引按需构建：键列 -> (按型号排序的行号, 每个型号的行号区间)
+        self.row_index = {}
+
+    @classmethod
+    def load(cls, path, score_calculator):
+        """读取中间结果；保存时的权重与当前权重不同时重算总分"""
+        if path.endswith('.parquet'):
+            df = pd.read_parquet(path, engine=cls._parquet_engine())
+        else:
+            df = pd.read_pickle(path)
+
+        store = cls(df, score_calculator)
+        if df.attrs.get('weights') != score_calculator.weights:
+            store.set_weights(score_calculator.weights)
+        else:
+            store._refresh_profile_totals()
+        print(f"✅ 已读取评分中间结果: {path}（{len(df):,} 行）")
+        return store
+
+    def save(self, path):
+        """保存中间结果（.parquet需要pyarrow，其他扩展名保存为pickle）"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.df.attrs['weights'] = dict(self.score_calculator.weights)
+        if path.endswith('.parquet'):
+            self.df.to_parquet(path, engine=self._parquet_engine())
+        else:
+            self.df.to_pickle(path)
+        print(f"✅ 评分中间结果已保存: {path}")
+
+    @staticmethod
+    def _parquet_engine():
+        """parquet读写依赖pyarrow"""
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise ImportError("parquet格式的评分中间结果需要安装pyarrow: pip install pyarrow") from e
+        return 'pyarrow'
+
+    def _build_row_index(self, key_column):
+        """按类别编号对行号稳定排序，offsets[i]:offsets[i+1]为第i个型号的行号区间"""
+        if key_column not in self.row_index:
+            codes = self.df[key_column].cat.codes.to_numpy()
+            order = np.argsort(codes, kind='stable')
+            offsets = np.searchsorted(codes[order], np.arange(len(self.df[key_column].cat.categories) + 1))
+            self.row_index[key_column] = (order, offsets)
+        return self.row_index[key_column]
+
+    def rows_for(self, key_column, category_positions):
+        """反向索引：返回匹配到指定型号（类别编号）的所有行号"""
+        order, offsets = self._build_row_index(key_column)
+        if len(category_positions) == 0:
+            return np.array([], dtype=np.int64)
+        return np.concatenate([order[offsets[position]:offsets[position + 1]]
+                               for position in category_positions])
+
+    def _category_scores(self, score_column):
+        """每个型号当前的分数（取该型号第一行的分数），未出现的型号为NaN"""
+        key_column = self.KEY_COLUMNS[score_column]
+        order, offsets = self._build_row_index(key_column)
+        scores = score_array(self.df[score_column])
+        present = offsets[1:] > offsets[:-1]
+        result = np.full(len(present), np.nan)
+        result[present] = scores[order[offsets[:-1][present]]]
+        return result
+
+    def set_weights(self, weights):
+        """更新权重并向量化重算全部总分"""
+        self.score_calculator.update_weights(weights)
+        self.df['Total_Score'] = self.score_calculator.compute_total(self.df).astype(score_dtype('Total_Score'))
+        self._refresh_profile_totals()
+    
+    def _refresh_profile_totals(self):
+        """按当前的权重方案重算各方案总分（一次矩阵乘法）"""
+        self._drop_stale_profiles()
+        if self.score_calculator.profiles:
+            self.score_calculator.add_profile_totals(self.df)
+
+    def _drop_stale_profiles(self):
+        """删除不属于当前权重方案的方案列（如按其他--profiles保存的中间结果），避免输出过期的总分"""
+        profiles = self.score_calculator.profiles
+        stale = [column for column in self.df.columns for prefix in self.PROFILE_PREFIXES
+                 if column.startswith(prefix) and column[len(prefix):] not in profiles]
+        if stale:
+            self.df = self.df.drop(columns=stale)
+            print(f"🧹 删除不在当前权重方案中的列: {', '.join(stale)}")
+
+    def update_tables(self, cpu_dict=None, gpu_dict=None, ram_dict=None, storage_dict=None):
+        """评分表变化后只更新受影响的行，返回更新的行数"""
+        changed_rows = []
+
+        # CPU/显卡：分数变化的型号 -> 匹配到这些型号的行
+        for score_column, score_dict in [('CPU_Score', cpu_dict), ('GPU_Score', gpu_dict)]:
+            if score_dict is None:
+                continue
+            categories = self.df[self.KEY_COLUMNS[score_column]].cat.categories
+            new_scores = categories.map(lambda name: score_dict.get(name, np.nan)).to_numpy(dtype=float)
+            changed_rows.append(self._apply_category_scores(score_column, new_scores))
+
+        # 内存/硬盘：按新评分表重算每个不同的值
+        for score_column, column, score_dict in [('RAM_Score', 'RAM', ram_dict),
+                                                 ('Storage_Score', 'Storage', storage_dict)]:
+            if score_dict is None:
+                continue
+            categories = pd.Series(self.df[column].cat.categories, dtype=object)
+            new_scores = self.score_calculator.score_values(column, categories, score_dict)
+            changed_rows.append(self._apply_category_scores(score_column, new_scores.astype(float)))
+
+        rows = np.unique(np.concatenate(changed_rows)) if changed_rows else np.array([], dtype=np.int64)
+        if len(rows):
+            total_position = self.df.columns.get_loc('Total_Score')
+            totals = self.score_calculator.compute_total(self.df.iloc[rows]).to_numpy()
+            self.df.iloc[rows, total_position] = totals.astype(self.df['Total_Score'].dtype)
+            self._refresh_profile_totals()
+
+        print(f"🔁 评分表变化影响 {len(rows):,} 行")
+        return len(rows)
+
+    def _apply_category_scores(self, score_column, new_scores):
+        """把分数变化的型号写回对应行（新分数为NaN的型号不在评分表中，保持不变），返回变化的行号"""
+        old_scores = self._category_scores(score_column)
+        changed = np.flatnonzero(~np.isnan(new_scores) & ~np.isnan(old_scores) & (new_scores != old_scores))
+        rows = self.rows_for(self.KEY_COLUMNS[score_column], changed)
+        if len(rows):
+            # 新分数可能放不进原来的类型（如uint8列出现小数），整列按评分列类型重新转换
+            codes = self.df[self.KEY_COLUMNS[score_column]].cat.codes.to_numpy()[rows]
+            scores = score_array(self.df[score_column])
+            scores[rows] = new_scores[codes]
+            self.df[score_column] = compact_scores(scores, score_dtype(score_column))
+        return rows
+
+    def scored_frame(self):
+        """去掉匹配列后的评分结果"""
+        return self.df.drop(columns=self.MATCH_COLUMNS)
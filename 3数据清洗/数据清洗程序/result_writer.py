@@ -0,0 +1,162 @@
+"""
+结果输出模块 - 按格式流式写出评分结果（CSV/压缩CSV/Parquet/XLSX），多种格式并发写出
+"""
+
+import io
+import gzip
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+
+class ResultWriter:
+    """结果写出器 - 每种格式写到 <输出前缀><扩展名>，按块写出，内存占用与总行数无关"""
+
+    # 格式 -> (扩展名, 写出方法名)
+    FORMATS = {
+        'csv': ('.csv', '_write_csv'),
+        'csv.gz': ('.csv.gz', '_write_csv'),
+        'csv.zst': ('.csv.zst', '_write_csv'),
+        'parquet': ('.parquet', '_write_parquet'),
+        'xlsx': ('.xlsx', '_write_xlsx'),
+    }
+
+    DEFAULT_FORMATS = ('csv', 'xlsx')
+
+    # Excel单个工作表的最大行数（含表头）
+    EXCEL_MAX_ROWS = 1048576
+
+    # 每块行数
+    CHUNK_ROWS = 100000
+
+    def __init__(self, formats=DEFAULT_FORMATS, chunk_rows=CHUNK_ROWS, excel_max_rows=EXCEL_MAX_ROWS):
+        unknown = [output_format for output_format in formats if output_format not in self.FORMATS]
+        if unknown:
+            raise ValueError(f"不支持的输出格式: {', '.join(unknown)}（可选: {', '.join(self.FORMATS)}）")
+        self.formats = list(dict.fromkeys(formats))
+        self.chunk_rows = chunk_rows
+        self.excel_max_rows = excel_max_rows
+
+    def write(self, df, output_prefix):
+        """并发写出所有格式，返回写出的文件路径列表"""
+        with ThreadPoolExecutor(max_workers=len(self.formats)) as executor:
+            futures = []
+            for output_format in self.formats:
+                extension, method = self.FORMATS[output_format]
+                path = output_prefix + extension
+                futures.append((output_format, path, executor.submit(getattr(self, method), df, path)))
+
+            paths = []
+            for output_format, path, future in futures:
+                future.result()
+                print(f"✅ {output_format.upper()}文件已保存: {path}")
+                paths.append(path)
+        return paths
+
+    def _chunks(self, df):
+        for start in range(0, len(df), self.chunk_rows):
+            yield start, df.iloc[start:start + self.chunk_rows]
+
+    def _open_text(self, path):
+        """按扩展名打开文本输出流（.gz用gzip，.zst需要zstandard）"""
+        if path.endswith('.gz'):
+            return gzip.open(path, 'wt', encoding='utf-8-sig', newline='')
+        if path.endswith('.zst'):
+            try:
+                import zstandard
+            except ImportError as e:
+                raise ImportError("csv.zst格式需要安装zstandard: pip install zstandard") from e
+            raw = zstandard.ZstdCompressor().stream_writer(open(path, 'wb'))
+            return io.TextIOWrapper(raw, encoding='utf-8-sig', newline='')
+        return open(path, 'w', encoding='utf-8-sig', newline='')
+
+    def _write_csv(self, df, path):
+        """分块写出CSV：只有第一块写表头，BOM只在文件开头写一次"""
+        with self._open_text(path) as f:
+            if len(df) == 0:
+                df.to_csv(f, index=False)
+            for start, chunk in self._chunks(df):
+                chunk.to_csv(f, index=False, header=start == 0)
+
+    def _write_parquet(self, df, path):
+        """分块写出Parquet，每块一个行组"""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("parquet格式需要安装pyarrow: pip install pyarrow") from e
+
+        schema = self._parquet_schema(df, pa)
+        with pq.ParquetWriter(path, schema) as writer:
+            for _, chunk in self._chunks(df):
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if not table.schema.equals(schema):
+                    # 各块按自身的值推断类型（如object列某块全为缺失值时为null），统一为文件的schema
+                    table = table.cast(schema)
+                writer.write_table(table)
+
+    def _parquet_schema(self, df, pa):
+        """由第一块数据推断Parquet的schema
+
+        object列的类型由值推断，只看第一块时可能与后续块不一致（如第一块全为缺失值时为null），
+        改为按整列推断，得到所有块共同的类型。
+        """
+        schema = pa.Table.from_pandas(df.head(self.chunk_rows), preserve_index=False).schema
+        for index, field in enumerate(schema):
+            if df[field.name].dtype == object:
+                schema = schema.set(index, field.with_type(pa.infer_type(df[field.name], from_pandas=True)))
+        return schema
+
+    def _excel_rows(self, df):
+        """逐行产生Excel单元格值（缺失值为空单元格）"""
+        for _, chunk in self._chunks(df):
+            columns = [self._excel_values(chunk[column]) for column in chunk.columns]
+            for row in zip(*columns):
+                yield [None if pd.isna(value) else value for value in row]
+
+    @staticmethod
+    def _excel_values(series):
+        """列的单元格值；float32按最短十进制表示转为float（57.27而不是57.27000045776367）"""
+        if series.dtype == np.float32:
+            return series.to_numpy().astype(str).astype(np.float64).tolist()
+        return series.tolist()
+
+    def _write_xlsx(self, df, path):
+        """常量内存写出XLSX，超过单表行数上限时拆分为多个工作表（Sheet1、Sheet2……）"""
+        try:
+            import xlsxwriter
+        except ImportError:
+            xlsxwriter = None
+
+        header = [str(column) for column in df.columns]
+        rows_per_sheet = self.excel_max_rows - 1
+
+        if xlsxwriter is not None:
+            # xlsxwriter常量内存模式：每行写完即刷到临时文件
+            workbook = xlsxwriter.Workbook(path, {'constant_memory': True, 'nan_inf_to_errors': True})
+            sheet, row_number = None, rows_per_sheet
+            for row in self._excel_rows(df):
+                if row_number == rows_per_sheet:
+                    sheet = workbook.add_worksheet(f'Sheet{len(workbook.worksheets()) + 1}')
+                    sheet.write_row(0, 0, header)
+                    row_number = 0
+                row_number += 1
+                sheet.write_row(row_number, 0, row)
+            if sheet is None:
+                workbook.add_worksheet('Sheet1').write_row(0, 0, header)
+            workbook.close()
+            return
+
+        # 未安装xlsxwriter时使用openpyxl的只写模式（同样逐行流式写出）
+        from openpyxl import Workbook
+        workbook = Workbook(write_only=True)
+        sheet, row_number = None, rows_per_sheet
+        for row in self._excel_rows(df):
+            if row_number == rows_per_sheet:
+                sheet = workbook.create_sheet(f'Sheet{len(workbook.worksheets) + 1}')
+                sheet.append(header)
+                row_number = 0
+            row_number += 1
+            sheet.append(row)
+        if sheet is None:
+            workbook.create_sheet('Sheet1').append(header)
+        workbook.save(path)
@@ -6,64 +6,294 @@ import pandas as pd
 import numpy as np
 import re
 from tqdm import tqdm
+from .dtypes import is_categorical, take_by_codes, enforce_score_dtypes, score_array, FLOAT_SCORE_DTYPE
+from .keyword_matcher import KeywordMatcher
+from .report_aggregator import ReportAggregator
 
 class ScoreCalculator:
     """评分计算器 - 计算硬件配置总分"""
     
-    def __init__(self):
-        self.weights = {
-            'GPU': 0.4,    # 显卡权重 40%
-            'CPU': 0.3,    # CPU权重 30%
-            'RAM': 0.2,    # 内存权重 20%
-            'Storage': 0.1  # 硬盘权重 10%
-        }
+    # 硬盘容量规则（按优先级排列）：(分数, [条件组])
+    STORAGE_CAPACITY_RULES = [
+        (100, [('4tb', '4t')]),
+        (90, [('2tb', '2t')]),
+        (60, [('1tb', '1t')]),
+        (30, [('512gb', '512g')]),
+        (20, [('256gb', '256g')]),
+        (10, [('128gb', '128g')]),
+    ]
+    
+    # 硬盘类型系数
+    STORAGE_TYPE_RULES = [
+        (1.2, [('nvme', 'pcie')]),  # NVMe SSD性能更好
+        (1.0, [('ssd',)]),  # 普通SSD
+        (0.6, [('hdd',)]),  # HDD性能较差
+    ]
+    
+    # 评分表未命中时按内存容量分档：(最小容量GB, 分数)
+    RAM_CAPACITY_TIERS = [(64, 100), (48, 90), (32, 80), (24, 70), (16, 60), (8, 20), (4, 10)]
+    
+    # RAM/Storage评分引擎：vectorized（对不同的值整列向量化计算）、legacy（逐值调用）
+    ENGINES = ('vectorized', 'legacy')
+    
+    # 默认总分权重
+    DEFAULT_WEIGHTS = {
+        'GPU': 0.4,    # 显卡权重 40%
+        'CPU': 0.3,    # CPU权重 30%
+        'RAM': 0.2,    # 内存权重 20%
+        'Storage': 0.1  # 硬盘权重 10%
+    }
+    
+    # 预设的权重方案（未列出的项使用默认权重）
+    WEIGHT_PROFILES = {
+        'default': DEFAULT_WEIGHTS,
+        'esports': {'GPU': 0.3, 'CPU': 0.45, 'RAM': 0.15, 'Storage': 0.1},   # 电竞：高帧率依赖CPU
+        '4k': {'GPU': 0.6, 'CPU': 0.2, 'RAM': 0.15, 'Storage': 0.05},        # 4K：显卡决定画质和帧率
+        'laptop': {'GPU': 0.35, 'CPU': 0.35, 'RAM': 0.2, 'Storage': 0.1},    # 笔记本：CPU/GPU功耗受限，两者并重
+    }
+    
+    # 性能等级阶梯（按最低分升序）：总分 >= 最低分即达到该等级，最低一级不设下限
+    PERFORMANCE_TIERS = [
+        (None, '基础级'),
+        (50, '入门级'),
+        (60, '中端'),
+        (70, '中高端'),
+        (80, '高端'),
+        (90, '顶级'),
+    ]
+    
+    # 分项分数列，顺序与权重矩阵的行一致
+    COMPONENT_COLUMNS = {'GPU': 'GPU_Score', 'CPU': 'CPU_Score', 'RAM': 'RAM_Score', 'Storage': 'Storage_Score'}
+    
+    def __init__(self, inplace=False, engine='vectorized', weights=None, keep_matches=False, profiles=None,
+                 performance_tiers=None):
+        # 原地模式：评分列直接写入传入的DataFrame
+        self.inplace = inplace
+        if engine not in self.ENGINES:
+            raise ValueError(f"不支持的评分引擎: {engine}")
+        self.engine = engine
+        self.weights = dict(self.DEFAULT_WEIGHTS)
+        self.update_weights(weights or {})
+        # 保留CPU_Match/GPU_Match列，供增量重算使用
+        self.keep_matches = keep_matches
+        # 额外的权重方案：预设名称列表或 名称 -> 权重 的字典，每个方案输出一列Total_Score_<名称>
+        self.profiles = self._resolve_profiles(profiles)
+        # 性能等级阶梯，格式同PERFORMANCE_TIERS
+        self.level_thresholds, self.level_names = self._resolve_tiers(performance_tiers or self.PERFORMANCE_TIERS)
+        
+        # 关键词规则编译为自动机，每个值只扫描一次
+        self.storage_capacity_matcher = KeywordMatcher(self.STORAGE_CAPACITY_RULES, default=0)
+        self.storage_type_matcher = KeywordMatcher(self.STORAGE_TYPE_RULES, default=1.0)
+        self.dict_matchers = {}
     
     def calculate_scores(self, df, ram_dict, storage_dict):
         """计算所有评分"""
         print("🧮 计算各项评分...")
         
-        result_df = df.copy()
+        result_df = df if self.inplace else df.copy()
         
         # 1. 计算RAM分数
         print("计算RAM分数...")
-        result_df['RAM_Score'] = result_df['RAM'].progress_apply(
-            lambda x: self._calculate_ram_score(x, ram_dict)
-        )
+        if self.engine == 'vectorized':
+            result_df['RAM_Score'] = self.score_values('RAM', result_df['RAM'], ram_dict)
+        else:
+            # 评分表的关键词自动机每次计算只取一次，逐值计算时直接使用
+            ram_matcher = self._dict_matcher(ram_dict)
+            result_df['RAM_Score'] = self._score_column(
+                result_df['RAM'], lambda x: self._calculate_ram_score(x, ram_matcher)
+            )
         
         # 2. 计算Storage分数
         print("计算Storage分数...")
-        result_df['Storage_Score'] = result_df['Storage'].progress_apply(
-            lambda x: self._calculate_storage_score(x, storage_dict)
-        )
+        if self.engine == 'vectorized':
+            result_df['Storage_Score'] = self.score_values('Storage', result_df['Storage'], storage_dict)
+        else:
+            storage_matcher = self._dict_matcher(storage_dict)
+            result_df['Storage_Score'] = self._score_column(
+                result_df['Storage'], lambda x: self._calculate_storage_score(x, storage_matcher)
+            )
         
         # 3. 计算总分（使用已匹配的CPU_Score和GPU_Score）
         print("计算总分...")
-        result_df['Total_Score'] = (
-            self.weights['GPU'] * result_df['GPU_Score'] +
-            self.weights['CPU'] * result_df['CPU_Score'] +
-            self.weights['RAM'] * result_df['RAM_Score'] +
-            self.weights['Storage'] * result_df['Storage_Score']
-        ).round(2)
+        result_df['Total_Score'] = self.compute_total(result_df)
+        if self.profiles:
+            self.add_profile_totals(result_df)
         
         # 4. 移除临时匹配列
-        if 'CPU_Match' in result_df.columns:
-            result_df.drop(columns=['CPU_Match'], inplace=True)
-        if 'GPU_Match' in result_df.columns:
-            result_df.drop(columns=['GPU_Match'], inplace=True)
+        if not self.keep_matches:
+            if 'CPU_Match' in result_df.columns:
+                result_df.drop(columns=['CPU_Match'], inplace=True)
+            if 'GPU_Match' in result_df.columns:
+                result_df.drop(columns=['GPU_Match'], inplace=True)
+        
+        # 5. 评分列转为紧凑类型（分项uint8/float32，总分float32）
+        return enforce_score_dtypes(result_df)
+    
+    def update_weights(self, weights):
+        """更新部分或全部总分权重（键为GPU/CPU/RAM/Storage）"""
+        self._check_weight_keys(weights)
+        self.weights.update({key: float(value) for key, value in weights.items()})
+    
+    def _check_weight_keys(self, weights):
+        """权重项只能是GPU/CPU/RAM/Storage"""
+        unknown = set(weights) - set(self.DEFAULT_WEIGHTS)
+        if unknown:
+            raise ValueError(f"未知的权重项: {', '.join(sorted(unknown))}")
+    
+    def _resolve_profiles(self, profiles):
+        """把权重方案整理为 名称 -> 完整权重 的字典"""
+        if not profiles:
+            return {}
+        if not isinstance(profiles, dict):
+            unknown = [name for name in profiles if name not in self.WEIGHT_PROFILES]
+            if unknown:
+                raise ValueError(f"未知的权重方案: {', '.join(unknown)}（可选: {', '.join(self.WEIGHT_PROFILES)}）")
+            profiles = {name: self.WEIGHT_PROFILES[name] for name in profiles}
+        
+        resolved = {}
+        for name, weights in profiles.items():
+            self._check_weight_keys(weights)
+            resolved[name] = {key: float(weights.get(key, default)) for key, default in self.DEFAULT_WEIGHTS.items()}
+        return resolved
+    
+    @staticmethod
+    def _resolve_tiers(tiers):
+        """检查等级阶梯，返回(升序的等级下限数组, 从低到高的等级名称)"""
+        if len(tiers) < 1 or tiers[0][0] is not None:
+            raise ValueError("等级阶梯的第一级（最低一级）不设下限，应为 (None, 名称)")
+        thresholds = np.array([threshold for threshold, _ in tiers[1:]], dtype=float)
+        if np.any(np.diff(thresholds) <= 0):
+            raise ValueError(f"等级下限必须严格递增: {thresholds.tolist()}")
+        return thresholds, [name for _, name in tiers]
+    
+    def add_profile_totals(self, df):
+        """按所有权重方案计算总分：(N×4)分项分数矩阵乘以(4×K)权重矩阵，一次得到K列总分
+        
+        乘积按分项逐列累加（GPU、CPU、RAM、Storage），求和顺序与compute_total相同，
+        保留两位小数后与单独按该权重计算的总分完全一致。
+        """
+        components = np.column_stack([score_array(df[column]) for column in self.COMPONENT_COLUMNS.values()])
+        weight_matrix = np.array([[weights[key] for weights in self.profiles.values()]
+                                  for key in self.COMPONENT_COLUMNS])
+        totals = components[:, :1] * weight_matrix[0]
+        for row in range(1, len(weight_matrix)):
+            totals = totals + components[:, row:row + 1] * weight_matrix[row]
+        totals = np.round(totals, 2)
+        for position, name in enumerate(self.profiles):
+            df[f'Total_Score_{name}'] = totals[:, position].astype(FLOAT_SCORE_DTYPE)
+        return df
+    
+    def compute_total(self, df):
+        """按当前权重计算总分（保留两位小数，float64）"""
+        total = (
+            self.weights['GPU'] * score_array(df['GPU_Score']) +
+            self.weights['CPU'] * score_array(df['CPU_Score']) +
+            self.weights['RAM'] * score_array(df['RAM_Score']) +
+            self.weights['Storage'] * score_array(df['Storage_Score'])
+        )
+        return pd.Series(np.round(total, 2), index=df.index)
+    
+    def score_values(self, column, series, score_dict):
+        """向量化计算RAM或Storage列的分数，返回与series等长的数组"""
+        if column not in ('RAM', 'Storage'):
+            raise ValueError(f"不支持的评分列: {column}")
+        score_func = self._ram_scores if column == 'RAM' else self._storage_scores
+        return self._score_unique_values(series, lambda values: score_func(values, score_dict),
+                                         self._score_dtype(score_dict))
+    
+    def _score_column(self, series, score_func):
+        """逐值计算分数；分类列只对每个类别计算一次，再按编码广播"""
+        if is_categorical(series):
+            return take_by_codes(series, score_func)
+        return series.progress_apply(score_func)
+    
+    @staticmethod
+    def _score_unique_values(series, score_values, dtype):
+        """对列中不同的值（大写字符串Series）整体向量化计算分数，再按编码广播回每一行（缺失值为0分）"""
+        if is_categorical(series):
+            series = series.cat.remove_unused_categories()
+            codes = series.cat.codes.to_numpy().astype(np.int64)
+            uniques = series.cat.categories
+        else:
+            codes, uniques = pd.factorize(series)
+        
+        values = pd.Series(uniques, dtype=object).astype(str).str.upper()
+        scores = np.append(score_values(values), 0).astype(dtype)
+        codes[codes < 0] = len(scores) - 1
+        return scores[codes]
+    
+    @staticmethod
+    def _score_dtype(score_dict):
+        """评分列类型：评分表分数全为整数时为int64，否则为float64"""
+        if all(isinstance(score, (int, np.integer)) for score in score_dict.values()):
+            return np.int64
+        return np.float64
+    
+    @staticmethod
+    def _contains_any(lowered, keywords, digit_boundary=False):
+        """小写字符串Series是否包含任一关键词（digit_boundary时关键词前不能是数字），返回布尔数组"""
+        prefix = r'(?<!\d)' if digit_boundary else ''
+        pattern = '|'.join(prefix + re.escape(keyword.lower()) for keyword in keywords)
+        return lowered.str.contains(pattern, regex=True).to_numpy(dtype=bool)
+    
+    def _rule_scores(self, lowered, rules, default):
+        """按KeywordMatcher规则（每组任一关键词出现、所有组都满足）向量化取优先级最高的结果值"""
+        conditions = [np.logical_and.reduce([self._contains_any(lowered, group) for group in groups])
+                      for _, groups in rules]
+        return np.select(conditions, [value for value, _ in rules], default=default)
+    
+    def _dict_scores(self, lowered, score_dict):
+        """评分表关键词的向量化匹配（与_dict_matcher优先级一致），返回(是否命中, 分数)"""
+        priority = KeywordMatcher.dict_priority(score_dict)
+        conditions = [self._contains_any(lowered, [keyword], digit_boundary=True) for keyword, _ in priority]
+        if not conditions:
+            return np.zeros(len(lowered), dtype=bool), np.zeros(len(lowered))
+        scores = np.select(conditions, [score for _, score in priority], default=0)
+        return np.logical_or.reduce(conditions), scores
+    
+    def _ram_scores(self, values, ram_dict):
+        """向量化计算不同RAM值的分数，结果与_calculate_ram_score一致"""
+        matched, dict_scores = self._dict_scores(values.str.lower(), ram_dict)
+        
+        gb = pd.to_numeric(values.str.extract(r'(\d+)GB', expand=False)).to_numpy(dtype=float)
+        capacity_scores = np.select([gb >= min_gb for min_gb, _ in self.RAM_CAPACITY_TIERS],
+                                    [score for _, score in self.RAM_CAPACITY_TIERS], default=0)
         
-        return result_df
+        return np.where(matched, dict_scores, capacity_scores)
     
-    def _calculate_ram_score(self, ram_str, ram_dict):
-        """计算RAM分数"""
+    def _storage_scores(self, values, storage_dict):
+        """向量化计算不同Storage值的分数，结果与_calculate_storage_score一致"""
+        # 多个存储设备按 '+' 拆开（拆出的片段去除首尾空白），每个值取片段中的最高分
+        parts = values.str.split('+', regex=False).explode()
+        multiple = values.str.contains('+', regex=False).to_numpy(dtype=bool)[parts.index.to_numpy()]
+        parts = parts.where(~multiple, parts.str.strip())
+        
+        part_codes, part_values = pd.factorize(parts)
+        part_scores = self._single_storage_scores(pd.Series(part_values, dtype=object).astype(str), storage_dict)
+        scores = pd.Series(part_scores[part_codes], index=parts.index).groupby(level=0).max()
+        return scores.to_numpy()
+    
+    def _single_storage_scores(self, values, storage_dict):
+        """向量化计算单个存储设备的分数，结果与_get_single_storage_score一致"""
+        lowered = values.str.lower()
+        matched, dict_scores = self._dict_scores(lowered, storage_dict)
+        
+        capacity_scores = self._rule_scores(lowered, self.STORAGE_CAPACITY_RULES, 0)
+        type_multipliers = self._rule_scores(lowered, self.STORAGE_TYPE_RULES, 1.0)
+        
+        return np.where(matched, dict_scores, np.trunc(capacity_scores * type_multipliers))
+    
+    def _calculate_ram_score(self, ram_str, ram_matcher):
+        """计算RAM分数（ram_matcher为内存评分表的关键词自动机）"""
         if pd.isna(ram_str):
             return 0
         
         ram_str = str(ram_str).upper()
         
-        # 尝试精确匹配
-        for ram_key in ram_dict.keys():
-            if ram_key.upper() in ram_str:
-                return ram_dict[ram_key]
+        # 尝试精确匹配（最长的关键词优先）
+        score = ram_matcher.match(ram_str)
+        if score is not None:
+            return score
         
         # 提取容量并匹配
         match = re.search(r'(\d+)GB', ram_str)
@@ -71,25 +301,14 @@ class ScoreCalculator:
             gb = int(match.group(1))
             
             # 根据容量范围分配分数
-            if gb >= 64:
-                return 100
-            elif gb >= 48:
-                return 90
-            elif gb >= 32:
-                return 80
-            elif gb >= 24:
-                return 70
-            elif gb >= 16:
-                return 60
-            elif gb >= 8:
-                return 20
-            elif gb >= 4:
-                return 10
+            for min_gb, score in self.RAM_CAPACITY_TIERS:
+                if gb >= min_gb:
+                    return score
         
         return 0
     
-    def _calculate_storage_score(self, storage_str, storage_dict):
-        """计算Storage分数"""
+    def _calculate_storage_score(self, storage_str, storage_matcher):
+        """计算Storage分数（storage_matcher为硬盘评分表的关键词自动机）"""
         if pd.isna(storage_str):
             return 0
         
@@ -101,73 +320,58 @@ class ScoreCalculator:
             parts = storage_str.split('+')
             scores = []
             for part in parts:
-                score = self._get_single_storage_score(part.strip(), storage_dict)
+                score = self._get_single_storage_score(part.strip(), storage_matcher)
                 scores.append(score)
             return max(scores) if scores else 0
         
-        return self._get_single_storage_score(storage_str, storage_dict)
+        return self._get_single_storage_score(storage_str, storage_matcher)
     
-    def _get_single_storage_score(self, storage_str, storage_dict):
+    def _get_single_storage_score(self, storage_str, storage_matcher):
         """获取单个存储设备的分数"""
-        # 尝试精确匹配
-        for storage_key in storage_dict.keys():
-            if storage_key.upper() in storage_str:
-                return storage_dict[storage_key]
+        # 尝试精确匹配（最长的关键词优先）
+        score = storage_matcher.match(storage_str)
+        if score is not None:
+            return score
         
         # 基于容量和类型推断
-        storage_lower = storage_str.lower()
-        
-        # 检查容量
-        capacity_score = 0
-        if '4tb' in storage_lower or '4t' in storage_lower:
-            capacity_score = 100
-        elif '2tb' in storage_lower or '2t' in storage_lower:
-            capacity_score = 90
-        elif '1tb' in storage_lower or '1t' in storage_lower:
-            capacity_score = 60
-        elif '512gb' in storage_lower or '512g' in storage_lower:
-            capacity_score = 30
-        elif '256gb' in storage_lower or '256g' in storage_lower:
-            capacity_score = 20
-        elif '128gb' in storage_lower or '128g' in storage_lower:
-            capacity_score = 10
-        
-        # 检查存储类型
-        type_multiplier = 1.0
-        if 'nvme' in storage_lower or 'pcie' in storage_lower:
-            type_multiplier = 1.2  # NVMe SSD性能更好
-        elif 'ssd' in storage_lower:
-            type_multiplier = 1.0  # 普通SSD
-        elif 'hdd' in storage_lower:
-            type_multiplier = 0.6  # HDD性能较差
+        capacity_score = self.storage_capacity_matcher.match(storage_str)
+        type_multiplier = self.storage_type_matcher.match(storage_str)
         
         return int(capacity_score * type_multiplier)
     
+    def _dict_matcher(self, score_dict):
+        """评分表对应的关键词自动机（按表内容缓存）"""
+        key = tuple(score_dict.items())
+        if key not in self.dict_matchers:
+            self.dict_matchers[key] = KeywordMatcher.from_dict(score_dict, digit_boundary=True)
+        return self.dict_matchers[key]
+    
     def add_performance_level(self, df):
         """添加性能等级"""
         print("🏷️ 添加性能等级...")
         
-        def get_performance_level(score):
-            if score >= 90:
-                return '顶级'
-            elif score >= 80:
-                return '高端'
-            elif score >= 70:
-                return '中高端'
-            elif score >= 60:
-                return '中端'
-            elif score >= 50:
-                return '入门级'
-            else:
-                return '基础级'
-        
-        df['Performance_Level'] = df['Total_Score'].apply(get_performance_level)
+        df['Performance_Level'] = self.performance_levels(df['Total_Score'])
+        # 各权重方案的总分对应的等级
+        for name in self.profiles:
+            if f'Total_Score_{name}' in df.columns:
+                df[f'Performance_Level_{name}'] = self.performance_levels(df[f'Total_Score_{name}'])
         return df
     
-    def generate_report(self, df):
-        """生成分析报告"""
+    def performance_levels(self, scores):
+        """按等级阶梯分箱：一次searchsorted得到等级编号，返回有序分类（缺失的总分归为最低一级）"""
+        values = score_array(scores)
+        codes = np.searchsorted(self.level_thresholds, values, side='right')
+        codes[np.isnan(values)] = 0
+        levels = pd.Categorical.from_codes(codes, categories=self.level_names, ordered=True)
+        return pd.Series(levels, index=getattr(scores, 'index', None), name='Performance_Level')
+    
+    def generate_report(self, df, sketches=None):
+        """生成分析报告（sketches为分位数草图时中位数取自草图）"""
         print("📊 生成分析报告...")
-        
+        return self.render_report(ReportAggregator(sketches=sketches).aggregate(df))
+    
+    def render_report(self, stats):
+        """把ReportStatistics渲染为报告文本"""
         report_lines = []
         report_lines.append("=" * 60)
         report_lines.append("📈 玩家配置评分分析报告")
@@ -175,60 +379,52 @@ class ScoreCalculator:
         
         # 基础统计
         report_lines.append(f"\n📊 基础统计")
-        report_lines.append(f"总记录数: {len(df):,}")
-        report_lines.append(f"数据年份范围: {df['Year'].min()} - {df['Year'].max()}")
+        report_lines.append(f"总记录数: {stats.total_rows:,}")
+        if stats.year_range:
+            report_lines.append(f"数据年份范围: {stats.year_range[0]} - {stats.year_range[1]}")
         
         # 设备类型分布
-        if 'Type' in df.columns:
-            type_dist = df['Type'].value_counts()
+        if stats.type_counts is not None:
             report_lines.append(f"\n💻 设备类型分布:")
-            for type_name, count in type_dist.items():
-                report_lines.append(f"  {type_name}: {count:,} ({count/len(df):.1%})")
+            for type_name, count in stats.type_counts:
+                report_lines.append(f"  {type_name}: {count:,} ({count/stats.total_rows:.1%})")
         
         # 评分统计
         report_lines.append(f"\n🎯 评分统计:")
-        for score_col in ['CPU_Score', 'GPU_Score', 'RAM_Score', 'Storage_Score', 'Total_Score']:
-            if score_col in df.columns:
-                report_lines.append(f"\n{score_col}:")
-                report_lines.append(f"  平均值: {df[score_col].mean():.2f}")
-                report_lines.append(f"  中位数: {df[score_col].median():.2f}")
-                report_lines.append(f"  最大值: {df[score_col].max():.2f}")
-                report_lines.append(f"  最小值: {df[score_col].min():.2f}")
-                report_lines.append(f"  标准差: {df[score_col].std():.2f}")
+        for score_col, summary in stats.score_summary.items():
+            report_lines.append(f"\n{score_col}:")
+            report_lines.append(f"  平均值: {summary['mean']:.2f}")
+            report_lines.append(f"  中位数: {summary['median']:.2f}")
+            report_lines.append(f"  最大值: {summary['max']:.2f}")
+            report_lines.append(f"  最小值: {summary['min']:.2f}")
+            report_lines.append(f"  标准差: {summary['std']:.2f}")
         
         # 性能等级分布
-        if 'Performance_Level' in df.columns:
+        if stats.level_counts is not None:
             report_lines.append(f"\n🏆 性能等级分布:")
-            level_dist = df['Performance_Level'].value_counts().sort_index()
-            for level, count in level_dist.items():
-                report_lines.append(f"  {level}: {count:,} ({count/len(df):.1%})")
+            for level, count in stats.level_counts:
+                report_lines.append(f"  {level}: {count:,} ({count/stats.total_rows:.1%})")
         
         # 高分配置（前10）
-        report_lines.append(f"\n⭐ 最高分配置（前10）:")
-        top_configs = df.nlargest(10, 'Total_Score')[['ID', 'CPU', 'GPU', 'RAM', 'Storage', 'Total_Score']]
-        for _, row in top_configs.iterrows():
-            report_lines.append(f"  ID {row['ID']}: {row['Total_Score']:.2f}分")
-            report_lines.append(f"    CPU: {row['CPU']}")
-            report_lines.append(f"    GPU: {row['GPU']}")
-            report_lines.append(f"    RAM: {row['RAM']}, Storage: {row['Storage']}")
+        if stats.top_configs is not None:
+            report_lines.append(f"\n⭐ 最高分配置（前10）:")
+            for _, row in stats.top_configs.iterrows():
+                report_lines.append(f"  ID {row['ID']}: {row['Total_Score']:.2f}分")
+                report_lines.append(f"    CPU: {row['CPU']}")
+                report_lines.append(f"    GPU: {row['GPU']}")
+                report_lines.append(f"    RAM: {row['RAM']}, Storage: {row['Storage']}")
         
         # 各年性能趋势
-        if 'Year' in df.columns:
+        if stats.yearly_means is not None:
             report_lines.append(f"\n📅 按年份性能趋势:")
-            yearly_avg = df.groupby('Year')['Total_Score'].mean().round(2)
-            for year, avg_score in yearly_avg.items():
+            for year, avg_score in stats.yearly_means:
                 report_lines.append(f"  {year}年: 平均{avg_score}分")
         
         # 相关性分析
-        report_lines.append(f"\n🔗 相关性分析:")
-        score_columns = ['CPU_Score', 'GPU_Score', 'RAM_Score', 'Storage_Score']
-        correlation_matrix = df[score_columns].corr()
-        
-        for i, col1 in enumerate(score_columns):
-            for j, col2 in enumerate(score_columns):
-                if i < j:
-                    corr = correlation_matrix.loc[col1, col2]
-                    report_lines.append(f"  {col1} vs {col2}: {corr:.3f}")
+        if stats.correlations is not None:
+            report_lines.append(f"\n🔗 相关性分析:")
+            for col1, col2, corr in stats.correlations:
+                report_lines.append(f"  {col1} vs {col2}: {corr:.3f}")
         
         report_lines.append("=" * 60)
         
@@ -0,0 +1,102 @@
+"""
+阶段缓存模块 - 把处理流程各阶段的输出按内容指纹保存为列式文件，输入、参数和代码都未变化的阶段直接读取
+"""
+
+import os
+import inspect
+import glob
+import json
+import pandas as pd
+from .match_cache import MatchCache
+
+class StageCache:
+    """阶段缓存 - 每个阶段的键由上游阶段的键、输入文件内容、参数和相关模块的源码共同决定
+
+    上游阶段变化时键随之变化，下游阶段自动重算；每个阶段保留最近使用的max_entries份输出
+    （按数据文件的修改时间淘汰，命中时刷新），在几组参数或输入之间切换时不会反复重算。
+    输出为DataFrame（安装pyarrow时保存为parquet，否则为pickle），附带的统计信息保存为同名JSON。
+    """
+
+    # 每个阶段默认保留的输出份数
+    MAX_ENTRIES = 4
+
+    def __init__(self, directory='cache/stages', max_entries=MAX_ENTRIES):
+        self.directory = directory
+        self.max_entries = max_entries
+        os.makedirs(directory, exist_ok=True)
+        self.extension = '.parquet' if self._has_pyarrow() else '.pkl'
+
+    @staticmethod
+    def _has_pyarrow():
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    @staticmethod
+    def source_files(*objects):
+        """类或模块所在的源文件，用于把代码版本计入阶段的键"""
+        return [inspect.getsourcefile(obj) for obj in objects]
+
+    @staticmethod
+    def key(name, files=(), upstream=None, **options):
+        """阶段的键：阶段名、上游阶段的键、文件内容（数据文件、源码）和参数（含评分表内容）的SHA-256指纹"""
+        options_text = json.dumps(options, ensure_ascii=False, default=str)
+        return MatchCache.fingerprint_files(files, name, upstream, options_text)
+
+    def _path(self, name, key):
+        return os.path.join(self.directory, f'{name}-{key[:16]}')
+
+    def run(self, name, key, compute, restore=None):
+        """读取阶段缓存，未命中时调用compute()计算并保存，返回阶段输出的DataFrame
+
+        compute返回(DataFrame, 统计信息字典)；命中缓存时把保存的统计信息传给restore（如合并匹配统计）。
+        """
+        path = self._path(name, key)
+        if os.path.exists(path + self.extension):
+            print(f"⏭️ 阶段[{name}]未变化，读取缓存: {path + self.extension}")
+            with open(path + '.json', encoding='utf-8') as f:
+                meta = json.load(f)
+            if restore is not None:
+                restore(meta)
+            # 刷新修改时间，作为最近使用时间
+            os.utime(path + self.extension)
+            return self._read(path + self.extension)
+
+        df, meta = compute()
+        # 统计信息先写：数据文件存在即视为命中
+        with open(path + '.json', 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, default=self._to_python)
+        self._write(df, path + self.extension)
+        print(f"💾 阶段[{name}]输出已缓存: {path + self.extension}")
+        self._evict(name)
+        return df
+
+    def _evict(self, name):
+        """按最近使用时间只保留该阶段最新的max_entries份输出，删除更早的输出及其统计信息"""
+        data_paths = glob.glob(os.path.join(self.directory, f'{name}-*{self.extension}'))
+        data_paths.sort(key=os.path.getmtime, reverse=True)
+        for data_path in data_paths[self.max_entries:]:
+            for old_path in (data_path, data_path[:-len(self.extension)] + '.json'):
+                if os.path.exists(old_path):
+                    os.remove(old_path)
+
+    def _read(self, path):
+        if path.endswith('.parquet'):
+            return pd.read_parquet(path, engine='pyarrow')
+        return pd.read_pickle(path)
+
+    def _write(self, df, path):
+        """先写临时文件再改名，中断时不会留下不完整的缓存"""
+        temp_path = path + '.tmp'
+        if path.endswith('.parquet'):
+            df.to_parquet(temp_path, engine='pyarrow')
+        else:
+            df.to_pickle(temp_path, compression=None)
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def _to_python(value):
+        """numpy标量转为Python数值（json无法序列化numpy整数）"""
+        return value.item() if hasattr(value, 'item') else str(value)
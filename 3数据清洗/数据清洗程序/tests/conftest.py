@@ -0,0 +1,14 @@
+"""
+测试配置 - 程序目录按main.py的方式以src包导入（模块之间使用相对导入）
+"""
+
+import sys
+import types
+from pathlib import Path
+
+PROGRAM_DIR = Path(__file__).resolve().parents[1]
+
+if 'src' not in sys.modules:
+    package = types.ModuleType('src')
+    package.__path__ = [str(PROGRAM_DIR)]
+    sys.modules['src'] = package
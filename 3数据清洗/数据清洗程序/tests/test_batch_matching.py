@@ -0,0 +1,56 @@
+"""
+批量匹配测试 - n-gram稀疏相似度与稠密计算一致，批量匹配与逐条匹配使用相同的分块
+"""
+
+import numpy as np
+import pytest
+from collections import Counter
+from src.fuzzy_matcher import FuzzyMatcher
+from src.ngram_index import NgramTfidfIndex
+
+CPU_SCORES = {
+    'Intel Core i5-12400F': 45.0,
+    'Intel Core i7-13700K': 70.0,
+    'AMD Ryzen 7 7800X3D': 80.0,
+}
+
+GPU_SCORES = {
+    'NVIDIA GeForce RTX 3080': 56.9,
+    'NVIDIA GeForce RTX 5090': 100.0,
+    'AMD Radeon RX 7900 XT': 78.5,
+    'AMD Radeon RX 560 XT': 24.6,
+}
+
+def dense_similarity(index, query):
+    """按定义计算的TF-IDF余弦相似度（对照）"""
+    def vector(text, unknown):
+        grams = Counter(index._ngrams(text))
+        weights = {gram: count * (index.idf[index.vocabulary[gram]] if gram in index.vocabulary else unknown)
+                   for gram, count in grams.items()}
+        norm = np.sqrt(sum(float(weight) ** 2 for weight in weights.values()))
+        return {gram: weight / norm for gram, weight in weights.items()}
+
+    query_vector = vector(query, index.unknown_idf)
+    return np.array([sum(weight * vector(name, 0).get(gram, 0) for gram, weight in query_vector.items())
+                     for name in index.names])
+
+def test_sparse_similarity_matches_dense():
+    index = NgramTfidfIndex(GPU_SCORES)
+    queries = ['NVIDIA GEFORCE RTX 3090', 'AMD RADEON RX 9070 XT', 'zzz']
+    for query, similarity in zip(queries, index.similarities(queries)):
+        assert similarity == pytest.approx(dense_similarity(index, query), abs=1e-5)
+
+@pytest.mark.parametrize('query, expected', [
+    ('NVIDIA GEFORCE RTX 3090', 'NVIDIA GeForce RTX 3080'),
+    ('AMD RADEON RX 9070 XT', 'AMD Radeon RX 7900 XT'),
+])
+def test_batch_uses_blocks(query, expected):
+    scan = FuzzyMatcher(CPU_SCORES, GPU_SCORES)
+    batch = FuzzyMatcher(CPU_SCORES, GPU_SCORES, batch=True)
+
+    # 不分块时相似度最高的是其他系列的型号
+    index = batch._get_ngram_index('gpu')
+    assert index.names[next(index.similarities([query])).argmax()] != expected
+
+    assert scan.match_gpu(query)[1] == expected
+    assert batch.match_batch([query], 'gpu') == [(GPU_SCORES[expected], expected)]
@@ -0,0 +1,64 @@
+"""
+数据清洗测试 - 紧凑类型模式下非数字年份与普通模式的清洗结果一致，分块清洗与整表清洗一致
+"""
+
+import pandas as pd
+import pytest
+from src.data_processor import DataProcessor
+
+RAW_CSV = (
+    "CPU,GPU,RAM,Storage,Year,Type\n"
+    "i5,GTX 1060,8GB,512GB SSD,unknown,Desktop\n"
+    "i7,RTX 3060,16GB,1TB SSD,,Laptop\n"
+    "i3,GTX 1650,8GB,256GB SSD,2021,Laptop\n"
+    "i3,GTX 1650,8GB,256GB SSD,99999,Laptop\n"
+    "i3,GTX 1650,8GB,256GB SSD, ,Laptop\n"
+)
+
+@pytest.fixture
+def raw_path(tmp_path):
+    path = tmp_path / 'players.csv'
+    path.write_text(RAW_CSV, encoding='utf-8')
+    return str(path)
+
+@pytest.mark.parametrize('options', [{}, {'inplace': True}, {'engine': 'arrow'}])
+def test_typed_year_matches_plain(raw_path, options):
+    if options.get('engine') == 'arrow':
+        pytest.importorskip('pyarrow')
+    plain = DataProcessor(raw_path).clean_data()
+    typed = DataProcessor(raw_path, typed=True, **options).clean_data()
+
+    assert str(typed['Year'].dtype) == 'int16'
+    # 缺失年份按可解析年份的众数填充，非数字年份在标准化阶段取默认值
+    assert typed['Year'].tolist() == plain['Year'].tolist() == [2023, 2021, 2021, 2023]
+
+# 前10行年份解析为数字，后10行含'bad'解析为字符串；
+# 计入2035年的异常行时类型众数为Laptop，arrow下推过滤这些行后为Desktop
+MIXED_YEARS = ['2021', '2021', '2021', '2021', '2022', '2022', '2022', '', '', '',
+               '2022', '2022', '2022', '2021', 'bad', '', '2035', '2035', '2035', '2035']
+MIXED_TYPES = ['Desktop', 'Laptop', 'Desktop', 'Laptop', 'Desktop', '', '', '', '', '',
+               'Laptop', 'Desktop', '', '', '', '', 'Laptop', 'Laptop', 'Laptop', 'Laptop']
+
+@pytest.fixture
+def mixed_path(tmp_path):
+    lines = ['ID,CPU,GPU,RAM,Storage,Year,Type']
+    lines += [f'{row},i5,GTX 1060,8GB,512GB SSD,{year},{device}'
+              for row, (year, device) in enumerate(zip(MIXED_YEARS, MIXED_TYPES))]
+    path = tmp_path / 'mixed.csv'
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    return str(path)
+
+@pytest.mark.parametrize('options', [{}, {'typed': True}, {'engine': 'arrow'}, {'engine': 'arrow', 'typed': True}])
+def test_chunked_matches_in_memory(mixed_path, options):
+    if options.get('engine') == 'arrow':
+        pytest.importorskip('pyarrow')
+    processor = DataProcessor(mixed_path, chunk_size=10, **options)
+    in_memory = processor.clean_data()
+    chunked = pd.concat(list(processor.iter_clean_chunks()))
+
+    assert processor.compute_fill_statistics().fill_value('Year') == 2022
+    assert in_memory['Year'].tolist() == chunked['Year'].tolist()
+    assert in_memory['Type'].astype(str).tolist() == chunked['Type'].astype(str).tolist()
+    assert in_memory['Year'].tolist()[7:10] == [2022, 2022, 2022]
+    expected_type = 'Desktop' if options.get('engine') == 'arrow' else 'Laptop'
+    assert in_memory['Type'].astype(str).tolist()[5] == expected_type
@@ -0,0 +1,33 @@
+"""
+游戏配置评分测试 - 综合性能分权重可通过构造参数修改
+"""
+
+import pandas as pd
+import pytest
+from src.fuzzy_matcher import FuzzyMatcher
+from src.game_scorer import GameRequirementScorer
+
+CPU_SCORES = {'Intel Core i5-12400F': 45.0}
+GPU_SCORES = {'NVIDIA GeForce RTX 3080': 56.9}
+RAM_SCORES = {'8GB': 40, '16GB': 60}
+
+GAMES = pd.DataFrame({
+    '游戏名称': ['Test Game'],
+    '最低CPU': ['Intel Core i5-12400F'],
+    '最低显卡': ['NVIDIA GeForce RTX 3080'],
+    '最低内存': ['16 GB RAM'],
+})
+
+def combined_score(weights=None):
+    scorer = GameRequirementScorer(FuzzyMatcher(CPU_SCORES, GPU_SCORES), RAM_SCORES, {}, weights=weights)
+    return scorer.score_games(GAMES)['最低综合性能分'].iloc[0]
+
+def test_default_weights():
+    assert combined_score() == pytest.approx(round(0.5 * 56.9 + 0.3 * 45.0 + 0.2 * 60, 2))
+
+def test_partial_weights_override_defaults():
+    assert combined_score({'GPU': 0.7, 'RAM': 0}) == pytest.approx(round(0.7 * 56.9 + 0.3 * 45.0, 2))
+
+def test_unknown_weight_rejected():
+    with pytest.raises(ValueError, match='Storage'):
+        GameRequirementScorer(None, RAM_SCORES, {}, weights={'Storage': 0.1})
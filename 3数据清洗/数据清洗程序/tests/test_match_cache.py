@@ -0,0 +1,45 @@
+"""
+匹配缓存测试 - 每种匹配方式各保留一份结果，评分表或匹配代码变化时才清除
+"""
+
+from src.match_cache import MatchCache
+
+def open_cache(tmp_path, tables, signature):
+    return MatchCache(str(tmp_path / 'match_cache.sqlite'), tables, signature)
+
+def test_switching_signature_keeps_results(tmp_path):
+    cache = open_cache(tmp_path, 'tables-1', 'scan')
+    cache.save('cpu', {'i5 12400f': (60.5, 'Intel Core i5-12400F')})
+    cache.close()
+
+    cache = open_cache(tmp_path, 'tables-1', 'batch')
+    assert cache.load('cpu') == {}
+    cache.save('cpu', {'i5 12400f': (58, 'Intel Core i5-12400')})
+    cache.close()
+
+    # 切回逐条扫描：扫描结果仍在，且不与批量匹配的结果混用
+    cache = open_cache(tmp_path, 'tables-1', 'scan')
+    assert cache.load('cpu') == {'i5 12400f': (60.5, 'Intel Core i5-12400F')}
+    assert cache.load('gpu') == {}
+    cache.close()
+
+def test_table_change_prunes_all_signatures(tmp_path):
+    for signature in ('scan', 'batch'):
+        cache = open_cache(tmp_path, 'tables-1', signature)
+        cache.save('gpu', {'rtx 4090': (100, 'NVIDIA GeForce RTX 4090')})
+        cache.close()
+
+    cache = open_cache(tmp_path, 'tables-2', 'scan')
+    assert cache.load('gpu') == {}
+    cache.close()
+
+    cache = open_cache(tmp_path, 'tables-1', 'batch')
+    assert cache.load('gpu') == {}
+    cache.close()
+
+def test_fingerprint_follows_file_content(tmp_path):
+    path = tmp_path / 'table.xlsx'
+    path.write_bytes(b'v1')
+    first = MatchCache.fingerprint_files([str(path)])
+    path.write_bytes(b'v2')
+    assert MatchCache.fingerprint_files([str(path)]) != first
@@ -0,0 +1,39 @@
+"""
+分位数草图测试 - 大批量加入时按k个一段压缩，保留的元素数有界且分位数误差在秩误差范围内
+"""
+
+import numpy as np
+import pandas as pd
+from src.quantile_sketch import KLLSketch, ScoreSketches
+
+def test_small_batch_is_exact():
+    values = np.array([5.0, np.nan, 1.0, 3.0, 2.0, 4.0])
+    sketch = KLLSketch(k=200).update(values)
+    assert sketch.count == 5
+    assert sketch.median() == 3.0
+
+def test_large_batch_stays_bounded():
+    values = np.random.default_rng(1).normal(60, 15, 200000)
+    sketch = KLLSketch(k=200).update(values)
+
+    assert sketch.count == len(values)
+    assert sketch.retained() < 3 * sketch.k
+    assert max(len(items) for items in sketch.levels) <= 2 * sketch.k
+    for fraction in (0.1, 0.5, 0.9):
+        rank = np.mean(values <= sketch.quantile(fraction))
+        assert abs(rank - fraction) < 0.02
+    assert sketch.quantile(0) == values.min()
+    assert sketch.quantile(1) == values.max()
+
+def test_score_sketches_chunked_update():
+    rng = np.random.default_rng(2)
+    rows = 150000
+    df = pd.DataFrame({
+        'Year': rng.integers(2018, 2025, rows),
+        'Total_Score': rng.uniform(0, 100, rows).astype('float32'),
+    })
+    sketches = ScoreSketches(k=200, columns=['Total_Score']).update(df)
+
+    assert sketches.overall['Total_Score'].count == rows
+    assert sum(sketches.by_year[('Total_Score', year)].count for year in range(2018, 2025)) == rows
+    assert abs(sketches.median('Total_Score') - 50) < 2
@@ -0,0 +1,125 @@
+"""
+分析报告测试 - 固定小数据上的统计量和报告文本（含缺失分数）
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.score_calculator import ScoreCalculator
+
+def small_frame():
+    """7行固定数据：GPU分和总分有缺失，2020年的总分全部缺失，Desktop和Laptop行数相同"""
+    return pd.DataFrame({
+        'ID': np.arange(1, 8),
+        'CPU': [f'CPU {i}' for i in range(1, 8)],
+        'GPU': [f'GPU {i}' for i in range(1, 8)],
+        'RAM': ['8GB', '8GB', '16GB', '16GB', '32GB', '32GB', '8GB'],
+        'Storage': ['512GB', '1TB', '1TB', '2TB', '2TB', '2TB', '512GB'],
+        'Year': [2021, 2022, 2022, 2023, 2023, 2023, 2020],
+        'Type': ['Desktop', 'Laptop', 'Desktop', 'Desktop', 'Laptop', 'Unknown', 'Laptop'],
+        'CPU_Score': [10.0, 20.0, 30.0, 40.0, 50.0, 60.0, 25.0],
+        'GPU_Score': [50.0, np.nan, 70.0, 80.0, np.nan, 100.0, 60.0],
+        'RAM_Score': [20.0, 20.0, 60.0, 60.0, 80.0, 80.0, 20.0],
+        'Storage_Score': [30.0, 60.0, 60.0, 90.0, 90.0, 90.0, 30.0],
+        'Total_Score': [40.5, 55.0, np.nan, 70.25, 90.0, 62.0, np.nan],
+        'Performance_Level': ['C', 'B', 'C', 'B', 'A', 'B', 'C'],
+    })
+
+def scored_frame(rows=5000, seed=0):
+    """随机生成评分结果（分项分数带小数，总分保留两位小数）"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'ID': np.arange(1, rows + 1),
+        'CPU': rng.choice(['Intel Core i5-12400F', 'AMD Ryzen 7 5800X', 'Intel Core i9-13900K'], rows),
+        'GPU': rng.choice(['NVIDIA GeForce RTX 3060', 'AMD Radeon RX 6600', 'NVIDIA GeForce RTX 4090'], rows),
+        'RAM': rng.choice(['8GB', '16GB', '32GB'], rows),
+        'Storage': rng.choice(['512GB', '1TB', '2TB'], rows),
+        'Year': rng.choice(np.arange(2018, 2026), rows),
+        'Type': rng.choice(['Desktop', 'Laptop', 'Unknown'], rows, p=[0.6, 0.3, 0.1]),
+        'CPU_Score': np.round(rng.uniform(0, 90, rows), 1),
+        'GPU_Score': np.round(rng.uniform(0, 100, rows), 1),
+        'RAM_Score': rng.choice([20, 60, 80], rows).astype(float),
+        'Storage_Score': rng.choice([30, 60, 90], rows).astype(float),
+    })
+    calculator = ScoreCalculator()
+    df['Total_Score'] = calculator.compute_total(df)
+    df['Performance_Level'] = calculator.performance_levels(df['Total_Score'])
+    return df
+
+def test_small_frame_statistics():
+    from src.report_aggregator import ReportAggregator
+
+    stats = ReportAggregator(top_n=3).aggregate(small_frame())
+    assert stats.total_rows == 7
+    assert stats.year_range == (2020, 2023)
+    # 行数相同的类型按首次出现顺序
+    assert stats.type_counts == [('Desktop', 3), ('Laptop', 3), ('Unknown', 1)]
+    assert stats.level_counts == [('A', 1), ('B', 3), ('C', 3)]
+
+    expected = {
+        'CPU_Score': (33.5714, 30.0, 60.0, 10.0, 17.4915),
+        'GPU_Score': (72.0, 70.0, 100.0, 50.0, 19.2354),
+        'RAM_Score': (48.5714, 60.0, 80.0, 20.0, 27.9455),
+        'Storage_Score': (64.2857, 60.0, 90.0, 30.0, 26.9921),
+        'Total_Score': (63.55, 62.0, 90.0, 40.5, 18.38),
+    }
+    for column, (mean, median, maximum, minimum, std) in expected.items():
+        summary = stats.score_summary[column]
+        assert summary['mean'] == pytest.approx(mean, abs=1e-4)
+        assert summary['median'] == median
+        assert summary['max'] == maximum
+        assert summary['min'] == minimum
+        assert summary['std'] == pytest.approx(std, abs=1e-4)
+
+    # 缺失的总分不参与平均，总分全部缺失的年份平均为nan
+    yearly = dict(stats.yearly_means)
+    assert list(yearly) == [2020, 2021, 2022, 2023]
+    assert np.isnan(yearly[2020])
+    assert [yearly[year] for year in [2021, 2022, 2023]] == [40.5, 55.0, 74.08]
+
+    assert stats.top_configs['ID'].tolist() == [5, 4, 6]
+
+    # GPU分有缺失，相关系数按两列都不缺失的行计算
+    correlations = {(first, second): value for first, second, value in stats.correlations}
+    assert correlations[('CPU_Score', 'GPU_Score')] == pytest.approx(0.9936, abs=1e-4)
+    assert correlations[('CPU_Score', 'RAM_Score')] == pytest.approx(0.9157, abs=1e-4)
+    assert correlations[('GPU_Score', 'Storage_Score')] == pytest.approx(0.9098, abs=1e-4)
+    assert correlations[('RAM_Score', 'Storage_Score')] == pytest.approx(0.8712, abs=1e-4)
+
+def test_small_frame_report_text():
+    report = ScoreCalculator().generate_report(small_frame())
+    for line in ['总记录数: 7', '数据年份范围: 2020 - 2023', '  Desktop: 3 (42.9%)', '  Unknown: 1 (14.3%)',
+                 '  平均值: 72.00', '  标准差: 19.24', '  A: 1 (14.3%)', '  ID 5: 90.00分',
+                 '  2020年: 平均nan分', '  2023年: 平均74.08分', '  CPU_Score vs GPU_Score: 0.994']:
+        assert line in report.split('\n')
+    # 总分缺失的行不进入高分配置
+    assert 'ID 3:' not in report
+    assert 'ID 7:' not in report
+
+@pytest.mark.parametrize('chunk_rows', [1, 7, 1000])
+def test_chunked_moments_skip_missing_scores(chunk_rows):
+    from src.report_aggregator import ReportAggregator
+
+    df = scored_frame(rows=500, seed=3)
+    df.loc[df.index[::5], 'GPU_Score'] = np.nan
+    stats = ReportAggregator(chunk_rows=chunk_rows).aggregate(df)
+    summary = stats.score_summary['GPU_Score']
+    assert summary['mean'] == pytest.approx(df['GPU_Score'].mean())
+    assert summary['std'] == pytest.approx(df['GPU_Score'].std())
+    assert summary['min'] == df['GPU_Score'].min()
+    assert summary['max'] == df['GPU_Score'].max()
+
+def test_report_with_all_scores_missing():
+    from src.report_aggregator import ReportAggregator
+
+    df = small_frame()
+    df['GPU_Score'] = np.nan
+    stats = ReportAggregator().aggregate(df)
+    summary = stats.score_summary['GPU_Score']
+    assert all(np.isnan(summary[key]) for key in ['mean', 'median', 'max', 'min', 'std'])
+    correlations = {(first, second): value for first, second, value in stats.correlations}
+    assert np.isnan(correlations[('CPU_Score', 'GPU_Score')])
+    assert correlations[('CPU_Score', 'RAM_Score')] == pytest.approx(0.9157, abs=1e-4)
+
+    report = ScoreCalculator().generate_report(df)
+    assert '  CPU_Score vs GPU_Score: nan' in report.split('\n')
@@ -0,0 +1,44 @@
+"""
+增量重算测试 - 读取中间结果时删除不属于当前权重方案的方案列
+"""
+
+import pandas as pd
+from src.rescoring import ScoreStore
+from src.score_calculator import ScoreCalculator
+
+def stored_frame():
+    return pd.DataFrame({
+        'CPU_Match': ['I5-12400F', 'RYZEN 5 5600X'],
+        'GPU_Match': ['RTX 3060', 'RTX 4070'],
+        'RAM': ['16GB', '32GB'],
+        'Storage': ['512GB SSD', '1TB SSD'],
+        'CPU_Score': [60.0, 65.0],
+        'GPU_Score': [55.0, 75.0],
+        'RAM_Score': [60, 80],
+        'Storage_Score': [60, 80],
+        'Total_Score': [57.5, 74.0],
+    })
+
+def test_load_drops_stale_profile_columns(tmp_path):
+    path = str(tmp_path / 'store.pkl')
+    calculator = ScoreCalculator(profiles=['esports', '4k'])
+    ScoreStore(calculator.add_profile_totals(stored_frame()), calculator).save(path)
+    saved = pd.read_pickle(path)
+    assert {'Total_Score_esports', 'Total_Score_4k'} <= set(saved.columns)
+
+    store = ScoreStore.load(path, ScoreCalculator(profiles=['4k']))
+    profile_columns = [column for column in store.df.columns if column.startswith('Total_Score_')]
+    assert profile_columns == ['Total_Score_4k']
+
+    store = ScoreStore.load(path, ScoreCalculator(weights={'GPU': 0.5, 'CPU': 0.3, 'RAM': 0.1, 'Storage': 0.1}))
+    assert not [column for column in store.scored_frame().columns if column.startswith('Total_Score_')]
+
+def test_drop_stale_performance_levels():
+    df = stored_frame()
+    df['Total_Score_laptop'] = df['Total_Score']
+    df['Performance_Level_laptop'] = '中端'
+
+    store = ScoreStore(df, ScoreCalculator())
+    store.update_tables(cpu_dict={'I5-12400F': 62.0})
+    assert 'Total_Score_laptop' not in store.df.columns
+    assert 'Performance_Level_laptop' not in store.df.columns
@@ -0,0 +1,29 @@
+"""
+结果输出测试 - 分块写出的Parquet与原数据一致（object列的缺失值分布在不同块）
+"""
+
+import pandas as pd
+import pytest
+from src.result_writer import ResultWriter
+
+pytest.importorskip('pyarrow')
+
+@pytest.mark.parametrize('values', [
+    ['x', None, 'y', None, 'z'],
+    [None, None, 'x', None, 'y'],
+    [None, None, None, None, None],
+    [1, 2, 1.5, None, 3],
+])
+def test_parquet_object_column(tmp_path, values):
+    df = pd.DataFrame({
+        'Note': pd.Series(values, dtype=object),
+        'Total_Score': [10.5, 20.0, 30.25, 40.0, 50.5],
+    })
+    prefix = str(tmp_path / 'scores')
+    ResultWriter(['parquet'], chunk_rows=2).write(df, prefix)
+
+    result = pd.read_parquet(prefix + '.parquet')
+    assert len(result) == len(df)
+    assert result['Note'].isna().tolist() == df['Note'].isna().tolist()
+    assert result['Note'].dropna().tolist() == df['Note'].dropna().tolist()
+    assert result['Total_Score'].tolist() == df['Total_Score'].tolist()
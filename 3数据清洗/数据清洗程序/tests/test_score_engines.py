@@ -0,0 +1,44 @@
+"""
+评分引擎测试 - 向量化引擎与逐值计算的legacy引擎得分完全一致
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from tqdm import tqdm
+from src.score_calculator import ScoreCalculator
+
+# legacy引擎逐值计算时使用progress_apply（与main.py一样注册）
+tqdm.pandas(disable=True)
+
+RAM_SCORES = {'8GB': 20, '16GB': 60, '24GB': 70, '32GB': 80, '48GB': 90, '64GB及以上 ': 100}
+STORAGE_SCORES = {'512GB': 30, '1TB': 60, '2TB': 90, '4TB及以上': 100}
+
+RAM_VALUES = ['48GB DDR5', '128GB', '32', '8GB DDR4', '16GB', '64GB DDR5', '4GB', None, 'unknown', '148GB']
+STORAGE_VALUES = ['512GB NVMe SSD + 2TB HDD', '1TB SSD', '256GB SSD+1TB HDD', '4TB HDD', '2TB NVME SSD',
+                  '128GB eMMC', None, '8TB HDD', '500GB SATA SSD', '  1TB HDD + 512GB SSD  ']
+
+def player_frame(typed):
+    rows = len(RAM_VALUES)
+    df = pd.DataFrame({
+        'CPU_Score': np.linspace(20, 90, rows),
+        'GPU_Score': np.linspace(90, 15, rows),
+        'RAM': pd.Series(RAM_VALUES, dtype=object),
+        'Storage': pd.Series(STORAGE_VALUES, dtype=object),
+    })
+    if typed:
+        df['RAM'] = df['RAM'].astype('category')
+        df['Storage'] = df['Storage'].astype('category')
+    return df
+
+@pytest.mark.parametrize('typed', [False, True])
+@pytest.mark.parametrize('ram_scores', [RAM_SCORES, {**RAM_SCORES, '24GB': 72.5}])
+def test_vectorized_matches_legacy(typed, ram_scores):
+    vectorized = ScoreCalculator(engine='vectorized').calculate_scores(player_frame(typed), ram_scores, STORAGE_SCORES)
+    legacy = ScoreCalculator(engine='legacy').calculate_scores(player_frame(typed), ram_scores, STORAGE_SCORES)
+
+    for column in ['RAM_Score', 'Storage_Score', 'Total_Score']:
+        assert vectorized[column].dtype == legacy[column].dtype
+        assert vectorized[column].tolist() == legacy[column].tolist()
+    # 多个存储设备取最高分，无法识别的值按容量规则或0分
+    assert legacy['Storage_Score'].iloc[0] == 90
@@ -0,0 +1,53 @@
+"""
+阶段缓存测试 - 每个阶段保留最近使用的若干份输出，命中时刷新使用时间
+"""
+
+import os
+import glob
+import pandas as pd
+from src.stage_cache import StageCache
+
+def compute_for(value, calls):
+    def compute():
+        calls.append(value)
+        return pd.DataFrame({'Total_Score': [value]}), {'rows': 1}
+    return compute
+
+def data_files(directory):
+    """缓存目录中的阶段输出文件（不含.json元数据）"""
+    return {path for path in glob.glob(os.path.join(directory, '*')) if not path.endswith('.json')}
+
+def run_and_find(cache, directory, key, compute):
+    """运行一个阶段，返回这次新写入的输出文件"""
+    before = data_files(directory)
+    cache.run('score', key, compute)
+    (path,) = data_files(directory) - before
+    return path
+
+def test_keeps_recent_entries(tmp_path):
+    cache = StageCache(str(tmp_path), max_entries=2)
+    calls = []
+    keys = [StageCache.key('score', option=value) for value in range(3)]
+
+    first = run_and_find(cache, tmp_path, keys[0], compute_for(0, calls))
+    second = run_and_find(cache, tmp_path, keys[1], compute_for(1, calls))
+    # 命中第一份输出：刷新后它成为最近使用的输出
+    os.utime(second, (0, 0))
+    assert cache.run('score', keys[0], compute_for(0, calls))['Total_Score'].tolist() == [0]
+    assert calls == [0, 1]
+
+    # 第三份输出写入后淘汰最久未使用的第二份（连同元数据）
+    third = run_and_find(cache, tmp_path, keys[2], compute_for(2, calls))
+    assert data_files(tmp_path) == {first, third}
+    assert len(os.listdir(tmp_path)) == 4
+    cache.run('score', keys[0], compute_for(0, calls))
+    assert calls == [0, 1, 2]
+
+def test_stages_evicted_separately(tmp_path):
+    cache = StageCache(str(tmp_path), max_entries=1)
+    calls = []
+    cache.run('match', StageCache.key('match'), compute_for(0, calls))
+    cache.run('score', StageCache.key('score', option=1), compute_for(1, calls))
+    cache.run('score', StageCache.key('score', option=2), compute_for(2, calls))
+    cache.run('match', StageCache.key('match'), compute_for(0, calls))
+    assert calls == [0, 1, 2]